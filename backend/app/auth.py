@@ -1,28 +1,93 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
+import threading
+import time
 
 from app.models import User
 from app.schemas import TokenData
-from database import get_db
+from app.services.passwords import check_password
+from database import get_async_db
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# How long another worker may keep serving an account that was changed elsewhere
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+class CurrentUser:
+    """The authenticated account, detached from any session so it can be cached"""
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    __slots__ = ("id", "username", "email", "created_at", "is_bot")
+
+    def __init__(self, id: int, username: str, email: str, created_at: datetime, is_bot: bool):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.created_at = created_at
+        self.is_bot = is_bot
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(user.id, user.username, user.email, user.created_at, bool(user.is_bot))
+
+
+class UserCache:
+    """Verified accounts by id, so a valid token needs no users query"""
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, capacity: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._users: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return entry[0]
+
+    def put(self, user: CurrentUser) -> None:
+        with self._lock:
+            self._users[user.id] = (user, time.monotonic() + self.ttl)
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.capacity:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _forget_changed_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
+
+def token_claims(user) -> dict:
+    """Identity carried by the token: the id to look up and the name it was issued to"""
+    return {"sub": user.username, "uid": user.id}
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -34,29 +99,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.scalar(select(User).where(User.username == username))
+    if not user or user.is_bot:
         return False
-    if not verify_password(password, user.hashed_password):
+    # bcrypt is deliberately slow; it runs in the password process pool
+    if not await check_password(password, user.hashed_password):
         return False
     return user
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def user_from_token(token: str, db: AsyncSession) -> Optional[CurrentUser]:
+    """The user a bearer token belongs to, or None when it is invalid or the user is gone"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
+            return None
+        token_data = TokenData(username=username, user_id=payload.get("uid"))
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        return None
+    
+    if token_data.user_id is not None:
+        cached = user_cache.get(token_data.user_id)
+        if cached is not None and cached.username == token_data.username:
+            return cached
+        user = await db.get(User, token_data.user_id)
+    else:
+        # Issued before tokens carried the user id
+        user = await db.scalar(select(User).where(User.username == token_data.username))
+    if user is None or user.username != token_data.username:
+        return None
+    
+    current_user = CurrentUser.from_user(user)
+    user_cache.put(current_user)
+    return current_user
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    current_user = await user_from_token(token, db)
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return current_user
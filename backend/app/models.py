@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, JSON
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Boolean, Text, JSON, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -10,6 +10,8 @@ class User(Base):
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
+    is_bot = Column(Boolean, default=False)
+    bot_level = Column(String(20), nullable=True)  # greedy, simulation
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -22,8 +24,9 @@ class Game(Base):
     id = Column(Integer, primary_key=True, index=True)
     status = Column(String(20), default="waiting")  # waiting, active, finished
     current_turn = Column(Integer, default=0)
-    board_state = Column(JSON, nullable=True)  # 15x15 board
-    bag_tiles = Column(JSON, nullable=True)  # Remaining tiles
+    board_state = Column(LargeBinary, nullable=True)  # 225 bytes, see app/services/board.py
+    bag_tiles = Column(JSON, nullable=True)  # Remaining tiles as of the latest snapshot; see GameSnapshot
+    version = Column(Integer, default=0, nullable=False)  # Bumped on every state change
     created_at = Column(DateTime, default=datetime.utcnow)
     finished_at = Column(DateTime, nullable=True)
     
@@ -34,6 +37,11 @@ class Game(Base):
 
 class GamePlayer(Base):
     __tablename__ = "game_players"
+    __table_args__ = (
+        # A player's games for history, and the seats of a game in score order for ranking them
+        Index("ix_game_players_user_game", "user_id", "game_id"),
+        Index("ix_game_players_game_score", "game_id", "score"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
@@ -56,6 +64,8 @@ class GameMove(Base):
     move_number = Column(Integer, nullable=False)
     word = Column(String(15), nullable=True)
     tiles_played = Column(JSON, nullable=True)  # [{letter, row, col, is_blank}]
+    tiles_drawn = Column(JSON, nullable=True)  # Tiles the mover took from the bag
+    tiles_returned = Column(JSON, nullable=True)  # Tiles put back by an exchange
     score = Column(Integer, default=0)
     is_pass = Column(Boolean, default=False)
     is_exchange = Column(Boolean, default=False)
@@ -64,6 +74,20 @@ class GameMove(Base):
     # Relationships
     game = relationship("Game", back_populates="moves")
 
+class GameSnapshot(Base):
+    """Full game state after move_number moves; moves since the latest one replay on top"""
+    __tablename__ = "game_snapshots"
+    __table_args__ = (UniqueConstraint("game_id", "move_number"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=False, index=True)
+    move_number = Column(Integer, nullable=False)
+    board_state = Column(LargeBinary, nullable=False)
+    bag_tiles = Column(JSON, nullable=False)
+    racks = Column(JSON, nullable=False)  # by player_order
+    scores = Column(JSON, nullable=False)  # by player_order
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class Dictionary(Base):
     __tablename__ = "dictionary"
 
@@ -73,6 +97,8 @@ class Dictionary(Base):
 
 class Ranking(Base):
     __tablename__ = "rankings"
+    # Scanned backwards for the leaderboard (rating, then id, both descending)
+    __table_args__ = (Index("ix_rankings_rating_id", "rating", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
@@ -88,8 +114,11 @@ class Ranking(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    # Keyset pages of one game's chat
+    __table_args__ = (Index("ix_chat_messages_game_id_id", "game_id", "id"),)
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Assigned by the server when the message is accepted, see app/services/chat_ingest.py
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True, autoincrement=False)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     message = Column(Text, nullable=False)
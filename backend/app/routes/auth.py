@@ -1,46 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.models import User, Ranking
 from app.schemas import UserCreate, UserLogin, UserResponse, Token
-from app.auth import get_password_hash, authenticate_user, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from database import get_db
+from app.auth import authenticate_user, create_access_token, token_claims, user_cache, CurrentUser, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.services.passwords import hash_password, login_limiter
+from database import get_async_db
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
-@router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def password_slot(request: Request):
+    """Cap concurrent bcrypt work per client address; the rest is told to retry"""
+    client = request.client.host if request.client else "unknown"
+    if not login_limiter.acquire(client):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        login_limiter.release(client)
+
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(password_slot)])
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user.username))
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()
     
-    # Create ranking entry
+    # Create ranking entry in the same transaction
     ranking = Ranking(user_id=db_user.id)
     db.add(ranking)
-    db.commit()
+    await db.commit()
     
     return db_user
 
-@router.post("/login", response_model=Token)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = authenticate_user(db, user.username, user.password)
+@router.post("/login", response_model=Token, dependencies=[Depends(password_slot)])
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    db_user = await authenticate_user(db, user.username, user.password)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,8 +63,11 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # The next requests with this token are served from the cache
+    user_cache.put(CurrentUser.from_user(db_user))
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": db_user.username}, expires_delta=access_token_expires
+        data=token_claims(db_user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
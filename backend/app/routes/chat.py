@@ -1,11 +1,22 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
-from typing import Dict, List
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Dict, List, Optional
 from datetime import datetime
+import asyncio
 import json
+import os
+import time
 
-from app.models import ChatMessage, User, Game
-from database import get_db, SessionLocal
+from app.auth import user_from_token
+from app.models import ChatMessage, User
+from app.schemas import CHAT_MESSAGE_MAX_LENGTH
+from app.services import events
+from app.services.broadcast import BroadcastBackend, get_broadcast
+from app.services.chat_ingest import chat_writer, known_games
+from app.services.metrics import LatencyWindow
+from database import get_async_db, get_session_factory
 
 import logging
 
@@ -13,103 +24,260 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Messages buffered per socket before it counts as a slow consumer and is evicted
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5.0"))
+# 1013 "try again later": the client fell behind and may reconnect and resync
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+CHAT_PAGE_SIZE = 100
+CHAT_PAGE_MAX = 500
+CHAT_EXPORT_BATCH = 500
+
+
+class ClientConnection:
+    """A socket with a bounded outbound queue drained by its own writer task"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.writer: Optional[asyncio.Task] = None
+
+    def start(self, on_sent, on_failed):
+        self.writer = asyncio.create_task(self._write_loop(on_sent, on_failed))
+
+    def offer(self, message: str, published_at: float) -> bool:
+        """Queue a message without waiting; False when the client is too far behind"""
+        try:
+            self.queue.put_nowait((message, published_at))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _write_loop(self, on_sent, on_failed):
+        try:
+            while True:
+                message, published_at = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(message), SEND_TIMEOUT)
+                on_sent(time.monotonic() - published_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await on_failed(self, e)
+
+    async def close(self, code: Optional[int] = None):
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        if code is not None:
+            try:
+                await self.websocket.close(code=code)
+            except Exception:
+                pass
+
+
 class ConnectionManager:
-    def __init__(self):
-        # game_id -> list of websocket connections
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    """Sockets connected to this worker, fed by one broadcast subscription per game"""
+
+    def __init__(self, channel_prefix: str, backend: Optional[BroadcastBackend] = None):
+        # game_id -> connections of that game on this worker
+        self.active_connections: Dict[int, List[ClientConnection]] = {}
+        self.channel_prefix = channel_prefix
+        self.fanout_latency: Dict[int, LatencyWindow] = {}
+        self.evictions = 0
+        self._backend = backend
+
+    @property
+    def backend(self) -> BroadcastBackend:
+        return self._backend or get_broadcast()
+
+    def _channel(self, game_id: int) -> str:
+        return f"{self.channel_prefix}:{game_id}"
 
     async def connect(self, websocket: WebSocket, game_id: int):
         await websocket.accept()
+        connection = ClientConnection(websocket)
+        latency = self.fanout_latency.setdefault(game_id, LatencyWindow())
+
+        async def on_failed(failed: ClientConnection, error: Exception):
+            logger.warning(f"Evicting {self.channel_prefix} client of game {game_id}: {error!r}")
+            await self._evict(failed, game_id)
+
+        connection.start(latency.record, on_failed)
         if game_id not in self.active_connections:
             self.active_connections[game_id] = []
-        self.active_connections[game_id].append(websocket)
+            await self.backend.subscribe(self._channel(game_id), self._deliver)
+        self.active_connections[game_id].append(connection)
+
+    async def disconnect(self, websocket: WebSocket, game_id: int):
+        for connection in self.active_connections.get(game_id, []):
+            if connection.websocket is websocket:
+                await self._remove(connection, game_id)
+                await connection.close()
+                return
 
-    def disconnect(self, websocket: WebSocket, game_id: int):
-        if game_id in self.active_connections:
-            self.active_connections[game_id].remove(websocket)
-            if not self.active_connections[game_id]:
-                del self.active_connections[game_id]
+    async def _remove(self, connection: ClientConnection, game_id: int):
+        connections = self.active_connections.get(game_id)
+        if connections is None or connection not in connections:
+            return
+        connections.remove(connection)
+        if not connections:
+            del self.active_connections[game_id]
+            self.fanout_latency.pop(game_id, None)
+            await self.backend.unsubscribe(self._channel(game_id))
+
+    async def _evict(self, connection: ClientConnection, game_id: int):
+        self.evictions += 1
+        await self._remove(connection, game_id)
+        await connection.close(code=SLOW_CONSUMER_CLOSE_CODE)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
     async def broadcast(self, message: str, game_id: int):
-        if game_id in self.active_connections:
-            for connection in self.active_connections[game_id]:
-                try:
-                    await connection.send_text(message)
-                except:
-                    pass
+        """Publish to every worker; each one fans out to its own sockets"""
+        await self.backend.publish(self._channel(game_id), message)
+
+    async def _deliver(self, channel: str, message: str):
+        """Hand the message to every local writer without waiting on any socket"""
+        game_id = int(channel.rsplit(":", 1)[1])
+        published_at = time.monotonic()
+        overflowing = [
+            connection for connection in self.active_connections.get(game_id, [])
+            if not connection.offer(message, published_at)
+        ]
+        for connection in overflowing:
+            logger.warning(f"Evicting slow {self.channel_prefix} client of game {game_id}")
+            await self._evict(connection, game_id)
 
-manager = ConnectionManager()
+    def stats(self) -> Dict:
+        return {
+            "connections": sum(len(connections) for connections in self.active_connections.values()),
+            "evictions": self.evictions,
+            "fanout_latency": {game_id: window.summary() for game_id, window in self.fanout_latency.items()},
+        }
+
+manager = ConnectionManager("chat")
+# Separate channel for game state deltas so chat and game clients stay independent
+game_manager = ConnectionManager("game")
+
+async def push_game_event(game_id: int, event: dict):
+    await game_manager.broadcast(json.dumps(event), game_id)
+
+events.subscribe(push_game_event)
+
+@router.websocket("/ws/games/{game_id}")
+async def websocket_game_events(websocket: WebSocket, game_id: int):
+    """Push move, join, start and finish events for a game; clients only listen"""
+    await game_manager.connect(websocket, game_id)
+    try:
+        while True:
+            # Incoming frames are only keep-alives
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        await game_manager.disconnect(websocket, game_id)
+    except Exception as e:
+        logger.error(f"Game events WebSocket error: {e}")
+        await game_manager.disconnect(websocket, game_id)
+
+# Policy violation: the socket was opened without a valid token
+UNAUTHORIZED_CLOSE_CODE = 1008
 
 @router.websocket("/ws/chat/{game_id}")
-async def websocket_chat(websocket: WebSocket, game_id: int):
+async def websocket_chat(websocket: WebSocket, game_id: int, token: Optional[str] = Query(None),
+                         session_factory: async_sessionmaker = Depends(get_session_factory)):
+    # Browsers cannot set headers on a WebSocket, so the bearer token comes in the query string.
+    # Sessions are opened per use: the socket may stay open for hours.
+    user = None
+    if token:
+        async with session_factory() as db:
+            user = await user_from_token(token, db)
+    if user is None:
+        await websocket.close(code=UNAUTHORIZED_CLOSE_CODE)
+        return
+    
+    # Messages are broadcast as soon as they are accepted; chat_writer stores them in batches
     await manager.connect(websocket, game_id)
-    db = SessionLocal()
     
     try:
         while True:
             # Receive message
             data = await websocket.receive_text()
             message_data = json.loads(data)
-            
-            # Extract user info and message
-            username = message_data.get("username")
-            user_id = message_data.get("user_id")
             message_text = message_data.get("message")
             
-            if not username or not message_text or not user_id:
+            if not message_text or len(message_text) > CHAT_MESSAGE_MAX_LENGTH:
+                continue
+            # Clients may only speak for themselves
+            if message_data.get("user_id") not in (None, user.id):
                 continue
             
-            # Verify game exists
-            game = db.query(Game).filter(Game.id == game_id).first()
-            if not game:
+            if not await known_games.exists(game_id, session_factory):
                 continue
             
-            # Save message to database
-            chat_message = ChatMessage(
-                game_id=game_id,
-                user_id=user_id,
-                message=message_text
-            )
-            db.add(chat_message)
-            db.commit()
-            db.refresh(chat_message)
+            row = await chat_writer.submit(game_id, user.id, message_text, session_factory)
             
             # Broadcast message to all connections in this game
-            broadcast_data = {
-                "id": chat_message.id,
-                "user_id": user_id,
-                "username": username,
-                "message": message_text,
-                "created_at": chat_message.created_at.isoformat()
-            }
-            await manager.broadcast(json.dumps(broadcast_data), game_id)
+            await manager.broadcast(json.dumps(format_row(row, user.username)), game_id)
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket, game_id)
+        await manager.disconnect(websocket, game_id)
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        manager.disconnect(websocket, game_id)
-    finally:
-        db.close()
+        await manager.disconnect(websocket, game_id)
+
+def format_row(row: Dict, username: str) -> Dict:
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "username": username,
+        "message": row["message"],
+        "created_at": row["created_at"].isoformat()
+    }
+
+def format_message(message: ChatMessage, username: str) -> Dict:
+    return format_row({"id": message.id, "user_id": message.user_id, "message": message.message, "created_at": message.created_at}, username)
+
+def messages_query(game_id: int):
+    return select(ChatMessage, User.username).join(User, ChatMessage.user_id == User.id).where(ChatMessage.game_id == game_id)
 
 @router.get("/api/games/{game_id}/messages")
-async def get_messages(game_id: int, db: Session = Depends(get_db)):
-    """Get chat history for a game"""
-    messages = db.query(ChatMessage, User).join(User, ChatMessage.user_id == User.id).filter(
-        ChatMessage.game_id == game_id
-    ).order_by(ChatMessage.created_at).all()
-    
-    result = []
-    for msg, user in messages:
-        result.append({
-            "id": msg.id,
-            "user_id": msg.user_id,
-            "username": user.username,
-            "message": msg.message,
-            "created_at": msg.created_at.isoformat()
-        })
+async def get_messages(
+    game_id: int,
+    before: Optional[int] = Query(None, description="Older page: messages with a lower id"),
+    since_id: Optional[int] = Query(None, description="Catch-up after reconnecting: messages with a higher id"),
+    limit: int = Query(CHAT_PAGE_SIZE, ge=1, le=CHAT_PAGE_MAX),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Chat history in id order: the latest page, an older page (before) or what came after since_id
+
+    format=ndjson streams every message after since_id, one JSON object per line,
+    reading in keyset batches so memory stays flat however long the game ran.
+    """
+    if format == "ndjson":
+        return StreamingResponse(stream_messages(session_factory, game_id, since_id or 0), media_type="application/x-ndjson")
     
-    return result
+    statement = messages_query(game_id)
+    if since_id is not None:
+        statement = statement.where(ChatMessage.id > since_id).order_by(ChatMessage.id).limit(limit)
+        rows = (await db.execute(statement)).all()
+    else:
+        if before is not None:
+            statement = statement.where(ChatMessage.id < before)
+        # Newest page first from the index, shown oldest first
+        rows = (await db.execute(statement.order_by(ChatMessage.id.desc()).limit(limit))).all()
+        rows.reverse()
+    return [format_message(message, username) for message, username in rows]
+
+async def stream_messages(session_factory: async_sessionmaker, game_id: int, after_id: int):
+    """Each batch reads through its own session: the request's is closed before the body is sent"""
+    while True:
+        async with session_factory() as db:
+            rows = (await db.execute(
+                messages_query(game_id).where(ChatMessage.id > after_id).order_by(ChatMessage.id).limit(CHAT_EXPORT_BATCH)
+            )).all()
+        if not rows:
+            return
+        yield "".join(json.dumps(format_message(message, username)) + "\n" for message, username in rows)
+        after_id = rows[-1][0].id
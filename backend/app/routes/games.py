@@ -1,105 +1,174 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 
-from app.models import User, Game, GamePlayer, GameMove
-from app.schemas import GameCreate, GameResponse, GameDetailResponse, MoveCreate, MoveResponse, PlayerInfo
-from app.auth import get_current_user
-from app.services.game_service import GameService
-from database import get_db
+from app.models import Game, GamePlayer, GameMove
+from app.schemas import BotCreate, GameCreate, GameResponse, GameDetailResponse, LobbyGame, MoveCreate, MoveResponse, MoveSuggestion, PlayerInfo, ReplayResponse
+from app.auth import CurrentUser, get_current_user
+from app.services.board import Board
+from app.services.bots import run_bot_turns
+from app.services.game_service import AsyncGameService
+from app.services.game_state import game_states, replay
+from app.services.lexicon import get_lexicon_async
+from app.services.lobby import build_lobby, etag_matches, lobby_cache
+from app.services.move_generator import MoveGenerator
+from database import get_async_db
 
 router = APIRouter(prefix="/api/games", tags=["games"])
 
+GAME_STATUSES = ("waiting", "active", "finished")
+
+def with_players(statement):
+    """Eager-load seats and their users so formatting a page of games costs one extra query"""
+    return statement.options(selectinload(Game.players).joinedload(GamePlayer.user))
+
+def parse_statuses(status: Optional[List[str]]) -> List[str]:
+    statuses = status or ["waiting", "active"]
+    unknown = set(statuses) - set(GAME_STATUSES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown status: {', '.join(sorted(unknown))}")
+    return statuses
+
+async def get_seat(db: AsyncSession, game_id: int, user_id: int) -> Optional[GamePlayer]:
+    return await db.scalar(select(GamePlayer).where(GamePlayer.game_id == game_id, GamePlayer.user_id == user_id))
+
 @router.post("", response_model=GameResponse)
-def create_game(game: GameCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_game(game: GameCreate, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
     """Create a new game"""
-    service = GameService(db)
-    game = service.create_game()
+    service = AsyncGameService(db)
+    game = await service.create_game()
     
     # Automatically join as first player
-    service.join_game(game.id, current_user.id)
+    await service.join_game(game.id, current_user.id)
     
     # Reload game with players
-    db.refresh(game)
+    game = await db.scalar(with_players(select(Game)).where(Game.id == game.id).execution_options(populate_existing=True))
     
-    return format_game_response(game, db)
+    return format_game_response(game)
 
 @router.get("", response_model=List[GameResponse])
-def list_games(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """List all available games"""
-    games = db.query(Game).filter(Game.status.in_(["waiting", "active"])).all()
-    return [format_game_response(game, db) for game in games]
+async def list_games(
+    status: Optional[List[str]] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """List games, newest first; waiting and active ones unless statuses are given"""
+    statuses = parse_statuses(status)
+    games = (await db.scalars(
+        with_players(select(Game)).where(Game.status.in_(statuses))
+        .order_by(Game.created_at.desc(), Game.id.desc()).offset(offset).limit(limit)
+    )).all()
+    return [format_game_response(game) for game in games]
+
+@router.get("/lobby", response_model=List[LobbyGame])
+async def get_lobby(
+    status: Optional[List[str]] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Lobby summary without boards; answers 304 when the client's ETag is still current"""
+    statuses = parse_statuses(status)
+    key = (tuple(sorted(statuses)), limit, offset)
+    etag, body = await lobby_cache.get_or_build(key, lambda: db.run_sync(build_lobby, statuses, limit, offset))
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/{game_id}", response_model=GameDetailResponse)
-def get_game(game_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_game(game_id: int, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
     """Get game details including player's rack"""
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = await db.scalar(with_players(select(Game)).where(Game.id == game_id))
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
     # Get player's info
-    player = db.query(GamePlayer).filter(
-        GamePlayer.game_id == game_id,
-        GamePlayer.user_id == current_user.id
-    ).first()
+    player = next((p for p in game.players if p.user_id == current_user.id), None)
     
-    response = format_game_response(game, db)
+    response = format_game_response(game)
     
     if player:
         response["rack"] = player.rack
     
-    bag_tiles = game.bag_tiles or []
-    response["remaining_tiles"] = len(bag_tiles)
+    # The bag on the game row is only as fresh as the latest snapshot
+    state = await db.run_sync(game_states.load, game_id)
+    response["remaining_tiles"] = len(state.bag)
     
     return response
 
 @router.post("/{game_id}/join")
-def join_game(game_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def join_game(game_id: int, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
     """Join an existing game"""
-    service = GameService(db)
-    player = service.join_game(game_id, current_user.id)
+    service = AsyncGameService(db)
+    player = await service.join_game(game_id, current_user.id)
     
     if not player:
         raise HTTPException(status_code=400, detail="Cannot join game")
     
     return {"message": "Joined game successfully", "player_order": player.player_order}
 
+@router.post("/{game_id}/bots")
+async def add_bot(game_id: int, bot: BotCreate, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
+    """Seat a computer opponent in a waiting game"""
+    player = await get_seat(db, game_id, current_user.id)
+    
+    if not player:
+        raise HTTPException(status_code=403, detail="Not in this game")
+    
+    service = AsyncGameService(db)
+    bot_player = await service.add_bot(game_id, bot.level)
+    
+    if not bot_player:
+        raise HTTPException(status_code=400, detail="Cannot add bot")
+    
+    return {"message": "Bot joined game", "player_order": bot_player.player_order}
+
 @router.post("/{game_id}/start")
-def start_game(game_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def start_game(game_id: int, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
     """Start the game"""
     # Verify user is in the game
-    player = db.query(GamePlayer).filter(
-        GamePlayer.game_id == game_id,
-        GamePlayer.user_id == current_user.id
-    ).first()
+    player = await get_seat(db, game_id, current_user.id)
     
     if not player:
         raise HTTPException(status_code=403, detail="Not in this game")
     
-    service = GameService(db)
-    if not service.start_game(game_id):
+    service = AsyncGameService(db)
+    if not await service.start_game(game_id):
         raise HTTPException(status_code=400, detail="Cannot start game")
     
+    # A bot may hold the first turn
+    background_tasks.add_task(run_bot_turns, game_id, db.bind)
+    
     return {"message": "Game started"}
 
 @router.post("/{game_id}/end")
-def end_game(game_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Force end the game"""
-    service = GameService(db)
-    if not service.end_game(game_id, current_user.id):
-        raise HTTPException(status_code=400, detail="Cannot end game")
+async def end_game(game_id: int, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
+    """End the game once the rules allow it"""
+    service = AsyncGameService(db)
+    ended, error = await service.end_game(game_id, current_user.id)
+    if not ended:
+        raise HTTPException(status_code=400, detail=error)
     
     return {"message": "Game ended"}
 
 @router.post("/{game_id}/moves", response_model=MoveResponse)
-def make_move(game_id: int, move: MoveCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def make_move(game_id: int, move: MoveCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
     """Make a move in the game"""
-    service = GameService(db)
+    service = AsyncGameService(db)
     
     tiles_played = [tile.dict() for tile in move.tiles] if move.tiles else []
     exchange_tiles = move.exchange_tiles if move.is_exchange else None
     
-    game_move, error = service.make_move(
+    game_move, error = await service.make_move(
         game_id,
         current_user.id,
         tiles_played,
@@ -111,21 +180,71 @@ def make_move(game_id: int, move: MoveCreate, db: Session = Depends(get_db), cur
     if error:
         raise HTTPException(status_code=400, detail=error)
     
+    # Bots seated after this player answer in the background
+    background_tasks.add_task(run_bot_turns, game_id, db.bind)
+    
     return game_move
 
 @router.get("/{game_id}/moves", response_model=List[MoveResponse])
-def get_moves(game_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_moves(game_id: int, db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
     """Get all moves in a game"""
-    moves = db.query(GameMove).filter(GameMove.game_id == game_id).order_by(GameMove.move_number).all()
+    moves = (await db.scalars(select(GameMove).where(GameMove.game_id == game_id).order_by(GameMove.move_number))).all()
     return moves
 
-def format_game_response(game: Game, db: Session) -> dict:
-    """Format game response with player info"""
-    players = db.query(GamePlayer).filter(GamePlayer.game_id == game.id).all()
+@router.get("/{game_id}/replay", response_model=ReplayResponse)
+async def replay_game(game_id: int, move_number: Optional[int] = Query(None, ge=0), db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
+    """Board and scores after the first move_number moves (all of them by default), rebuilt from the move log"""
+    game = await db.scalar(with_players(select(Game)).where(Game.id == game_id))
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if move_number is None or move_number > game.current_turn:
+        move_number = game.current_turn
+    
+    state = await db.run_sync(replay, game_id, move_number)
+    if state is None:
+        raise HTTPException(status_code=400, detail="Game has not started")
     
+    seats = sorted(game.players, key=lambda p: p.player_order)
+    return {
+        "id": game.id,
+        "move_number": state.current_turn,
+        "status": state.status,
+        "board_state": state.board.to_json(),
+        "players": [
+            PlayerInfo(
+                id=seat.user_id,
+                username=seat.user.username if seat.user else "Unknown",
+                score=replayed.score,
+                player_order=seat.player_order,
+                is_active=seat.is_active
+            )
+            for seat, replayed in zip(seats, state.players)
+        ],
+        "remaining_tiles": len(state.bag)
+    }
+
+@router.get("/{game_id}/hint", response_model=List[MoveSuggestion])
+async def get_hint(game_id: int, limit: int = Query(5, ge=1, le=50), db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
+    """Suggest the highest scoring plays for the current player's rack"""
+    game = await db.scalar(select(Game).where(Game.id == game_id))
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if game.status != "active":
+        raise HTTPException(status_code=400, detail="Game not active")
+    
+    player = await get_seat(db, game_id, current_user.id)
+    if not player:
+        raise HTTPException(status_code=403, detail="Not in this game")
+    
+    # Move generation is CPU-bound, so it runs in the threadpool rather than on the loop
+    generator = MoveGenerator(await get_lexicon_async(db))
+    return await run_in_threadpool(generator.generate, Board.from_bytes(game.board_state), player.rack or [], limit)
+
+def format_game_response(game: Game) -> dict:
+    """Format game response with player info; load the game through with_players()"""
     player_info = []
-    for player in players:
-        user = db.query(User).filter(User.id == player.user_id).first()
+    for player in sorted(game.players, key=lambda p: p.player_order):
+        user = player.user
         player_info.append(PlayerInfo(
             id=player.user_id,
             username=user.username if user else "Unknown",
@@ -138,7 +257,7 @@ def format_game_response(game: Game, db: Session) -> dict:
         "id": game.id,
         "status": game.status,
         "current_turn": game.current_turn,
-        "board_state": game.board_state,
+        "board_state": Board.from_bytes(game.board_state).to_json(),
         "players": player_info,
         "created_at": game.created_at
     }
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+
+from app.routes.chat import manager, game_manager
+from app.services.chat_ingest import chat_writer
+from app.services.passwords import login_limiter
+from app.services.startup import startup
+from database import async_engine, engine, pool_status
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("")
+def get_metrics():
+    """Per-worker runtime metrics; each uvicorn worker reports only its own sockets and pools"""
+    return {
+        "database": {
+            "sync": pool_status(engine),
+            "async": pool_status(async_engine.sync_engine),
+        },
+        "websockets": {
+            "chat": manager.stats(),
+            "game": game_manager.stats(),
+        },
+        "logins": login_limiter.stats(),
+        "chat_writer": chat_writer.stats(),
+        "startup": startup.stats(),
+    }
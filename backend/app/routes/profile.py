@@ -1,69 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.models import User, Ranking, Game, GamePlayer
+from app.models import Game, GamePlayer
 from app.schemas import RankingResponse, GameHistoryResponse, UserResponse
-from app.auth import get_current_user
-from database import get_db
+from app.auth import CurrentUser, get_current_user
+from app.services.rankings import build_leaderboard, leaderboard
+from database import get_async_db
 
 router = APIRouter(prefix="/api", tags=["profile"])
 
 @router.get("/profile", response_model=UserResponse)
-def get_profile(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_profile(current_user: CurrentUser = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
 @router.get("/rankings", response_model=List[RankingResponse])
-def get_rankings(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Get global rankings"""
-    rankings = db.query(Ranking, User).join(User, Ranking.user_id == User.id).order_by(Ranking.rating.desc()).limit(100).all()
-    
-    result = []
-    for ranking, user in rankings:
-        result.append(RankingResponse(
-            id=ranking.id,
-            username=user.username,
-            total_games=ranking.total_games,
-            wins=ranking.wins,
-            losses=ranking.losses,
-            total_score=ranking.total_score,
-            highest_score=ranking.highest_score,
-            rating=ranking.rating
-        ))
-    
-    return result
+async def get_rankings(db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(get_current_user)):
+    """Get global rankings, served from the leaderboard kept since the last finished game"""
+    return await leaderboard.get_or_build(lambda: db.run_sync(build_leaderboard))
 
 @router.get("/history", response_model=List[GameHistoryResponse])
-def get_history(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Get user's game history"""
-    # Get all games where user participated
-    game_players = db.query(GamePlayer).filter(GamePlayer.user_id == current_user.id).all()
+async def get_history(
+    before: Optional[int] = Query(None, description="Only games with a lower id: the last id of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get user's game history, newest first, in one query"""
+    # Pick the page of the user's games first, then rank every seat of just those games
+    my_games = select(GamePlayer.game_id).where(GamePlayer.user_id == current_user.id)
+    if before is not None:
+        my_games = my_games.where(GamePlayer.game_id < before)
+    page = my_games.order_by(GamePlayer.game_id.desc()).limit(limit).subquery()
+    seats = select(
+        GamePlayer.game_id,
+        GamePlayer.user_id,
+        GamePlayer.score,
+        func.rank().over(partition_by=GamePlayer.game_id, order_by=GamePlayer.score.desc()).label("player_rank"),
+        func.count().over(partition_by=GamePlayer.game_id).label("total_players")
+    ).join(page, page.c.game_id == GamePlayer.game_id).subquery()
     
-    history = []
-    for gp in game_players:
-        game = db.query(Game).filter(Game.id == gp.game_id).first()
-        if not game:
-            continue
-        
-        # Get all players in the game to determine rank
-        all_players = db.query(GamePlayer).filter(GamePlayer.game_id == game.id).order_by(GamePlayer.score.desc()).all()
-        
-        player_rank = 0
-        for idx, player in enumerate(all_players):
-            if player.user_id == current_user.id:
-                player_rank = idx + 1
-                break
-        
-        history.append(GameHistoryResponse(
-            id=game.id,
-            status=game.status,
-            player_score=gp.score,
-            player_rank=player_rank,
-            total_players=len(all_players),
-            created_at=game.created_at,
-            finished_at=game.finished_at
-        ))
+    rows = (await db.execute(
+        select(Game.id, Game.status, Game.created_at, Game.finished_at, seats.c.score, seats.c.player_rank, seats.c.total_players)
+        .join(seats, seats.c.game_id == Game.id)
+        .where(seats.c.user_id == current_user.id)
+        .order_by(Game.id.desc())
+    )).all()
     
-    return history
+    return [
+        GameHistoryResponse(
+            id=row.id,
+            status=row.status,
+            player_score=row.score or 0,
+            player_rank=row.player_rank,
+            total_players=row.total_players,
+            created_at=row.created_at,
+            finished_at=row.finished_at
+        )
+        for row in rows
+    ]
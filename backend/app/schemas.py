@@ -27,11 +27,15 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    user_id: Optional[int] = None
 
 # Game schemas
 class GameCreate(BaseModel):
     pass
 
+class BotCreate(BaseModel):
+    level: str = "greedy"
+
 class TilePlacement(BaseModel):
     letter: str
     row: int
@@ -55,6 +59,11 @@ class MoveResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class MoveSuggestion(BaseModel):
+    word: str
+    score: int
+    tiles: List[TilePlacement]
+
 class PlayerInfo(BaseModel):
     id: int
     username: str
@@ -73,13 +82,32 @@ class GameResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class LobbyGame(BaseModel):
+    id: int
+    status: str
+    current_turn: int
+    version: int
+    players: List[PlayerInfo]
+    created_at: datetime
+
+class ReplayResponse(BaseModel):
+    id: int
+    move_number: int
+    status: str
+    board_state: List[List[Optional[Dict[str, Any]]]]
+    players: List[PlayerInfo]
+    remaining_tiles: int
+
 class GameDetailResponse(GameResponse):
     rack: Optional[List[str]] = None
     remaining_tiles: int = 0
 
 # Chat schemas
+# Keeps a chat broadcast well inside the NOTIFY payload limit, even with every character escaped
+CHAT_MESSAGE_MAX_LENGTH = 500
+
 class ChatMessageCreate(BaseModel):
-    message: str = Field(..., max_length=500)
+    message: str = Field(..., max_length=CHAT_MESSAGE_MAX_LENGTH)
 
 class ChatMessageResponse(BaseModel):
     id: int
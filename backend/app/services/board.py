@@ -0,0 +1,119 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.scoring import BOARD_SIZE, LETTER_VALUES
+
+# One byte per square, row-major. The low bits hold the letter code (index into
+# ALPHABET plus one, so 0 is an empty square) and the high bit flags a blank.
+ALPHABET = [letter for letter in LETTER_VALUES if letter != '_']
+LETTER_CODES = {letter: i + 1 for i, letter in enumerate(ALPHABET)}
+BLANK_FLAG = 0x80
+LETTER_MASK = 0x7F
+SQUARES = BOARD_SIZE * BOARD_SIZE
+
+
+class Board:
+    """15x15 board packed into 225 bytes with row and column occupancy bitboards"""
+
+    __slots__ = ("cells", "row_bits", "col_bits")
+
+    def __init__(self, data: Optional[bytes] = None):
+        if data is not None and len(data) != SQUARES:
+            raise ValueError(f"Board data must be {SQUARES} bytes, got {len(data)}")
+        self.cells = bytearray(data) if data is not None else bytearray(SQUARES)
+        self.row_bits = [0] * BOARD_SIZE
+        self.col_bits = [0] * BOARD_SIZE
+        for index, code in enumerate(self.cells):
+            if code:
+                row, col = divmod(index, BOARD_SIZE)
+                self.row_bits[row] |= 1 << col
+                self.col_bits[col] |= 1 << row
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> "Board":
+        """Decode a persisted board; a missing value is an empty board"""
+        return cls(bytes(data) if data else None)
+
+    @classmethod
+    def from_json(cls, rows: Optional[List[List[Optional[Dict]]]]) -> "Board":
+        """Build a board from the nested list-of-dicts API representation"""
+        board = cls()
+        for row, cells in enumerate(rows or []):
+            for col, cell in enumerate(cells):
+                if cell:
+                    board.place(row, col, cell['letter'], cell.get('is_blank', False))
+        return board
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.cells)
+
+    def to_json(self) -> List[List[Optional[Dict]]]:
+        """Expand to the nested list-of-dicts shape the API returns"""
+        rows = []
+        for row in range(BOARD_SIZE):
+            cells = []
+            for code in self.cells[row * BOARD_SIZE:(row + 1) * BOARD_SIZE]:
+                if code:
+                    cells.append({'letter': ALPHABET[(code & LETTER_MASK) - 1], 'is_blank': bool(code & BLANK_FLAG)})
+                else:
+                    cells.append(None)
+            rows.append(cells)
+        return rows
+
+    def copy(self) -> "Board":
+        board = Board.__new__(Board)
+        board.cells = bytearray(self.cells)
+        board.row_bits = list(self.row_bits)
+        board.col_bits = list(self.col_bits)
+        return board
+
+    def letter(self, row: int, col: int) -> Optional[str]:
+        code = self.cells[row * BOARD_SIZE + col]
+        return ALPHABET[(code & LETTER_MASK) - 1] if code else None
+
+    def is_blank(self, row: int, col: int) -> bool:
+        return bool(self.cells[row * BOARD_SIZE + col] & BLANK_FLAG)
+
+    def occupied(self, row: int, col: int) -> bool:
+        return bool(self.row_bits[row] >> col & 1)
+
+    def is_empty(self) -> bool:
+        return not any(self.row_bits)
+
+    def place(self, row: int, col: int, letter: str, is_blank: bool = False) -> None:
+        """Put a tile on an empty square; raises ValueError for bad squares or letters"""
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+            raise ValueError(f"Position ({row}, {col}) is off the board")
+        code = LETTER_CODES.get(letter)
+        if code is None:
+            raise ValueError(f"Invalid letter: {letter}")
+        if self.occupied(row, col):
+            raise ValueError(f"Position ({row}, {col}) already occupied")
+        self.cells[row * BOARD_SIZE + col] = code | (BLANK_FLAG if is_blank else 0)
+        self.row_bits[row] |= 1 << col
+        self.col_bits[col] |= 1 << row
+
+    def remove(self, row: int, col: int) -> None:
+        self.cells[row * BOARD_SIZE + col] = 0
+        self.row_bits[row] &= ~(1 << col)
+        self.col_bits[col] &= ~(1 << row)
+
+    def row_filled(self, row: int, first: int, last: int) -> bool:
+        """True if every square of the row between the two columns is occupied"""
+        mask = ((1 << (last - first + 1)) - 1) << first
+        return self.row_bits[row] & mask == mask
+
+    def col_filled(self, col: int, first: int, last: int) -> bool:
+        """True if every square of the column between the two rows is occupied"""
+        mask = ((1 << (last - first + 1)) - 1) << first
+        return self.col_bits[col] & mask == mask
+
+    def letter_rows(self) -> List[List[Optional[str]]]:
+        """Letters as a 15x15 grid of strings and None, for algorithms that scan rows"""
+        return [[self.letter(row, col) for col in range(BOARD_SIZE)] for row in range(BOARD_SIZE)]
+
+    def tiles(self) -> Iterator[Tuple[int, int, str, bool]]:
+        """Yield (row, col, letter, is_blank) for every tile on the board"""
+        for index, code in enumerate(self.cells):
+            if code:
+                row, col = divmod(index, BOARD_SIZE)
+                yield row, col, ALPHABET[(code & LETTER_MASK) - 1], bool(code & BLANK_FLAG)
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Game, GamePlayer, User
+from app.services.board import Board
+from app.services.game_service import AsyncGameService, TILE_DISTRIBUTION
+from app.services.game_state import game_states
+from app.services.lexicon import Lexicon, get_lexicon_async, LEXICON_PATH
+from app.services.move_generator import MoveGenerator, RACK_SIZE
+
+logger = logging.getLogger(__name__)
+
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "2"))
+BOT_MOVE_TIME_BUDGET = float(os.getenv("BOT_MOVE_TIME_BUDGET", "2.0"))
+# Extra time granted to the pool before a bot is forced to pass
+BOT_MOVE_GRACE = 1.0
+SIMULATION_CANDIDATES = 10
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lexicon: Optional[Lexicon] = None
+_running_games: Set[int] = set()
+# Games asked for while their runner was busy: it looks at the turn again before leaving
+_rerun_games: Set[int] = set()
+_resumed: Set[asyncio.Task] = set()
+
+# Per-process generator used by pool workers
+_worker_generator: Optional[MoveGenerator] = None
+
+
+def _init_worker(lexicon_path: Optional[str], lexicon_blob: Optional[bytes]) -> None:
+    """Load the lexicon once per pool process, mapping the shared file when there is one"""
+    global _worker_generator
+    if lexicon_path:
+        lexicon = Lexicon.load(lexicon_path)
+    else:
+        lexicon = Lexicon.from_buffer(lexicon_blob)
+    _worker_generator = MoveGenerator(lexicon)
+
+
+async def get_executor(lexicon: Lexicon) -> ProcessPoolExecutor:
+    """Bounded process pool for bot search, rebuilt if the lexicon was reloaded"""
+    global _executor, _executor_lexicon
+    if _executor is None or _executor_lexicon is not lexicon:
+        if LEXICON_PATH and os.path.exists(LEXICON_PATH):
+            initargs = (LEXICON_PATH, None)
+        else:
+            # Serializing a full dictionary takes a while; keep it off the event loop
+            initargs = (None, await asyncio.get_running_loop().run_in_executor(None, lexicon.to_bytes))
+            # Another game's bot may have built the pool meanwhile
+            if _executor is not None and _executor_lexicon is lexicon:
+                return _executor
+        shutdown_executor()
+        _executor = ProcessPoolExecutor(max_workers=BOT_WORKERS, initializer=_init_worker, initargs=initargs)
+        _executor_lexicon = lexicon
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor, _executor_lexicon
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _executor_lexicon = None
+
+
+def choose_move(board_data: bytes, rack: List[str], level: str, unseen: List[str], bag_size: int,
+                time_budget: float, generator: Optional[MoveGenerator] = None) -> Dict:
+    """Pick a bot move within the time budget; runs inside a pool worker"""
+    deadline = time.monotonic() + time_budget
+    generator = generator or _worker_generator
+    board = Board.from_bytes(board_data)
+    candidates = generator.generate(board, rack, limit=SIMULATION_CANDIDATES if level == "simulation" else 1)
+
+    if not candidates:
+        if bag_size >= RACK_SIZE:
+            return {'type': 'exchange', 'tiles': list(rack)}
+        return {'type': 'pass'}
+
+    if level != "simulation" or len(candidates) == 1:
+        return {'type': 'play', 'tiles': candidates[0]['tiles'], 'score': candidates[0]['score']}
+
+    # Simulation: value each candidate by its score minus the average best reply of
+    # an opponent holding a random rack of unseen tiles, refining until time runs out
+    replies = [[] for _ in candidates]
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        opponent_rack = rng.sample(unseen, min(RACK_SIZE, len(unseen))) if unseen else []
+        for i, candidate in enumerate(candidates):
+            if time.monotonic() >= deadline:
+                break
+            after = board.copy()
+            for tile in candidate['tiles']:
+                after.place(tile['row'], tile['col'], tile['letter'], tile['is_blank'])
+            best_reply = generator.generate(after, opponent_rack, limit=1)
+            replies[i].append(best_reply[0]['score'] if best_reply else 0)
+        if not unseen:
+            break
+
+    def equity(i: int) -> float:
+        sampled = replies[i]
+        return candidates[i]['score'] - (sum(sampled) / len(sampled) if sampled else 0)
+
+    best = max(range(len(candidates)), key=equity)
+    return {'type': 'play', 'tiles': candidates[best]['tiles'], 'score': candidates[best]['score']}
+
+
+def _unseen_tiles(board: Board, rack: List[str]) -> List[str]:
+    """Tiles the bot cannot see: everything not on the board or in its own rack"""
+    unseen = Counter(TILE_DISTRIBUTION)
+    for _, _, letter, is_blank in board.tiles():
+        unseen['_' if is_blank else letter] -= 1
+    unseen.subtract(rack)
+    return list(unseen.elements())
+
+
+def _load_turn(db: Session, game_id: int) -> Optional[Dict]:
+    """Snapshot what the bot to move needs, or None when it is not a bot's turn"""
+    state = game_states.load(db, game_id)
+    if state is None or state.status != "active":
+        return None
+    current = state.player_to_move()
+    if current is None:
+        return None
+    user = db.query(User).filter(User.id == current.user_id).first()
+    if not user or not user.is_bot:
+        return None
+    return {
+        'user_id': user.id,
+        'level': user.bot_level,
+        'board': state.board.to_bytes(),
+        'rack': list(current.rack),
+        'unseen': _unseen_tiles(state.board, current.rack),
+        'bag_size': len(state.bag),
+    }
+
+
+async def _apply_move(engine: AsyncEngine, game_id: int, user_id: int, decision: Dict) -> Optional[str]:
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        service = AsyncGameService(db)
+        if decision['type'] == 'play':
+            _, error = await service.make_move(game_id, user_id, decision['tiles'])
+            if error is None:
+                return None
+            logger.warning(f"Bot {user_id} move rejected in game {game_id}: {error}")
+        elif decision['type'] == 'exchange':
+            _, error = await service.make_move(game_id, user_id, [], is_exchange=True, exchange_tiles=decision['tiles'])
+            if error is None:
+                return None
+        _, error = await service.make_move(game_id, user_id, [], is_pass=True)
+        return error
+
+
+async def run_bot_turns(game_id: int, engine: AsyncEngine, time_budget: float = BOT_MOVE_TIME_BUDGET) -> None:
+    """Play every consecutive bot turn of a game without blocking the event loop"""
+    if game_id in _running_games:
+        _rerun_games.add(game_id)
+        return
+    _running_games.add(game_id)
+    try:
+        while True:
+            _rerun_games.discard(game_id)
+            async with AsyncSession(engine) as db:
+                turn = await db.run_sync(_load_turn, game_id)
+                lexicon = await get_lexicon_async(db) if turn is not None else None
+            if turn is None:
+                # A move made while the turn was being read may have handed it to a bot after all
+                if game_id in _rerun_games:
+                    continue
+                return
+
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                await get_executor(lexicon), choose_move,
+                turn['board'], turn['rack'], turn['level'], turn['unseen'], turn['bag_size'], time_budget
+            )
+            try:
+                decision = await asyncio.wait_for(future, timeout=time_budget + BOT_MOVE_GRACE)
+            except asyncio.TimeoutError:
+                logger.warning(f"Bot {turn['user_id']} ran out of time in game {game_id}")
+                decision = {'type': 'pass'}
+
+            error = await _apply_move(engine, game_id, turn['user_id'], decision)
+            if error:
+                logger.error(f"Bot {turn['user_id']} could not move in game {game_id}: {error}")
+                return
+    except Exception as e:
+        logger.error(f"Bot runner failed for game {game_id}: {e}")
+    finally:
+        _running_games.discard(game_id)
+        _rerun_games.discard(game_id)
+
+
+async def resume_bot_turns(engine: AsyncEngine) -> int:
+    """Start a runner for every active game waiting on a bot, e.g. after a restart (called at startup)"""
+    seats = select(func.count(GamePlayer.id)).where(GamePlayer.game_id == Game.id).correlate(Game).scalar_subquery()
+    async with AsyncSession(engine) as db:
+        game_ids = (await db.scalars(
+            select(Game.id)
+            .join(GamePlayer, GamePlayer.game_id == Game.id)
+            .join(User, User.id == GamePlayer.user_id)
+            .where(Game.status == "active", User.is_bot == True, GamePlayer.player_order == Game.current_turn % seats)
+        )).all()
+    for game_id in game_ids:
+        task = asyncio.create_task(run_bot_turns(game_id, engine))
+        # Keep a reference until the runner is done
+        _resumed.add(task)
+        task.add_done_callback(_resumed.discard)
+    return len(game_ids)
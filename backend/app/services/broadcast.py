@@ -0,0 +1,340 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# memory:// (single worker), postgresql://... (LISTEN/NOTIFY) or unix:///path/to/broker.sock
+BROADCAST_URL = os.getenv("BROADCAST_URL", "memory://")
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 8000
+# Seconds before reopening a lost LISTEN connection, doubling up to the maximum
+RECONNECT_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+
+class BroadcastBackend(abc.ABC):
+    """Channel pub/sub shared by every worker; each worker subscribes once per channel"""
+
+    # Whether other processes receive what this one publishes
+    shared = True
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Deliver every message published on channel, by any worker, to handler"""
+
+    @abc.abstractmethod
+    async def unsubscribe(self, channel: str) -> None:
+        """Stop delivering channel to this worker"""
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        """Send message to every worker subscribed to channel"""
+
+
+class MemoryBroadcast(BroadcastBackend):
+    """In-process delivery, enough when there is a single worker"""
+
+    shared = False
+
+    def __init__(self):
+        self._handlers: Dict[str, MessageHandler] = {}
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers[channel] = handler
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+
+    async def publish(self, channel: str, message: str) -> None:
+        handler = self._handlers.get(channel)
+        if handler is not None:
+            await handler(channel, message)
+
+
+class PostgresBroadcast(BroadcastBackend):
+    """LISTEN/NOTIFY on the application database, so workers on any node share channels
+
+    A lost listener connection is reopened with backoff and every channel listened to again;
+    notifications sent while it was down are lost, as with any LISTEN/NOTIFY gap.
+    """
+
+    def __init__(self, dsn: str):
+        # libpq does not understand SQLAlchemy driver suffixes such as postgresql+psycopg2://
+        scheme, _, rest = dsn.partition("://")
+        self.dsn = f"{scheme.split('+')[0]}://{rest}"
+        self._handlers: Dict[str, MessageHandler] = {}
+        self._listener = None
+        self._listener_fd: Optional[int] = None
+        self._notifier = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        connection = psycopg2.connect(self.dsn)
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        return connection
+
+    async def connect(self) -> None:
+        if self._notifier is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._notifier = await run_in_threadpool(self._connect)
+        try:
+            await self._open_listener()
+        except Exception:
+            self._notifier.close()
+            self._notifier = None
+            raise
+
+    async def _open_listener(self) -> None:
+        from psycopg2 import sql
+
+        listener = await run_in_threadpool(self._connect)
+        try:
+            for channel in list(self._handlers):
+                await run_in_threadpool(self._execute, listener, sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+        except Exception:
+            listener.close()
+            raise
+        self._listener = listener
+        self._listener_fd = listener.fileno()
+        self._loop.add_reader(self._listener_fd, self._drain)
+
+    def _close_listener(self) -> None:
+        if self._listener is None:
+            return
+        self._loop.remove_reader(self._listener_fd)
+        self._listener.close()
+        self._listener = None
+        self._listener_fd = None
+
+    async def disconnect(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._close_listener()
+        if self._notifier is not None:
+            self._notifier.close()
+            self._notifier = None
+
+    def _drain(self) -> None:
+        import psycopg2
+
+        try:
+            self._listener.poll()
+        except psycopg2.OperationalError as e:
+            logger.error(f"Broadcast listener connection lost: {e}")
+            self._close_listener()
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+            return
+        while self._listener.notifies:
+            notify = self._listener.notifies.pop(0)
+            handler = self._handlers.get(notify.channel)
+            if handler is not None:
+                self._loop.create_task(handler(notify.channel, notify.payload))
+
+    async def _reconnect(self) -> None:
+        import psycopg2
+
+        delay = RECONNECT_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._open_listener()
+            except psycopg2.OperationalError as e:
+                logger.warning(f"Broadcast listener reconnect failed, retrying in {delay:.0f}s: {e}")
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
+            logger.info(f"Broadcast listener reconnected to {len(self._handlers)} channels")
+            self._reconnect_task = None
+            return
+
+    def _execute(self, connection, statement, params=None) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(statement, params)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        from psycopg2 import sql
+
+        await self.connect()
+        # Registered first, so a listener reopened meanwhile listens to it as well
+        self._handlers[channel] = handler
+        if self._listener is not None:
+            await run_in_threadpool(self._execute, self._listener, sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+
+    async def unsubscribe(self, channel: str) -> None:
+        from psycopg2 import sql
+
+        self._handlers.pop(channel, None)
+        if self._listener is not None:
+            await run_in_threadpool(self._execute, self._listener, sql.SQL("UNLISTEN {}").format(sql.Identifier(channel)))
+
+    async def publish(self, channel: str, message: str) -> None:
+        size = len(message.encode("utf-8"))
+        if size >= NOTIFY_PAYLOAD_LIMIT:
+            raise ValueError(f"Broadcast on {channel} is {size} bytes; NOTIFY carries less than {NOTIFY_PAYLOAD_LIMIT}")
+        await self.connect()
+        await run_in_threadpool(self._execute, self._notifier, "SELECT pg_notify(%s, %s)", (channel, message))
+
+
+class UnixSocketBroadcast(BroadcastBackend):
+    """Client of a BroadcastBroker on a Unix socket, for several workers on one host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handlers: Dict[str, MessageHandler] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        if self._writer is not None:
+            return
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        # Re-register channels after a reconnect so the broker knows this worker again
+        for channel in self._handlers:
+            self._send({"op": "subscribe", "channel": channel})
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    async def disconnect(self) -> None:
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _send(self, frame: Dict) -> None:
+        self._writer.write(json.dumps(frame).encode() + b"\n")
+
+    async def _read_loop(self) -> None:
+        try:
+            async for line in self._reader:
+                frame = json.loads(line)
+                handler = self._handlers.get(frame["channel"])
+                if handler is not None:
+                    await handler(frame["channel"], frame["message"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast broker connection failed: {e}")
+        self._writer = None
+        logger.warning("Broadcast broker connection closed")
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers[channel] = handler
+        if self._writer is None:
+            await self.connect()
+        else:
+            self._send({"op": "subscribe", "channel": channel})
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+        if self._writer is not None:
+            self._send({"op": "unsubscribe", "channel": channel})
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.connect()
+        self._send({"op": "publish", "channel": channel, "message": message})
+        await self._writer.drain()
+
+
+class BroadcastBroker:
+    """Relay publishes to every connection subscribed to the channel, including the sender"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channels = set()
+        try:
+            async for line in reader:
+                frame = json.loads(line)
+                channel = frame["channel"]
+                if frame["op"] == "subscribe":
+                    channels.add(channel)
+                    self.subscribers.setdefault(channel, set()).add(writer)
+                elif frame["op"] == "unsubscribe":
+                    channels.discard(channel)
+                    self._remove(channel, writer)
+                elif frame["op"] == "publish":
+                    for subscriber in list(self.subscribers.get(channel, ())):
+                        subscriber.write(line)
+        except (ConnectionError, ValueError, KeyError) as e:
+            logger.warning(f"Dropping broadcast client: {e}")
+        finally:
+            for channel in channels:
+                self._remove(channel, writer)
+            writer.close()
+
+    def _remove(self, channel: str, writer: asyncio.StreamWriter) -> None:
+        subscribers = self.subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self.subscribers[channel]
+
+
+def create_backend(url: str) -> BroadcastBackend:
+    if url.startswith("unix://"):
+        return UnixSocketBroadcast(url[len("unix://"):])
+    if url.startswith("postgres"):
+        return PostgresBroadcast(url)
+    return MemoryBroadcast()
+
+
+_backend: Optional[BroadcastBackend] = None
+
+
+def get_broadcast() -> BroadcastBackend:
+    """Process-wide backend selected by BROADCAST_URL"""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(BROADCAST_URL)
+    return _backend
+
+
+def set_broadcast(backend: Optional[BroadcastBackend]) -> None:
+    global _backend
+    _backend = backend
+
+
+if __name__ == "__main__":
+    # Run a broker for the unix:// backend: python -m app.services.broadcast /tmp/scrabble.sock
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(BroadcastBroker(sys.argv[1] if len(sys.argv) > 1 else "/tmp/scrabble-broadcast.sock").serve_forever())
@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ChatMessage, Game
+
+logger = logging.getLogger(__name__)
+
+CHAT_BATCH_SIZE = int(os.getenv("CHAT_BATCH_SIZE", "200"))
+# Longest a message waits in memory before it is written
+CHAT_FLUSH_INTERVAL = float(os.getenv("CHAT_FLUSH_INTERVAL", "0.2"))
+# Past this many unwritten messages, senders wait for the writer
+CHAT_QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", "10000"))
+# Ids are milliseconds since ID_EPOCH_MS, then the worker id, then a per-millisecond counter,
+# 53 bits in all so browsers read them as exact numbers
+ID_EPOCH_MS = 1704067200000  # 2024-01-01
+WORKER_BITS = 5
+SEQUENCE_BITS = 7
+# Tells apart workers that assign ids in the same millisecond; unset, each worker claims a free one at startup
+CHAT_WORKER_ID = os.getenv("CHAT_WORKER_ID")
+# First key of the Postgres advisory locks that hold claimed worker ids ("CHAT")
+WORKER_LOCK_NAMESPACE = 0x43484154
+
+
+class MessageIds:
+    """Time-ordered ids, so a message can be broadcast before its row exists"""
+
+    def __init__(self, worker_id: Optional[int] = None):
+        self.worker_id = worker_id
+        self._last_ms = 0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        if self.worker_id is None:
+            raise RuntimeError("No chat worker id: set CHAT_WORKER_ID or claim one at startup")
+        with self._lock:
+            now = int(time.time() * 1000) - ID_EPOCH_MS
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = itertools.count()
+            sequence = next(self._sequence)
+            if sequence >> SEQUENCE_BITS:
+                # Counter exhausted within one millisecond: borrow from the next one
+                self._last_ms += 1
+                self._sequence = itertools.count(1)
+                sequence = 0
+            return (((self._last_ms << WORKER_BITS) | self.worker_id) << SEQUENCE_BITS) | sequence
+
+
+class WorkerIdLease:
+    """A chat worker id no other live worker holds
+
+    On Postgres the id is a session advisory lock on a connection kept open until release(),
+    so a crashed worker frees its id with its connection.
+    """
+
+    def __init__(self, configured: Optional[str] = CHAT_WORKER_ID):
+        self.configured = configured
+        self.worker_id: Optional[int] = None
+        self._db: Optional[AsyncSession] = None
+
+    async def claim(self, session_factory: Callable[[], AsyncSession]) -> int:
+        if self.configured is not None:
+            worker_id = int(self.configured)
+            if not 0 <= worker_id < 1 << WORKER_BITS:
+                raise ValueError(f"CHAT_WORKER_ID must be between 0 and {(1 << WORKER_BITS) - 1}")
+            self.worker_id = worker_id
+            return worker_id
+        db = session_factory()
+        # Autocommit: the connection stays open for the worker's life but never idles in a transaction
+        conn = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        if conn.dialect.name != "postgresql":
+            await db.close()
+            logger.warning("Chat worker id 0 assumed; set CHAT_WORKER_ID per worker when running several")
+            self.worker_id = 0
+            return 0
+        for worker_id in range(1 << WORKER_BITS):
+            claimed = await conn.scalar(text("SELECT pg_try_advisory_lock(:namespace, :id)"),
+                                        {"namespace": WORKER_LOCK_NAMESPACE, "id": worker_id})
+            if claimed:
+                self._db = db
+                self.worker_id = worker_id
+                logger.info(f"Claimed chat worker id {worker_id}")
+                return worker_id
+        await db.close()
+        raise RuntimeError(f"All {1 << WORKER_BITS} chat worker ids are taken")
+
+    async def release(self) -> None:
+        db, self._db = self._db, None
+        if db is not None:
+            # Unlocked explicitly: closing only returns the connection, and its locks, to the pool
+            conn = await db.connection()
+            await conn.execute(text("SELECT pg_advisory_unlock(:namespace, :id)"),
+                               {"namespace": WORKER_LOCK_NAMESPACE, "id": self.worker_id})
+            await db.close()
+
+
+class KnownGames:
+    """Ids of games known to exist; games are never deleted, so hits need no query"""
+
+    def __init__(self):
+        self._ids: Set[int] = set()
+
+    async def exists(self, game_id: int, session_factory: Callable[[], AsyncSession]) -> bool:
+        if game_id in self._ids:
+            return True
+        async with session_factory() as db:
+            found = await db.scalar(select(Game.id).where(Game.id == game_id))
+        if found is not None:
+            self._ids.add(game_id)
+        return found is not None
+
+
+class ChatWriter:
+    """Buffers accepted messages and writes them with multi-row INSERTs"""
+
+    def __init__(self, batch_size: int = CHAT_BATCH_SIZE, interval: float = CHAT_FLUSH_INTERVAL,
+                 queue_size: int = CHAT_QUEUE_SIZE, session_factory: Optional[Callable[[], AsyncSession]] = None,
+                 worker_id: Optional[int] = None):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue_size = queue_size
+        self.ids = MessageIds(worker_id)
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session_factory = session_factory
+
+    def _ensure_started(self, session_factory: Optional[Callable[[], AsyncSession]]) -> None:
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._session_factory = session_factory or self._session_factory
+            if self._session_factory is None:
+                raise RuntimeError("ChatWriter has no session factory")
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, game_id: int, user_id: int, message: str,
+                     session_factory: Optional[Callable[[], AsyncSession]] = None) -> Dict:
+        """Accept a message: it gets its id and timestamp now and reaches the database with the next batch
+
+        session_factory (the app's get_session_factory) is used from the batch that starts the writer on.
+        """
+        self._ensure_started(session_factory)
+        row = {
+            "id": self.ids.next(),
+            "game_id": game_id,
+            "user_id": user_id,
+            "message": message,
+            "created_at": datetime.utcnow()
+        }
+        await self._queue.put(row)
+        return row
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            row = await queue.get()
+            if row is None:
+                return
+            batch = [row]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    await self._write(batch)
+                    return
+                batch.append(row)
+            await self._write(batch)
+
+    async def _insert(self, rows: List[Dict]) -> None:
+        async with self._session_factory() as db:
+            await db.execute(insert(ChatMessage), rows)
+            await db.commit()
+
+    async def _write(self, batch: List[Dict]) -> None:
+        try:
+            await self._insert(batch)
+            self.written += len(batch)
+            self.batches += 1
+            return
+        except Exception as e:
+            error = e
+        if len(batch) > 1:
+            # One bad row must not take the rest of the batch with it
+            logger.warning(f"Chat batch of {len(batch)} failed, writing its messages one by one: {error!r}")
+            for row in batch:
+                await self._write([row])
+            return
+        # Already delivered to the sockets; only the history loses it
+        self.failed += 1
+        logger.error(f"Dropped chat message {batch[0]['id']} of game {batch[0]['game_id']}: {error!r}")
+
+    async def stop(self) -> None:
+        """Write whatever is still buffered (called at shutdown)"""
+        task = self._task
+        self._task = None
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        await self._queue.put(None)
+        await task
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+        }
+
+
+worker_id_lease = WorkerIdLease()
+known_games = KnownGames()
+chat_writer = ChatWriter()
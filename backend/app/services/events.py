@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Game state changes are made by GameService, which runs on the application's loop through
+# AsyncSession.run_sync for routes and bots, or on another thread for scripts and sync callers.
+# WebSocket delivery needs the loop, so publish() schedules handlers there from either side.
+EventHandler = Callable[[int, Dict], Awaitable[None]]
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_handlers: List[EventHandler] = []
+
+
+def bind_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Remember the loop that owns the WebSocket connections (called at app startup)"""
+    global _loop
+    _loop = loop
+
+
+def subscribe(handler: EventHandler) -> None:
+    if handler not in _handlers:
+        _handlers.append(handler)
+
+
+def publish(game_id: int, event: Dict) -> None:
+    """Hand a game event to every handler; safe to call from any thread, a no-op without an app loop"""
+    loop = _loop
+    if loop is None or loop.is_closed() or not _handlers:
+        return
+
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    for handler in _handlers:
+        try:
+            if running is loop:
+                loop.create_task(handler(game_id, event))
+            else:
+                asyncio.run_coroutine_threadsafe(handler(game_id, event), loop)
+        except RuntimeError as e:
+            logger.warning(f"Dropped event for game {game_id}: {e}")
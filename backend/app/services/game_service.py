@@ -1,8 +1,22 @@
+import asyncio
+import os
 import random
-from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+from typing import Callable, List, Dict, Optional, Tuple
 from collections import Counter
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models import Game, GamePlayer, Dictionary, GameMove
+from sqlalchemy.util import await_only
+from app.models import Game, GamePlayer, GameMove, GameSnapshot, User
+from app.services import events
+from app.services.board import Board
+from app.services.game_state import GameState, PlayerState, game_states, save_state, take_snapshot
+from app.services.lexicon import Lexicon, get_lexicon, get_lexicon_async
+from app.services.locks import game_locks
+from app.services.lobby import lobby_cache
+from app.services.rankings import apply_rack_penalties, leaderboard, record_results
+from app.services.scoring import score_move
 
 # Scrabble tile distribution
 # Polish Scrabble tile distribution (100 tiles)
@@ -14,31 +28,33 @@ TILE_DISTRIBUTION = {
     '_': 2  # Blanks
 }
 
-# Polish Letter values
-LETTER_VALUES = {
-    'A': 1, 'I': 1, 'E': 1, 'O': 1, 'Z': 1, 'N': 1, 'R': 1, 'W': 1, 'S': 1,
-    'C': 2, 'T': 2, 'Y': 2, 'K': 2, 'D': 2, 'P': 2, 'M': 2, 'U': 3, 'J': 3,
-    'L': 2, 'Ł': 3, 'G': 3, 'B': 3, 'H': 3, 'F': 5, 'Ą': 5, 'Ę': 5, 'Ś': 5,
-    'Ż': 5, 'Ź': 9, 'Ć': 6, 'Ń': 7, 'Ó': 5, '_': 0
-}
+BOT_LEVELS = ("greedy", "simulation")
 
-# Premium squares on the board
-TRIPLE_WORD = [(0, 0), (0, 7), (0, 14), (7, 0), (7, 14), (14, 0), (14, 7), (14, 14)]
-DOUBLE_WORD = [(1, 1), (2, 2), (3, 3), (4, 4), (1, 13), (2, 12), (3, 11), (4, 10),
-               (13, 1), (12, 2), (11, 3), (10, 4), (13, 13), (12, 12), (11, 11), (10, 10)]
-TRIPLE_LETTER = [(1, 5), (1, 9), (5, 1), (5, 5), (5, 9), (5, 13), (9, 1), (9, 5),
-                 (9, 9), (9, 13), (13, 5), (13, 9)]
-DOUBLE_LETTER = [(0, 3), (0, 11), (2, 6), (2, 8), (3, 0), (3, 7), (3, 14), (6, 2),
-                 (6, 6), (6, 8), (6, 12), (7, 3), (7, 11), (8, 2), (8, 6), (8, 8),
-                 (8, 12), (11, 0), (11, 7), (11, 14), (12, 6), (12, 8), (14, 3), (14, 11)]
+# A game may be ended by a player once every seat has gone this many rounds without scoring
+SCORELESS_ROUNDS_TO_END = int(os.getenv("SCORELESS_ROUNDS_TO_END", "2"))
 
 class GameService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, lexicon: Optional[Lexicon] = None):
         self.db = db
+        self._lexicon = lexicon
+
+    @property
+    def lexicon(self) -> Lexicon:
+        """Word lexicon, loaded once per process instead of queried per word"""
+        if self._lexicon is None:
+            self._lexicon = get_lexicon(self.db)
+        return self._lexicon
+
+    def _commit(self, game: Game) -> None:
+        """Commit a change to the game, bumping the version lobby ETags are derived from"""
+        game.version = (game.version or 0) + 1
+        self.db.commit()
+        game_states.evict(game.id)
+        lobby_cache.invalidate()
 
     def create_game(self) -> Game:
         """Create a new game with empty board and full tile bag"""
-        board_state = [[None for _ in range(15)] for _ in range(15)]
+        board_state = Board().to_bytes()
         bag_tiles = self._initialize_bag()
         
         game = Game(
@@ -48,8 +64,10 @@ class GameService:
             bag_tiles=bag_tiles
         )
         self.db.add(game)
-        self.db.commit()
+        self._commit(game)
         self.db.refresh(game)
+        
+        events.publish(game.id, {"type": "created"})
         return game
 
     def _initialize_bag(self) -> List[str]:
@@ -62,7 +80,12 @@ class GameService:
 
     def join_game(self, game_id: int, user_id: int) -> Optional[GamePlayer]:
         """Add a player to a game"""
-        game = self.db.query(Game).filter(Game.id == game_id).first()
+        with game_locks.hold(game_id):
+            return self._join_game(game_id, user_id)
+
+    def _join_game(self, game_id: int, user_id: int) -> Optional[GamePlayer]:
+        # Row lock so joins on other workers cannot draw from the same bag snapshot
+        game = self.db.query(Game).filter(Game.id == game_id).with_for_update().first()
         if not game or game.status != "waiting":
             return None
         
@@ -89,13 +112,62 @@ class GameService:
             rack=rack
         )
         self.db.add(game_player)
-        self.db.commit()
+        username = self.db.query(User.username).filter(User.id == user_id).scalar()
+        self._commit(game)
         self.db.refresh(game_player)
+        
+        events.publish(game_id, {
+            "type": "join",
+            "player": {
+                "id": user_id,
+                "username": username or "Unknown",
+                "score": 0,
+                "player_order": player_count,
+                "is_active": True
+            }
+        })
         return game_player
 
+    def add_bot(self, game_id: int, level: str = "greedy") -> Optional[GamePlayer]:
+        """Seat a computer opponent of the given level through the regular join path"""
+        with game_locks.hold(game_id):
+            return self._add_bot(game_id, level)
+
+    def _add_bot(self, game_id: int, level: str) -> Optional[GamePlayer]:
+        if level not in BOT_LEVELS:
+            return None
+        
+        seated = self.db.query(GamePlayer.user_id).filter(GamePlayer.game_id == game_id)
+        bot = self.db.query(User).filter(
+            User.is_bot == True,
+            User.bot_level == level,
+            User.id.notin_(seated)
+        ).order_by(User.id).first()
+        
+        if not bot:
+            # Bot accounts are shared between games; create one more for this seat
+            count = self.db.query(User).filter(User.is_bot == True, User.bot_level == level).count()
+            name = f"bot_{level}_{count + 1}"
+            bot = User(
+                username=name,
+                email=f"{name}@bots.invalid",
+                hashed_password="!",  # not a valid bcrypt hash, so bots can never log in
+                is_bot=True,
+                bot_level=level
+            )
+            self.db.add(bot)
+            self.db.commit()
+            self.db.refresh(bot)
+        
+        return self._join_game(game_id, bot.id)
+
     def start_game(self, game_id: int) -> bool:
         """Start the game if conditions are met"""
-        game = self.db.query(Game).filter(Game.id == game_id).first()
+        with game_locks.hold(game_id):
+            return self._start_game(game_id)
+
+    def _start_game(self, game_id: int) -> bool:
+        game = self.db.query(Game).filter(Game.id == game_id).with_for_update().first()
         if not game or game.status != "waiting":
             return False
         
@@ -103,172 +175,284 @@ class GameService:
         if player_count < 2:
             return False
         
+        # The move log replays on top of this first snapshot
+        self.db.add(take_snapshot(GameState.load(self.db, game_id)))
         game.status = "active"
-        self.db.commit()
+        current_turn = game.current_turn
+        self._commit(game)
+        
+        events.publish(game_id, {"type": "start", "status": "active", "current_turn": current_turn})
         return True
 
     def _draw_tiles(self, game: Game, count: int) -> List[str]:
         """Draw tiles from the bag"""
         bag = list(game.bag_tiles) if game.bag_tiles else []
-        tiles = []
+        tiles = self._draw_from(bag, count)
+        
+        # Re-assign to trigger SQLAlchemy JSON change detection
+        game.bag_tiles = bag
+        self.db.add(game)
         
-        # Shuffle bag before drawing to ensure randomness if previous shuffle wasn't effective
-        if not bag:
-           return []
+        return tiles
 
-        # Draw tiles
+    def _draw_from(self, bag: List[str], count: int) -> List[str]:
+        """Pop up to count random tiles from a bag list"""
+        tiles = []
         for _ in range(min(count, len(bag))):
-            # Since bag is shuffled at init, popping from end is fine. 
-            # But let's pop randomly just to be super safe against any order issues.
-            idx = random.randint(0, len(bag) - 1)
-            tiles.append(bag.pop(idx))
+            # The bag is shuffled at init, but pop randomly to be safe against any order issues
+            tiles.append(bag.pop(random.randint(0, len(bag) - 1)))
+        return tiles
+
+    def make_move(self, game_id: int, user_id: int, tiles_played: List[Dict], is_pass: bool = False, is_exchange: bool = False, exchange_tiles: List[str] = None) -> Tuple[Optional[GameMove], Optional[str]]:
+        """Process a player's move against the cached game state, persisting it with a version check"""
+        # Moves of one game are serialized in this process; the version check covers other workers
+        with game_locks.hold(game_id):
+            return self._make_move(game_id, user_id, tiles_played, is_pass, is_exchange, exchange_tiles)
+
+    def _make_move(self, game_id: int, user_id: int, tiles_played: List[Dict], is_pass: bool, is_exchange: bool, exchange_tiles: Optional[List[str]],
+                   apply: Optional[Callable] = None) -> Tuple[Optional[GameMove], Optional[str]]:
+        """Validate with apply (_apply_move unless given) and save, judging again once on fresh state"""
+        apply = apply or self._apply_move
+        for attempt in range(2):
+            cached = game_states.get(game_id)
+            state = cached or game_states.load(self.db, game_id)
+            if state is None:
+                return None, "Game not active"
             
-        # VERY IMPORTANT: Re-assign to trigger SQLAlchemy JSON detection
-        game.bag_tiles = list(bag)
+            after, player, move, error = apply(state, user_id, tiles_played, is_pass, is_exchange, exchange_tiles)
+            if error:
+                if cached is None:
+                    return None, error
+                # The snapshot may be behind a change made by another worker; judge again on fresh state
+                game_states.evict(game_id)
+                continue
+            
+            if self._save_move(state, after, player, move):
+                return move, None
         
-        # Commit happens in the caller usually, but to be safe for intermediate draws we can rely on session
-        # The key fix here is `list(bag)` creating a new object reference.
-        self.db.add(game) 
+        return None, "Game state changed, please retry"
+
+    def _save_move(self, state: GameState, after: GameState, player: PlayerState, move: GameMove) -> bool:
+        """Persist a validated move and publish it, unless the game changed since state was read"""
+        if not save_state(self.db, after, state.version, player, board_changed=bool(move.tiles_played)):
+            self.db.rollback()
+            game_states.evict(state.game_id)
+            return False
         
-        return tiles
+        self.db.add(move)
+        if after.status == "finished":
+            self._record_finish(after)
+        self.db.flush()
+        # Keep the returned move readable without a reload after commit
+        self.db.expunge(move)
+        event = self._move_event(after, player, move)
+        self.db.commit()
+        if after.status == "active":
+            game_states.put(after)
+        else:
+            game_states.evict(state.game_id)
+        if after.status == "finished":
+            lobby_cache.invalidate()
+            leaderboard.invalidate()
+        self._publish_move(after, event)
+        return True
 
-    def make_move(self, game_id: int, user_id: int, tiles_played: List[Dict], is_pass: bool = False, is_exchange: bool = False, exchange_tiles: List[str] = None) -> Tuple[Optional[GameMove], Optional[str]]:
-        """Process a player's move"""
-        game = self.db.query(Game).filter(Game.id == game_id).first()
-        if not game or game.status != "active":
-            return None, "Game not active"
+    def _apply_move(self, state: GameState, user_id: int, tiles_played: List[Dict], is_pass: bool, is_exchange: bool, exchange_tiles: Optional[List[str]]) -> Tuple[Optional[GameState], Optional[PlayerState], Optional[GameMove], Optional[str]]:
+        """Validate a move and return the resulting state on a copy, or an error"""
+        if state.status != "active":
+            return None, None, None, "Game not active"
         
-        player = self.db.query(GamePlayer).filter(
-            GamePlayer.game_id == game_id,
-            GamePlayer.user_id == user_id
-        ).first()
-        if not player:
-            return None, "Player not in game"
+        if state.player(user_id) is None:
+            return None, None, None, "Player not in game"
         
         # Check if it's player's turn
-        current_player_count = self.db.query(GamePlayer).filter(GamePlayer.game_id == game_id).count()
-        expected_player_order = game.current_turn % current_player_count
-        if player.player_order != expected_player_order:
-            return None, "Not your turn"
+        if state.player_to_move().user_id != user_id:
+            return None, None, None, "Not your turn"
+        
+        after = state.copy()
+        player = after.player(user_id)
+        move = GameMove(
+            game_id=state.game_id,
+            user_id=user_id,
+            move_number=state.current_turn,
+            score=0,
+            created_at=datetime.utcnow()
+        )
         
         # Handle pass
         if is_pass:
-            move = GameMove(
-                game_id=game_id,
-                user_id=user_id,
-                move_number=game.current_turn,
-                is_pass=True,
-                score=0
-            )
-            self.db.add(move)
-            game.current_turn += 1
-            self.db.commit()
-            return move, None
+            move.is_pass = True
+            after.current_turn += 1
+            after.version += 1
+            return after, player, move, None
         
         # Handle exchange
         if is_exchange and exchange_tiles:
-            rack = player.rack or []
+            returned = []
             for tile in exchange_tiles:
-                if tile in rack:
-                    rack.remove(tile)
-                    game.bag_tiles.append(tile)
+                if tile in player.rack:
+                    player.rack.remove(tile)
+                    returned.append(tile)
             
-            # Draw new tiles
-            new_tiles = self._draw_tiles(game, len(exchange_tiles))
-            rack.extend(new_tiles)
-            player.rack = rack
+            # Draw new tiles before the returned ones go back in
+            drawn = self._draw_from(after.bag, len(returned))
+            player.rack.extend(drawn)
+            after.bag.extend(returned)
             
-            move = GameMove(
-                game_id=game_id,
-                user_id=user_id,
-                move_number=game.current_turn,
-                is_exchange=True,
-                score=0
-            )
-            self.db.add(move)
-            game.current_turn += 1
-            self.db.commit()
-            return move, None
+            move.is_exchange = True
+            move.tiles_drawn = drawn
+            move.tiles_returned = returned
+            after.current_turn += 1
+            after.version += 1
+            return after, player, move, None
         
         # Validate and place tiles
-        board = game.board_state
-        rack = player.rack or []
+        board = after.board
         
-        # Validate tiles are in rack
-        tiles_to_place = [t['letter'] for t in tiles_played]
-        rack_counter = Counter(rack)
+        # Validate tiles are in rack (a blank is drawn from the rack as '_' whatever letter it stands for)
+        tiles_to_place = ['_' if t.get('is_blank') else t['letter'] for t in tiles_played]
+        rack_counter = Counter(player.rack)
         tiles_counter = Counter(tiles_to_place)
         
         for tile, count in tiles_counter.items():
             if rack_counter[tile] < count:
-                return None, f"Not enough {tile} tiles in rack"
-        
-        # Remove tiles from rack
-        temp_rack = rack.copy()
-        for tile in tiles_to_place:
-            temp_rack.remove(tile)
+                return None, None, None, f"Not enough {tile} tiles in rack"
         
         # Place tiles on board
         placed_positions = []
         for tile in tiles_played:
             row, col = tile['row'], tile['col']
-            if board[row][col] is not None:
-                return None, f"Position ({row}, {col}) already occupied"
-            board[row][col] = {
-                'letter': tile['letter'],
-                'is_blank': tile.get('is_blank', False)
-            }
+            try:
+                board.place(row, col, tile['letter'], tile.get('is_blank', False))
+            except ValueError as e:
+                return None, None, None, str(e)
             placed_positions.append((row, col))
         
-        # Validate word formation
+        # Validate word formation (the board is a private copy, so nothing to revert on failure)
         words = self._find_words(board, placed_positions)
         if not words:
-            # Revert board
-            for row, col in placed_positions:
-                board[row][col] = None
-            return None, "No valid words formed"
+            return None, None, None, "No valid words formed"
         
         # Validate all words in dictionary
         for word in words:
             if not self._is_valid_word(word):
-                # Revert board
-                for row, col in placed_positions:
-                    board[row][col] = None
-                return None, f"Invalid word: {word}"
+                return None, None, None, f"Invalid word: {word}"
         
-        # Calculate score
-        score = self._calculate_score(board, placed_positions, tiles_played)
+        # Calculate score: main word and every cross-word, premiums only under new tiles
+        score = score_move(board, tiles_played)
         
-        # Update game state
-        game.board_state = board
+        # Update player: remove played tiles, then draw replacements
+        for tile in tiles_to_place:
+            player.rack.remove(tile)
+        drawn = self._draw_from(after.bag, len(tiles_played))
+        player.rack.extend(drawn)
         player.score += score
-        player.rack = temp_rack
         
-        # Draw new tiles
-        new_tiles = self._draw_tiles(game, len(tiles_played))
-        player.rack.extend(new_tiles)
-        
-        # Create move record
-        main_word = max(words, key=len) if words else ""
-        move = GameMove(
-            game_id=game_id,
-            user_id=user_id,
-            move_number=game.current_turn,
-            word=main_word,
-            tiles_played=tiles_played,
-            score=score
-        )
-        self.db.add(move)
-        game.current_turn += 1
+        move.word = max(words, key=len)
+        move.tiles_played = tiles_played
+        move.tiles_drawn = drawn
+        move.score = score
+        after.current_turn += 1
+        after.version += 1
         
         # Check if game should end
-        if not player.rack and not game.bag_tiles:
-            game.status = "finished"
+        if not player.rack and not after.bag:
+            after.status = "finished"
+            apply_rack_penalties(after.players)
         
-        self.db.commit()
-        return move, None
+        return after, player, move, None
 
-    def _find_words(self, board: List[List], placed_positions: List[Tuple[int, int]]) -> List[str]:
+    def end_game(self, game_id: int, user_id: int) -> Tuple[bool, Optional[str]]:
+        """Finish an active game at a seated player's request once the rules allow it, scoring it as it stands"""
+        with game_locks.hold(game_id):
+            return self._end_game(game_id, user_id)
+
+    def _end_game(self, game_id: int, user_id: int) -> Tuple[bool, Optional[str]]:
+        for attempt in range(2):
+            state = game_states.load(self.db, game_id)
+            if state is None or state.status != "active":
+                return False, "Game not active"
+            if state.player(user_id) is None:
+                return False, "Player not in game"
+            if not self._can_end(state):
+                return False, f"The game ends when the bag is empty and a rack is played out, or after {SCORELESS_ROUNDS_TO_END} scoreless rounds"
+            
+            after = state.copy()
+            after.status = "finished"
+            after.version += 1
+            apply_rack_penalties(after.players)
+            # No move is logged, so the final snapshot takes the place of the one at this turn, if any
+            self.db.query(GameSnapshot).filter(
+                GameSnapshot.game_id == game_id, GameSnapshot.move_number == after.current_turn
+            ).delete(synchronize_session=False)
+            if save_state(self.db, after, state.version, after.player(user_id), board_changed=False):
+                self._record_finish(after)
+                self.db.commit()
+                
+                game_states.evict(game_id)
+                lobby_cache.invalidate()
+                leaderboard.invalidate()
+                events.publish(game_id, self._finish_event(after))
+                return True, None
+            
+            self.db.rollback()
+            game_states.evict(game_id)
+        
+        return False, "Game state changed, please retry"
+
+    def _can_end(self, state: GameState) -> bool:
+        """The bag is empty and a rack played out, or the last rounds scored nothing at all"""
+        if not state.bag and any(not player.rack for player in state.players):
+            return True
+        turns = SCORELESS_ROUNDS_TO_END * len(state.players)
+        scores = self.db.query(GameMove.score).filter(GameMove.game_id == state.game_id).order_by(
+            GameMove.move_number.desc()
+        ).limit(turns).all()
+        return len(scores) == turns and not any(score for (score,) in scores)
+
+    def _record_finish(self, state: GameState) -> None:
+        """Final scores of every seat and the rating changes, in the transaction of the last write"""
+        self.db.execute(update(GamePlayer), [{"id": player.seat_id, "score": player.score} for player in state.players])
+        self.db.execute(
+            update(Game).where(Game.id == state.game_id).values(finished_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        record_results(self.db, state.players)
+
+    def _move_event(self, state: GameState, player: PlayerState, move: GameMove) -> Dict:
+        """Describe a move as a delta for WebSocket clients"""
+        return {
+            "type": "move",
+            "move_number": move.move_number,
+            "user_id": player.user_id,
+            "word": move.word,
+            "score": move.score,
+            "total_score": player.score,
+            "is_pass": bool(move.is_pass),
+            "is_exchange": bool(move.is_exchange),
+            "tiles": [
+                {"letter": t['letter'], "row": t['row'], "col": t['col'], "is_blank": t.get('is_blank', False)}
+                for t in move.tiles_played or []
+            ],
+            "current_turn": state.current_turn,
+            "remaining_tiles": len(state.bag),
+            "status": state.status
+        }
+
+    def _finish_event(self, state: GameState) -> Dict:
+        """Final scores after rack penalties, which no move event carries"""
+        return {
+            "type": "finish",
+            "status": state.status,
+            "scores": [{"user_id": player.user_id, "score": player.score} for player in state.players]
+        }
+
+    def _publish_move(self, state: GameState, event: Dict) -> None:
+        events.publish(state.game_id, event)
+        if event["status"] == "finished":
+            events.publish(state.game_id, self._finish_event(state))
+
+    def _find_words(self, board: Board, placed_positions: List[Tuple[int, int]]) -> List[str]:
         """Find all words formed by the placed tiles"""
         words = []
         
@@ -286,28 +470,13 @@ class GameService:
         if not same_row and not same_col:
             return words  # Invalid placement
         
-        # Verify contiguity (including existing tiles)
+        # Verify contiguity (including existing tiles) with the occupancy bitboards
         if same_row:
             row = rows[0]
-            min_col = min(cols)
-            max_col = max(cols)
-            
-            # Check if all positions between min and max have tiles
-            for col in range(min_col, max_col + 1):
-                if board[row][col] is None:
-                    return words  # Gap found, invalid
-            
-            # Extend to full word
-            while min_col > 0 and board[row][min_col - 1] is not None:
-                min_col -= 1
-            while max_col < 14 and board[row][max_col + 1] is not None:
-                max_col += 1
-            
-            word = ""
-            for c in range(min_col, max_col + 1):
-                if board[row][c] is not None:
-                    word += board[row][c]['letter']
+            if not board.row_filled(row, min(cols), max(cols)):
+                return words  # Gap found, invalid
             
+            word = self._get_horizontal_word(board, row, cols[0])
             if len(word) > 1:
                 words.append(word)
             
@@ -320,25 +489,10 @@ class GameService:
         # Vertical word
         elif same_col:
             col = cols[0]
-            min_row = min(rows)
-            max_row = max(rows)
-            
-            # Check if all positions between min and max have tiles
-            for row in range(min_row, max_row + 1):
-                if board[row][col] is None:
-                    return words  # Gap found, invalid
-            
-            # Extend to full word
-            while min_row > 0 and board[min_row - 1][col] is not None:
-                min_row -= 1
-            while max_row < 14 and board[max_row + 1][col] is not None:
-                max_row += 1
-            
-            word = ""
-            for r in range(min_row, max_row + 1):
-                if board[r][col] is not None:
-                    word += board[r][col]['letter']
+            if not board.col_filled(col, min(rows), max(rows)):
+                return words  # Gap found, invalid
             
+            word = self._get_vertical_word(board, rows[0], col)
             if len(word) > 1:
                 words.append(word)
             
@@ -350,72 +504,78 @@ class GameService:
         
         return words
 
-    def _get_horizontal_word(self, board: List[List], row: int, col: int) -> str:
+    def _get_horizontal_word(self, board: Board, row: int, col: int) -> str:
         """Get horizontal word at position"""
         min_col = col
         max_col = col
         
-        while min_col > 0 and board[row][min_col - 1] is not None:
+        while min_col > 0 and board.occupied(row, min_col - 1):
             min_col -= 1
-        while max_col < 14 and board[row][max_col + 1] is not None:
+        while max_col < 14 and board.occupied(row, max_col + 1):
             max_col += 1
         
-        word = ""
-        for c in range(min_col, max_col + 1):
-            if board[row][c] is not None:
-                word += board[row][c]['letter']
-        
-        return word
+        return "".join(board.letter(row, c) for c in range(min_col, max_col + 1))
 
-    def _get_vertical_word(self, board: List[List], row: int, col: int) -> str:
+    def _get_vertical_word(self, board: Board, row: int, col: int) -> str:
         """Get vertical word at position"""
         min_row = row
         max_row = row
         
-        while min_row > 0 and board[min_row - 1][col] is not None:
+        while min_row > 0 and board.occupied(min_row - 1, col):
             min_row -= 1
-        while max_row < 14 and board[max_row + 1][col] is not None:
+        while max_row < 14 and board.occupied(max_row + 1, col):
             max_row += 1
         
-        word = ""
-        for r in range(min_row, max_row + 1):
-            if board[r][col] is not None:
-                word += board[r][col]['letter']
-        
-        return word
+        return "".join(board.letter(r, col) for r in range(min_row, max_row + 1))
 
-    def _calculate_score(self, board: List[List], placed_positions: List[Tuple[int, int]], tiles_played: List[Dict]) -> int:
-        """Calculate score for placed tiles"""
-        score = 0
-        word_multiplier = 1
-        
-        for row, col in placed_positions:
-            tile = board[row][col]
-            letter_value = LETTER_VALUES.get(tile['letter'], 0)
-            
-            # Apply letter multipliers
-            if (row, col) in TRIPLE_LETTER:
-                letter_value *= 3
-            elif (row, col) in DOUBLE_LETTER:
-                letter_value *= 2
-            
-            score += letter_value
-            
-            # Apply word multipliers
-            if (row, col) in TRIPLE_WORD:
-                word_multiplier *= 3
-            elif (row, col) in DOUBLE_WORD:
-                word_multiplier *= 2
+    def _is_valid_word(self, word: str) -> bool:
+        """Check if word exists in dictionary"""
+        return self.lexicon.is_word(word)
+
+
+class AsyncGameService:
+    """GameService for AsyncSession callers, one call per game at a time under an asyncio lock
+
+    Database work runs through run_sync; move validation and a cold lexicon build run in
+    threads, so neither holds up the event loop.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args, lexicon: Optional[Lexicon] = None):
+        def call(session: Session):
+            return getattr(GameService(session, lexicon), method)(*args)
         
-        score *= word_multiplier
+        return await self.db.run_sync(call)
+
+    async def _call(self, game_id: int, method: str, *args, lexicon: Optional[Lexicon] = None):
+        async with game_locks.hold_async(game_id):
+            return await self._run(method, *args, lexicon=lexicon)
+
+    async def create_game(self) -> Game:
+        return await self._run("create_game")
+
+    async def join_game(self, game_id: int, user_id: int) -> Optional[GamePlayer]:
+        return await self._call(game_id, "_join_game", game_id, user_id)
+
+    async def add_bot(self, game_id: int, level: str = "greedy") -> Optional[GamePlayer]:
+        return await self._call(game_id, "_add_bot", game_id, level)
+
+    async def start_game(self, game_id: int) -> bool:
+        return await self._call(game_id, "_start_game", game_id)
+
+    async def make_move(self, game_id: int, user_id: int, tiles_played: List[Dict], is_pass: bool = False, is_exchange: bool = False, exchange_tiles: List[str] = None) -> Tuple[Optional[GameMove], Optional[str]]:
+        lexicon = await get_lexicon_async(self.db)
+        rules = GameService(None, lexicon)
+        loop = asyncio.get_running_loop()
         
-        # Bonus for using all 7 tiles
-        if len(tiles_played) == 7:
-            score += 50
+        def apply_in_thread(*args):
+            # Called inside run_sync: await_only gives the loop back while a thread validates the move
+            return await_only(loop.run_in_executor(None, rules._apply_move, *args))
         
-        return score
+        return await self._call(game_id, "_make_move", game_id, user_id, tiles_played, is_pass, is_exchange, exchange_tiles,
+                                apply_in_thread, lexicon=lexicon)
 
-    def _is_valid_word(self, word: str) -> bool:
-        """Check if word exists in dictionary"""
-        word_upper = word.upper()
-        return self.db.query(Dictionary).filter(Dictionary.word == word_upper).first() is not None
+    async def end_game(self, game_id: int, user_id: int) -> Tuple[bool, Optional[str]]:
+        return await self._call(game_id, "_end_game", game_id, user_id)
@@ -0,0 +1,229 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import Game, GameMove, GamePlayer, GameSnapshot
+from app.services.board import Board
+
+GAME_CACHE_SIZE = int(os.getenv("GAME_CACHE_SIZE", "1000"))
+# Moves between snapshots; the bag is only materialized on the game row when one is taken
+SNAPSHOT_INTERVAL = int(os.getenv("SNAPSHOT_INTERVAL", "20"))
+
+
+class PlayerState:
+    __slots__ = ("seat_id", "user_id", "player_order", "score", "rack", "is_active")
+
+    def __init__(self, seat_id: int, user_id: int, player_order: int, score: int, rack: List[str], is_active: bool):
+        self.seat_id = seat_id
+        self.user_id = user_id
+        self.player_order = player_order
+        self.score = score
+        self.rack = rack
+        self.is_active = is_active
+
+    def copy(self) -> "PlayerState":
+        return PlayerState(self.seat_id, self.user_id, self.player_order, self.score, list(self.rack), self.is_active)
+
+
+class GameState:
+    """Everything move validation needs; cached snapshots are replaced, never mutated"""
+
+    __slots__ = ("game_id", "status", "current_turn", "version", "board", "bag", "players", "snapshot_turn")
+
+    def __init__(self, game_id: int, status: str, current_turn: int, version: int,
+                 board: Board, bag: List[str], players: List[PlayerState], snapshot_turn: Optional[int] = None):
+        self.game_id = game_id
+        self.status = status
+        self.current_turn = current_turn
+        self.version = version
+        self.board = board
+        self.bag = bag
+        self.players = players
+        # Turn of the snapshot the move log replays from; None until the game has one
+        self.snapshot_turn = snapshot_turn
+
+    @classmethod
+    def load(cls, db: Session, game_id: int) -> Optional["GameState"]:
+        """Current state: board and seats from their rows, the bag replayed from the move log"""
+        game = db.query(Game).filter(Game.id == game_id).first()
+        if not game:
+            return None
+        seats = db.query(GamePlayer).filter(GamePlayer.game_id == game_id).order_by(GamePlayer.player_order).all()
+        players = [
+            PlayerState(seat.id, seat.user_id, seat.player_order, seat.score or 0, list(seat.rack or []), seat.is_active)
+            for seat in seats
+        ]
+        state = cls(game.id, game.status, game.current_turn, game.version or 0,
+                    Board.from_bytes(game.board_state), list(game.bag_tiles or []), players)
+        if game.status == "waiting":
+            return state
+
+        snapshot = latest_snapshot(db, game_id, game.current_turn)
+        if snapshot is None:
+            # Started before moves were logged: the row is current; the next write takes the first snapshot
+            return state
+
+        state.snapshot_turn = snapshot.move_number
+        state.bag = list(snapshot.bag_tiles)
+        logged = db.query(GameMove.tiles_drawn, GameMove.tiles_returned).filter(
+            GameMove.game_id == game_id, GameMove.move_number >= snapshot.move_number
+        ).order_by(GameMove.move_number).all()
+        for drawn, returned in logged:
+            for tile in drawn or []:
+                state.bag.remove(tile)
+            state.bag.extend(returned or [])
+        return state
+
+    def copy(self) -> "GameState":
+        return GameState(self.game_id, self.status, self.current_turn, self.version,
+                         self.board.copy(), list(self.bag), [player.copy() for player in self.players], self.snapshot_turn)
+
+    def player(self, user_id: int) -> Optional[PlayerState]:
+        return next((player for player in self.players if player.user_id == user_id), None)
+
+    def player_to_move(self) -> Optional[PlayerState]:
+        if not self.players:
+            return None
+        return self.players[self.current_turn % len(self.players)]
+
+
+def latest_snapshot(db: Session, game_id: int, move_number: int) -> Optional[GameSnapshot]:
+    return db.query(GameSnapshot).filter(
+        GameSnapshot.game_id == game_id, GameSnapshot.move_number <= move_number
+    ).order_by(GameSnapshot.move_number.desc()).first()
+
+
+def take_snapshot(state: GameState) -> GameSnapshot:
+    return GameSnapshot(
+        game_id=state.game_id,
+        move_number=state.current_turn,
+        board_state=state.board.to_bytes(),
+        bag_tiles=list(state.bag),
+        racks=[list(player.rack) for player in state.players],
+        scores=[player.score for player in state.players]
+    )
+
+
+def apply_logged_move(state: GameState, move: GameMove) -> None:
+    """Advance a replayed state by one move of the log"""
+    player = state.player(move.user_id)
+    for tile in move.tiles_played or []:
+        state.board.place(tile['row'], tile['col'], tile['letter'], tile.get('is_blank', False))
+        player.rack.remove('_' if tile.get('is_blank') else tile['letter'])
+    for tile in move.tiles_returned or []:
+        player.rack.remove(tile)
+    # Replacements are drawn before exchanged tiles go back into the bag
+    for tile in move.tiles_drawn or []:
+        state.bag.remove(tile)
+        player.rack.append(tile)
+    state.bag.extend(move.tiles_returned or [])
+    player.score += move.score or 0
+    state.current_turn = move.move_number + 1
+
+
+def replay(db: Session, game_id: int, move_number: int) -> Optional[GameState]:
+    """Rebuild the game as it stood after move_number moves, from the nearest snapshot"""
+    game = db.query(Game).filter(Game.id == game_id).first()
+    snapshot = latest_snapshot(db, game_id, move_number) if game else None
+    if snapshot is None:
+        return None
+    seats = db.query(GamePlayer).filter(GamePlayer.game_id == game_id).order_by(GamePlayer.player_order).all()
+    players = [
+        PlayerState(seat.id, seat.user_id, seat.player_order, snapshot.scores[i], list(snapshot.racks[i]), seat.is_active)
+        for i, seat in enumerate(seats)
+    ]
+    state = GameState(game_id, "active", snapshot.move_number, 0,
+                      Board.from_bytes(snapshot.board_state), list(snapshot.bag_tiles), players)
+    moves = db.query(GameMove).filter(
+        GameMove.game_id == game_id,
+        GameMove.move_number >= snapshot.move_number,
+        GameMove.move_number < move_number
+    ).order_by(GameMove.move_number).all()
+    for move in moves:
+        apply_logged_move(state, move)
+    if game.status == "finished" and state.current_turn >= game.current_turn:
+        state.status = "finished"
+    return state
+
+
+def save_state(db: Session, state: GameState, expected_version: int, player: PlayerState, board_changed: bool) -> bool:
+    """Write a move's changes if nobody else changed the game first; False on a version conflict
+
+    The move row is the record of what happened. Besides it only the turn, the
+    225-byte board and the mover's seat are written, plus a snapshot (and the bag)
+    every SNAPSHOT_INTERVAL moves, when the game ends and on the first write to a game that has none.
+    """
+    values = {"current_turn": state.current_turn, "status": state.status, "version": state.version}
+    if board_changed:
+        values["board_state"] = state.board.to_bytes()
+    snapshot = state.current_turn % SNAPSHOT_INTERVAL == 0 or state.status != "active" or state.snapshot_turn is None
+    if snapshot:
+        values["bag_tiles"] = list(state.bag)
+    result = db.execute(
+        update(Game).where(Game.id == state.game_id, Game.version == expected_version).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    db.execute(
+        update(GamePlayer).where(GamePlayer.id == player.seat_id).values(score=player.score, rack=player.rack)
+        .execution_options(synchronize_session=False)
+    )
+    if snapshot:
+        db.add(take_snapshot(state))
+        state.snapshot_turn = state.current_turn
+    return True
+
+
+class GameStateCache:
+    """Per-process LRU of game states; the version column arbitrates between workers"""
+
+    def __init__(self, capacity: int = GAME_CACHE_SIZE):
+        self.capacity = capacity
+        self._states: "OrderedDict[int, GameState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, game_id: int) -> Optional[GameState]:
+        with self._lock:
+            state = self._states.get(game_id)
+            if state is not None:
+                self._states.move_to_end(game_id)
+            return state
+
+    def load(self, db: Session, game_id: int) -> Optional[GameState]:
+        """Cached state, reading it from the database on a miss"""
+        state = self.get(game_id)
+        if state is None:
+            state = GameState.load(db, game_id)
+            if state is not None:
+                self.put(state)
+        return state
+
+    def put(self, state: GameState) -> None:
+        with self._lock:
+            current = self._states.get(state.game_id)
+            # Never replace a newer snapshot stored by a concurrent request
+            if current is not None and current.version > state.version:
+                return
+            self._states[state.game_id] = state
+            self._states.move_to_end(state.game_id)
+            while len(self._states) > self.capacity:
+                self._states.popitem(last=False)
+
+    def evict(self, game_id: int) -> None:
+        with self._lock:
+            self._states.pop(game_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+game_states = GameStateCache()
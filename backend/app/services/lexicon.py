@@ -0,0 +1,363 @@
+import asyncio
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import Dictionary
+
+# Packed DAWG layout
+# Every edge takes two unsigned 32-bit slots of one flat array:
+#   slot 0: (letter_index << 2) | TERMINAL (a word ends after this edge) | LAST (final edge of its node)
+#   slot 1: edge index of the target node, 0 when the target has no outgoing edges
+# A node is the run of edges starting at its index. Edge 0 is a sentinel so that
+# index 0 can mean "no children". The forward graph answers membership and prefix
+# queries; a second graph over reversed words answers suffix queries.
+TERMINAL = 0b10
+LAST = 0b01
+
+# Binary lexicon file: fixed header, UTF-8 alphabet padded to 4 bytes, then the
+# little-endian edge array. The file is mapped read-only so every worker process
+# shares the same physical pages.
+LEXICON_MAGIC = b"SCRLEX01"
+_HEADER = struct.Struct("<8sIIIII")  # magic, word_count, root, reverse_root, edge_slots, alphabet_bytes
+
+LEXICON_PATH = os.getenv("LEXICON_PATH")
+
+
+def normalize_word(word: str) -> str:
+    """Normalize a word the way it is stored in the dictionary table"""
+    return word.strip().upper()
+
+
+class _BuildNode:
+    __slots__ = ("edges", "final")
+
+    def __init__(self):
+        self.edges: Dict[str, "_BuildNode"] = {}
+        self.final = False
+
+
+class DawgBuilder:
+    """Build a minimal DAWG incrementally from words supplied in sorted order"""
+
+    def __init__(self):
+        self.root = _BuildNode()
+        self.word_count = 0
+        self._register: Dict[tuple, _BuildNode] = {}
+        self._unchecked: List[Tuple[_BuildNode, str, _BuildNode]] = []
+        self._previous = ""
+
+    def add(self, word: str) -> None:
+        """Add a word; words must arrive in ascending order, duplicates are ignored"""
+        if not word or word == self._previous:
+            return
+        if word < self._previous:
+            raise ValueError(f"Words must be added in sorted order: {word!r} after {self._previous!r}")
+
+        common = 0
+        for a, b in zip(word, self._previous):
+            if a != b:
+                break
+            common += 1
+
+        self._minimize(common)
+        node = self._unchecked[-1][2] if self._unchecked else self.root
+        for letter in word[common:]:
+            child = _BuildNode()
+            node.edges[letter] = child
+            self._unchecked.append((node, letter, child))
+            node = child
+        node.final = True
+        self._previous = word
+        self.word_count += 1
+
+    def finish(self) -> _BuildNode:
+        """Minimize the remaining path and return the root node"""
+        self._minimize(0)
+        return self.root
+
+    def _minimize(self, down_to: int) -> None:
+        while len(self._unchecked) > down_to:
+            parent, letter, child = self._unchecked.pop()
+            key = (child.final, tuple((l, id(n)) for l, n in sorted(child.edges.items())))
+            existing = self._register.get(key)
+            if existing is not None:
+                parent.edges[letter] = existing
+            else:
+                self._register[key] = child
+
+
+def _pack(roots: List[_BuildNode], alphabet: str) -> Tuple[array, List[int]]:
+    """Flatten build graphs into the packed edge array, returning it with the root offsets"""
+    letter_index = {letter: i for i, letter in enumerate(alphabet)}
+    offsets: Dict[int, int] = {}
+    order: List[_BuildNode] = []
+    next_edge = 1  # edge 0 is the sentinel
+
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if not node.edges or id(node) in offsets:
+            continue
+        offsets[id(node)] = next_edge
+        next_edge += len(node.edges)
+        order.append(node)
+        stack.extend(node.edges.values())
+
+    edges = array("I", bytes(8 * next_edge))
+    for node in order:
+        position = offsets[id(node)]
+        items = sorted(node.edges.items())
+        for i, (letter, child) in enumerate(items):
+            flags = (TERMINAL if child.final else 0) | (LAST if i == len(items) - 1 else 0)
+            edges[2 * position] = (letter_index[letter] << 2) | flags
+            edges[2 * position + 1] = offsets.get(id(child), 0)
+            position += 1
+
+    return edges, [offsets.get(id(root), 0) for root in roots]
+
+
+class Lexicon:
+    """Read-only word graph with membership, prefix and suffix queries"""
+
+    def __init__(self, edges: Sequence[int], alphabet: str, root: int, reverse_root: int, word_count: int, buffer=None):
+        self._edges = edges
+        self._buffer = buffer  # keeps the memory map alive for mapped lexicons
+        self.alphabet = alphabet
+        self._letter_index = {letter: i for i, letter in enumerate(alphabet)}
+        self.root = root
+        self.reverse_root = reverse_root
+        self.word_count = word_count
+        self._edge_lists: Dict[int, Tuple[Tuple[str, bool, int], ...]] = {}
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "Lexicon":
+        """Build a lexicon from any iterable of words"""
+        unique = sorted({normalize_word(w) for w in words if w and w.strip()})
+        return cls.from_sorted(unique, sorted(w[::-1] for w in unique))
+
+    @classmethod
+    def from_sorted(cls, words: Iterable[str], reversed_words: Iterable[str]) -> "Lexicon":
+        """Build from normalized words in ascending order and, separately, their reversals in ascending order
+
+        Both inputs are consumed once, so they can be streams merged from sorted runs on disk.
+        """
+        forward = DawgBuilder()
+        letters = set()
+        for word in words:
+            forward.add(word)
+            letters.update(word)
+        reverse = DawgBuilder()
+        for word in reversed_words:
+            reverse.add(word)
+
+        alphabet = "".join(sorted(letters))
+        edges, (root, reverse_root) = _pack([forward.finish(), reverse.finish()], alphabet)
+        return cls(edges, alphabet, root, reverse_root, forward.word_count)
+
+    @classmethod
+    def from_db(cls, db: Session) -> "Lexicon":
+        """Load every word of the dictionary table in a single query"""
+        rows = db.query(Dictionary.word).yield_per(10000)
+        return cls.from_words(word for (word,) in rows)
+
+    @classmethod
+    def from_buffer(cls, buffer, keep_alive=None) -> "Lexicon":
+        """Wrap a serialized lexicon without copying the edge array"""
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("Lexicon file is truncated")
+        magic, word_count, root, reverse_root, edge_slots, alphabet_bytes = _HEADER.unpack_from(view)
+        if magic != LEXICON_MAGIC:
+            raise ValueError("Not a lexicon file")
+
+        alphabet_start = _HEADER.size
+        edges_start = alphabet_start + alphabet_bytes + (-alphabet_bytes % 4)
+        if len(view) < edges_start + 4 * edge_slots:
+            raise ValueError("Lexicon file is truncated")
+        alphabet = bytes(view[alphabet_start:alphabet_start + alphabet_bytes]).decode("utf-8")
+
+        edges_view = view[edges_start:edges_start + 4 * edge_slots]
+        if sys.byteorder == "little":
+            edges = edges_view.cast("I")
+        else:
+            edges = array("I", edges_view.tobytes())
+            edges.byteswap()
+        return cls(edges, alphabet, root, reverse_root, word_count, buffer=keep_alive)
+
+    @classmethod
+    def load(cls, path: str) -> "Lexicon":
+        """Map a compiled lexicon file read-only; loading cost does not depend on its size"""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(mapped, keep_alive=mapped)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the lexicon into the binary file format"""
+        alphabet = self.alphabet.encode("utf-8")
+        edges = array("I", self._edges)
+        if sys.byteorder != "little":
+            edges.byteswap()
+        header = _HEADER.pack(LEXICON_MAGIC, self.word_count, self.root, self.reverse_root, len(edges), len(alphabet))
+        return header + alphabet + bytes(-len(alphabet) % 4) + edges.tobytes()
+
+    def save(self, path: str) -> None:
+        """Write the lexicon file atomically so running workers never map a partial file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    def __contains__(self, word: str) -> bool:
+        return self.is_word(word)
+
+    def edges(self, node: int) -> Iterator[Tuple[str, bool, int]]:
+        """Yield (letter, terminal, target) for every outgoing edge of a node"""
+        if not node:
+            return
+        edges = self._edges
+        alphabet = self.alphabet
+        i = 2 * node
+        while True:
+            label = edges[i]
+            yield alphabet[label >> 2], bool(label & TERMINAL), edges[i + 1]
+            if label & LAST:
+                return
+            i += 2
+
+    def edge_list(self, node: int) -> Tuple[Tuple[str, bool, int], ...]:
+        """Memoized tuple form of edges() for hot loops such as move generation"""
+        cached = self._edge_lists.get(node)
+        if cached is None:
+            cached = self._edge_lists[node] = tuple(self.edges(node))
+        return cached
+
+    def child(self, node: int, letter: str) -> Optional[Tuple[int, bool]]:
+        """Follow the edge labelled `letter`, returning (target, terminal) or None"""
+        index = self._letter_index.get(letter)
+        if index is None or not node:
+            return None
+        edges = self._edges
+        i = 2 * node
+        while True:
+            label = edges[i]
+            if label >> 2 == index:
+                return edges[i + 1], bool(label & TERMINAL)
+            if label & LAST:
+                return None
+            i += 2
+
+    def walk(self, node: int, letters: str) -> Optional[Tuple[int, bool]]:
+        """Follow a path of letters from a node, returning (target, terminal) or None"""
+        terminal = False
+        for letter in letters:
+            step = self.child(node, letter)
+            if step is None:
+                return None
+            node, terminal = step
+        return node, terminal
+
+    def is_word(self, word: str) -> bool:
+        """Check whether the exact word is in the lexicon"""
+        word = normalize_word(word)
+        if not word:
+            return False
+        step = self.walk(self.root, word)
+        return step is not None and step[1]
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Check whether any word starts with the prefix"""
+        return self.walk(self.root, normalize_word(prefix)) is not None
+
+    def has_suffix(self, suffix: str) -> bool:
+        """Check whether any word ends with the suffix"""
+        return self.walk(self.reverse_root, normalize_word(suffix)[::-1]) is not None
+
+    def words_with_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """List words starting with the prefix in alphabetical order"""
+        prefix = normalize_word(prefix)
+        return [prefix + rest for rest in self._complete(self.root, prefix, limit)]
+
+    def words_with_suffix(self, suffix: str, limit: Optional[int] = None) -> List[str]:
+        """List words ending with the suffix"""
+        suffix = normalize_word(suffix)
+        return [rest[::-1] + suffix for rest in self._complete(self.reverse_root, suffix[::-1], limit)]
+
+    def _complete(self, root: int, start: str, limit: Optional[int]) -> List[str]:
+        if start:
+            step = self.walk(root, start)
+            if step is None:
+                return []
+            node, terminal = step
+        else:
+            node, terminal = root, False
+
+        results = [""] if terminal else []
+        # Depth-first over edges in label order yields words alphabetically
+        stack = [(target, letter, is_terminal) for letter, is_terminal, target in reversed(list(self.edges(node)))]
+        while stack and (limit is None or len(results) < limit):
+            node, path, terminal = stack.pop()
+            if terminal:
+                results.append(path)
+            stack.extend(
+                (target, path + letter, is_terminal)
+                for letter, is_terminal, target in reversed(list(self.edges(node)))
+            )
+        return results[:limit] if limit is not None else results
+
+
+_lexicon: Optional[Lexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon(db: Session) -> Lexicon:
+    """Return the process-wide lexicon, mapping the compiled file or falling back to the database"""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                if LEXICON_PATH and os.path.exists(LEXICON_PATH):
+                    _lexicon = Lexicon.load(LEXICON_PATH)
+                else:
+                    _lexicon = Lexicon.from_db(db)
+    return _lexicon
+
+
+async def get_lexicon_async(db: AsyncSession) -> Lexicon:
+    """get_lexicon for the event loop: the words are read through db, while mapping or building runs in a thread"""
+    global _lexicon
+    if _lexicon is not None:
+        return _lexicon
+    loop = asyncio.get_running_loop()
+    if LEXICON_PATH and os.path.exists(LEXICON_PATH):
+        lexicon = await loop.run_in_executor(None, Lexicon.load, LEXICON_PATH)
+    else:
+        words = (await db.execute(select(Dictionary.word))).scalars().all()
+        lexicon = await loop.run_in_executor(None, Lexicon.from_words, words)
+    with _lexicon_lock:
+        # Concurrent cold callers may each build one; everybody keeps the first
+        if _lexicon is None:
+            _lexicon = lexicon
+        return _lexicon
+
+
+def set_lexicon(lexicon: Optional[Lexicon]) -> None:
+    """Replace the process-wide lexicon (e.g. after the dictionary was reloaded)"""
+    global _lexicon
+    with _lexicon_lock:
+        _lexicon = lexicon
+
+
+def invalidate_lexicon() -> None:
+    """Drop the cached lexicon so the next lookup reloads it"""
+    set_lexicon(None)
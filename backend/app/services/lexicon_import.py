@@ -0,0 +1,201 @@
+import heapq
+import io
+import os
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, delete, insert, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.models import Dictionary
+from app.services.broadcast import get_broadcast
+from app.services.lexicon import Lexicon, invalidate_lexicon, normalize_word
+from app.services.scoring import LETTER_VALUES
+
+# Words held in memory at once while sorting and loading
+IMPORT_CHUNK_SIZE = int(os.getenv("LEXICON_IMPORT_CHUNK_SIZE", "200000"))
+MAX_WORD_LENGTH = 15
+LETTERS = frozenset(LETTER_VALUES) - {"_"}
+LEXICON_CHANNEL = "lexicon"
+
+DICTIONARY_TABLE = Dictionary.__tablename__
+STAGING_TABLE = f"{DICTIONARY_TABLE}_import"
+
+
+class ImportReport:
+    def __init__(self):
+        self.lines = 0
+        self.rejected = 0
+        self.loaded = 0
+        self.runs = 0
+
+    def __str__(self) -> str:
+        return f"{self.loaded} words from {self.lines} lines ({self.rejected} rejected, {self.runs} sorted runs)"
+
+
+def clean_words(lines: Iterable[str], report: ImportReport) -> Iterator[str]:
+    """Normalized words that can be played: board-sized and spelled with tile letters"""
+    for line in lines:
+        report.lines += 1
+        word = normalize_word(line)
+        if not word or word.startswith("#"):
+            continue
+        if len(word) < 2 or len(word) > MAX_WORD_LENGTH or not LETTERS.issuperset(word):
+            report.rejected += 1
+            continue
+        yield word
+
+
+def _write_run(words: List[str], directory: str) -> str:
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines(word + "\n" for word in words)
+    return path
+
+
+def sorted_runs(words: Iterable[str], directory: str, chunk_size: int, report: ImportReport):
+    """Split the stream into sorted, deduplicated runs on disk, for words and for their reversals"""
+    forward, reverse = [], []
+    chunk = set()
+    for word in words:
+        chunk.add(word)
+        if len(chunk) >= chunk_size:
+            forward.append(_write_run(sorted(chunk), directory))
+            reverse.append(_write_run(sorted(w[::-1] for w in chunk), directory))
+            chunk = set()
+    if chunk or not forward:
+        forward.append(_write_run(sorted(chunk), directory))
+        reverse.append(_write_run(sorted(w[::-1] for w in chunk), directory))
+    report.runs = len(forward)
+    return forward, reverse
+
+
+def merge_runs(paths: List[str]) -> Iterator[str]:
+    """One ascending stream without duplicates across runs"""
+    files = [open(path, encoding="utf-8") for path in paths]
+    try:
+        previous = None
+        for line in heapq.merge(*files):
+            word = line.rstrip("\n")
+            if word != previous:
+                yield word
+                previous = word
+    finally:
+        for f in files:
+            f.close()
+
+
+class DictionaryLoader:
+    """Fills the dictionary in chunks: COPY into a staging table swapped in on PostgreSQL,
+    executemany inside one replacing transaction elsewhere"""
+
+    def __init__(self, conn: Connection, language: str):
+        self.conn = conn
+        self.language = language
+        self.postgres = conn.dialect.name == "postgresql"
+        self.staging = Table(
+            STAGING_TABLE, MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("word", String(15), nullable=False),
+            Column("language", String(10))
+        )
+
+    def begin(self) -> None:
+        if self.postgres:
+            self.staging.drop(self.conn, checkfirst=True)
+            # Indexes are built after the load, which is much faster than maintaining them per row
+            self.staging.create(self.conn)
+        else:
+            self.conn.execute(delete(Dictionary))
+
+    def load(self, words: List[str]) -> None:
+        if self.postgres:
+            buffer = io.StringIO("".join(f"{word}\t{self.language}\n" for word in words))
+            cursor = self.conn.connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY {STAGING_TABLE} (word, language) FROM STDIN", buffer)
+            finally:
+                cursor.close()
+        else:
+            self.conn.execute(insert(Dictionary), [{"word": word, "language": self.language} for word in words])
+
+    def finish(self) -> None:
+        """Make the new word list visible in one step"""
+        if not self.postgres:
+            self.conn.commit()
+            return
+        for column in ("id", "word"):
+            unique = "UNIQUE " if column == "word" else ""
+            self.conn.execute(text(f"CREATE {unique}INDEX ix_{STAGING_TABLE}_{column} ON {STAGING_TABLE} ({column})"))
+        self.conn.execute(text(f"ANALYZE {STAGING_TABLE}"))
+        self.conn.commit()
+
+        # Readers block only for the renames; they see either the old or the new list
+        self.conn.execute(text(f"ALTER TABLE {DICTIONARY_TABLE} RENAME TO {DICTIONARY_TABLE}_old"))
+        self.conn.execute(text(f"ALTER TABLE {STAGING_TABLE} RENAME TO {DICTIONARY_TABLE}"))
+        self.conn.execute(text(f"DROP TABLE {DICTIONARY_TABLE}_old"))
+        # Take over the names the model expects so the next import can stage under the old ones
+        for column in ("id", "word"):
+            self.conn.execute(text(f"ALTER INDEX ix_{STAGING_TABLE}_{column} RENAME TO ix_{DICTIONARY_TABLE}_{column}"))
+        self.conn.execute(text(f"ALTER TABLE {DICTIONARY_TABLE} RENAME CONSTRAINT {STAGING_TABLE}_pkey TO {DICTIONARY_TABLE}_pkey"))
+        self.conn.execute(text(f"ALTER SEQUENCE {STAGING_TABLE}_id_seq RENAME TO {DICTIONARY_TABLE}_id_seq"))
+        self.conn.commit()
+
+
+def import_lexicon(engine: Engine, path: str, language: str = "PL", output: Optional[str] = None,
+                   chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Replace the dictionary with a UTF-8 word list and compile the binary lexicon in the same pass
+
+    Memory stays at about one chunk: words are sorted into runs on disk, and the
+    merged stream feeds the database load and the DAWG builder together.
+    """
+    report = ImportReport()
+    with tempfile.TemporaryDirectory() as directory:
+        with open(path, encoding="utf-8") as f:
+            forward, reverse = sorted_runs(clean_words(f, report), directory, chunk_size, report)
+
+        with engine.connect() as conn:
+            loader = DictionaryLoader(conn, language)
+            loader.begin()
+
+            def loading(words: Iterator[str]) -> Iterator[str]:
+                chunk = []
+                for word in words:
+                    chunk.append(word)
+                    yield word
+                    if len(chunk) >= chunk_size:
+                        loader.load(chunk)
+                        report.loaded += len(chunk)
+                        chunk = []
+                if chunk:
+                    loader.load(chunk)
+                    report.loaded += len(chunk)
+
+            lexicon = Lexicon.from_sorted(loading(merge_runs(forward)), merge_runs(reverse))
+            loader.finish()
+
+    if output:
+        lexicon.save(output)
+    return report
+
+
+async def announce() -> bool:
+    """Tell every API worker to drop its lexicon and load the new one; False when no worker can hear it"""
+    backend = get_broadcast()
+    if not backend.shared:
+        return False
+    await backend.connect()
+    try:
+        await backend.publish(LEXICON_CHANNEL, "reload")
+    finally:
+        await backend.disconnect()
+    return True
+
+
+async def _on_reload(channel: str, message: str) -> None:
+    invalidate_lexicon()
+
+
+async def listen() -> None:
+    """Reload the lexicon when an import finishes anywhere (called at startup)"""
+    await get_broadcast().subscribe(LEXICON_CHANNEL, _on_reload)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Game, GamePlayer, User
+from app.services import events
+from app.services.broadcast import get_broadcast
+
+# Moves do not invalidate the lobby, so this bounds how stale its turns and scores get
+LOBBY_CACHE_TTL = float(os.getenv("LOBBY_CACHE_TTL", "30"))
+LOBBY_CHANNEL = "lobby"
+# Game events that change which games the lobby lists or who sits in them
+LOBBY_EVENTS = frozenset({"created", "join", "start", "finish"})
+
+
+def build_lobby(db: Session, statuses: Sequence[str], limit: int, offset: int) -> List[Dict]:
+    """Lobby projection: status, seats and scores without boards or bags, in two queries"""
+    games = db.query(
+        Game.id, Game.status, Game.current_turn, Game.version, Game.created_at
+    ).filter(
+        Game.status.in_(statuses)
+    ).order_by(Game.created_at.desc(), Game.id.desc()).offset(offset).limit(limit).all()
+
+    players: Dict[int, List[Dict]] = {game.id: [] for game in games}
+    if players:
+        seats = db.query(
+            GamePlayer.game_id, GamePlayer.user_id, GamePlayer.score,
+            GamePlayer.player_order, GamePlayer.is_active, User.username
+        ).join(User, User.id == GamePlayer.user_id).filter(
+            GamePlayer.game_id.in_(list(players))
+        ).order_by(GamePlayer.game_id, GamePlayer.player_order).all()
+        for seat in seats:
+            players[seat.game_id].append({
+                "id": seat.user_id,
+                "username": seat.username,
+                "score": seat.score,
+                "player_order": seat.player_order,
+                "is_active": seat.is_active
+            })
+
+    return [
+        {
+            "id": game.id,
+            "status": game.status,
+            "current_turn": game.current_turn,
+            "version": game.version,
+            "players": players[game.id],
+            "created_at": game.created_at.isoformat()
+        }
+        for game in games
+    ]
+
+
+class LobbyCache:
+    """Serialized lobby pages with their ETags, dropped whenever a game is created, joined, started or finished"""
+
+    def __init__(self, ttl: float = LOBBY_CACHE_TTL):
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: Dict[Tuple, Tuple[str, bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    async def get_or_build(self, key: Tuple, build: Callable[[], Awaitable[List[Dict]]]) -> Tuple[str, bytes]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > now:
+                return entry[0], entry[1]
+            generation = self.generation
+
+        body = json.dumps(await build(), separators=(",", ":")).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        with self._lock:
+            # A game changed while the page was being built; serve it but do not keep it
+            if generation == self.generation:
+                self._entries[key] = (etag, body, now + self.ttl)
+        return etag, body
+
+
+lobby_cache = LobbyCache()
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison as used for If-None-Match"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+async def _announce_change(game_id: int, event: Dict) -> None:
+    # The worker that made the change already invalidated itself; tell the others
+    if event.get("type") in LOBBY_EVENTS:
+        await get_broadcast().publish(LOBBY_CHANNEL, str(game_id))
+
+
+async def _on_remote_change(channel: str, message: str) -> None:
+    lobby_cache.invalidate()
+
+
+events.subscribe(_announce_change)
+
+
+async def listen() -> None:
+    """Invalidate this worker's lobby cache when any worker changes a game (called at startup)"""
+    await get_broadcast().subscribe(LOBBY_CHANNEL, _on_remote_change)
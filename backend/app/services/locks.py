@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List
+
+
+class GameLocks:
+    """Per-game locks within this process, dropped once nobody holds or waits for them
+
+    Sync callers (threadpool handlers, scripts) take a re-entrant threading lock. Async
+    callers queue on an asyncio lock instead, since waiting on a threading lock would
+    stall the event loop. The two kinds do not exclude each other: as across processes,
+    the version column decides between them.
+    """
+
+    def __init__(self):
+        self._locks: Dict[int, List] = {}
+        self._async_locks: Dict[int, List] = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hold(self, game_id: int) -> Iterator[None]:
+        entry = self._acquire_entry(self._locks, game_id, threading.RLock)
+        try:
+            with entry[0]:
+                yield
+        finally:
+            self._release_entry(self._locks, game_id, entry)
+
+    @asynccontextmanager
+    async def hold_async(self, game_id: int) -> AsyncIterator[None]:
+        entry = self._acquire_entry(self._async_locks, game_id, asyncio.Lock)
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            self._release_entry(self._async_locks, game_id, entry)
+
+    def _acquire_entry(self, locks: Dict[int, List], game_id: int, factory) -> List:
+        with self._guard:
+            entry = locks.get(game_id)
+            if entry is None:
+                entry = locks[game_id] = [factory(), 0]
+            entry[1] += 1
+            return entry
+
+    def _release_entry(self, locks: Dict[int, List], game_id: int, entry: List) -> None:
+        with self._guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del locks[game_id]
+
+    def __len__(self) -> int:
+        return len(self._locks) + len(self._async_locks)
+
+
+game_locks = GameLocks()
@@ -0,0 +1,31 @@
+from collections import deque
+from typing import Dict
+
+# Samples kept per window; percentiles describe recent behaviour rather than all time
+WINDOW_SIZE = 1024
+
+
+class LatencyWindow:
+    """Rolling window of recent latency samples, in seconds"""
+
+    def __init__(self, size: int = WINDOW_SIZE):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(max(self.samples, default=0.0) * 1000, 3),
+        }
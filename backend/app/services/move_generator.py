@@ -0,0 +1,201 @@
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from app.services.board import Board
+from app.services.lexicon import Lexicon
+from app.services.scoring import LETTER_VALUES, score_moves
+
+BOARD_SIZE = 15
+CENTER = 7
+BLANK = '_'
+RACK_SIZE = 7
+
+# Letters a blank may stand for: every real tile letter
+TILE_LETTERS = frozenset(letter for letter in LETTER_VALUES if letter != BLANK)
+
+
+class MoveGenerator:
+    """Enumerate every legal play for a rack using anchors and cross-checks (Appel & Jacobson)"""
+
+    def __init__(self, lexicon: Lexicon):
+        self.lexicon = lexicon
+
+    def generate(self, board: Board, rack: Sequence[str], limit: Optional[int] = None) -> List[Dict]:
+        """Return legal moves as {'word', 'score', 'tiles'} dicts, best score first"""
+        grid = board.letter_rows()
+        rack_counts = Counter(rack)
+        left_parts = self._left_parts(rack_counts)
+        moves: Dict[frozenset, Dict] = {}
+
+        for transposed in (False, True):
+            rows = [list(column) for column in zip(*grid)] if transposed else grid
+            cross_checks = self._cross_checks(rows)
+            anchors = self._anchors(rows, board.is_empty())
+            for r in range(BOARD_SIZE):
+                if anchors[r]:
+                    self._generate_row(r, rows[r], cross_checks[r], anchors[r], rack_counts, left_parts, transposed, moves)
+
+        ranked = list(moves.values())
+        for move, score in zip(ranked, score_moves(board, [move['tiles'] for move in ranked])):
+            move['score'] = score
+        ranked.sort(key=lambda move: (-move['score'], move['word']))
+        return ranked[:limit] if limit is not None else ranked
+
+    def _anchors(self, rows: List[List[Optional[str]]], empty: bool) -> List[List[int]]:
+        """Empty squares next to a tile; only the centre square on an empty board"""
+        anchors = [[] for _ in range(BOARD_SIZE)]
+        if empty:
+            anchors[CENTER].append(CENTER)
+            return anchors
+
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                if rows[r][c] is not None:
+                    continue
+                if ((r > 0 and rows[r - 1][c] is not None) or
+                        (r < BOARD_SIZE - 1 and rows[r + 1][c] is not None) or
+                        (c > 0 and rows[r][c - 1] is not None) or
+                        (c < BOARD_SIZE - 1 and rows[r][c + 1] is not None)):
+                    anchors[r].append(c)
+        return anchors
+
+    def _cross_checks(self, rows: List[List[Optional[str]]]) -> List[List[Optional[FrozenSet[str]]]]:
+        """Letters allowed on each empty square by the perpendicular word; None means unconstrained"""
+        lexicon = self.lexicon
+        checks: List[List[Optional[FrozenSet[str]]]] = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                if rows[r][c] is not None:
+                    continue
+                top = r
+                while top > 0 and rows[top - 1][c] is not None:
+                    top -= 1
+                bottom = r
+                while bottom < BOARD_SIZE - 1 and rows[bottom + 1][c] is not None:
+                    bottom += 1
+                if top == r and bottom == r:
+                    continue
+
+                above = ''.join(rows[i][c] for i in range(top, r))
+                below = ''.join(rows[i][c] for i in range(r + 1, bottom + 1))
+                allowed = set()
+                step = lexicon.walk(lexicon.root, above)
+                if step is not None:
+                    for letter, terminal, target in lexicon.edges(step[0]):
+                        if not below:
+                            if terminal:
+                                allowed.add(letter)
+                            continue
+                        rest = lexicon.walk(target, below)
+                        if rest is not None and rest[1]:
+                            allowed.add(letter)
+                checks[r][c] = frozenset(allowed & TILE_LETTERS)
+        return checks
+
+    def _left_parts(self, rack: Counter) -> List[tuple]:
+        """Every rack-only prefix that can still grow, as (node, letters, rack keys used, next letters)
+
+        Left parts only ever cover empty squares without neighbours, so they do not
+        depend on the anchor and are enumerated once per rack instead of per anchor.
+        """
+        lexicon = self.lexicon
+        parts = []
+
+        def grow(node: int, left: List[Tuple[str, bool]], used: List[str]) -> None:
+            next_letters = frozenset(letter for letter, _, _ in lexicon.edge_list(node))
+            parts.append((node, tuple(left), tuple(used), next_letters))
+            if len(left) == RACK_SIZE - 1:
+                return
+            for letter, _, target in lexicon.edge_list(node):
+                if not target or letter not in TILE_LETTERS:
+                    continue
+                for key, is_blank in ((letter, False), (BLANK, True)):
+                    if rack[key] > 0:
+                        rack[key] -= 1
+                        left.append((letter, is_blank))
+                        used.append(key)
+                        grow(target, left, used)
+                        used.pop()
+                        left.pop()
+                        rack[key] += 1
+
+        grow(lexicon.root, [], [])
+        return parts
+
+    def _generate_row(self, r: int, row: List[Optional[str]], checks: List[Optional[FrozenSet[str]]],
+                      anchors: List[int], rack: Counter, left_parts: list, transposed: bool,
+                      moves: Dict[frozenset, Dict]) -> None:
+        lexicon = self.lexicon
+        anchor_set = set(anchors)
+
+        def record(placed: List[tuple], end: int) -> None:
+            start = min(col for col, _, _ in placed)
+            while start > 0 and row[start - 1] is not None:
+                start -= 1
+            if end - start < 2:
+                return  # a lone tile is only a play through its perpendicular word
+            tiles = []
+            for col, letter, is_blank in placed:
+                row_index, col_index = (col, r) if transposed else (r, col)
+                tiles.append({'letter': letter, 'row': row_index, 'col': col_index, 'is_blank': is_blank})
+            key = frozenset((t['row'], t['col'], t['letter'], t['is_blank']) for t in tiles)
+            if key not in moves:
+                new_letters = {col: letter for col, letter, _ in placed}
+                word = ''.join(row[c] if row[c] is not None else new_letters[c] for c in range(start, end))
+                moves[key] = {'word': word, 'tiles': tiles, 'score': 0}
+
+        def extend_right(col: int, node: int, terminal: bool, anchor: int, placed: List[tuple]) -> None:
+            if col < BOARD_SIZE and row[col] is not None:
+                step = lexicon.child(node, row[col])
+                if step is not None:
+                    extend_right(col + 1, step[0], step[1], anchor, placed)
+                return
+
+            if terminal and col > anchor and placed:
+                record(placed, col)
+            if col >= BOARD_SIZE:
+                return
+
+            allowed = checks[col]
+            for letter, is_terminal, target in lexicon.edge_list(node):
+                if letter not in TILE_LETTERS or (allowed is not None and letter not in allowed):
+                    continue
+                if rack[letter] > 0:
+                    rack[letter] -= 1
+                    placed.append((col, letter, False))
+                    extend_right(col + 1, target, is_terminal, anchor, placed)
+                    placed.pop()
+                    rack[letter] += 1
+                if rack[BLANK] > 0:
+                    rack[BLANK] -= 1
+                    placed.append((col, letter, True))
+                    extend_right(col + 1, target, is_terminal, anchor, placed)
+                    placed.pop()
+                    rack[BLANK] += 1
+
+        for anchor in anchors:
+            if anchor > 0 and row[anchor - 1] is not None:
+                start = anchor - 1
+                while start > 0 and row[start - 1] is not None:
+                    start -= 1
+                step = lexicon.walk(lexicon.root, ''.join(row[start:anchor]))
+                if step is not None:
+                    extend_right(anchor, step[0], step[1], anchor, [])
+            else:
+                limit = 0
+                col = anchor - 1
+                while col >= 0 and row[col] is None and col not in anchor_set:
+                    limit += 1
+                    col -= 1
+                allowed = checks[anchor]
+                for node, left, used, next_letters in left_parts:
+                    if len(left) > limit or (allowed is not None and allowed.isdisjoint(next_letters)):
+                        continue
+                    for key in used:
+                        rack[key] -= 1
+                    start = anchor - len(left)
+                    placed = [(start + i, letter, is_blank) for i, (letter, is_blank) in enumerate(left)]
+                    extend_right(anchor, node, False, anchor, placed)
+                    for key in used:
+                        rack[key] += 1
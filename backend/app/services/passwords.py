@@ -0,0 +1,77 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from passlib.context import CryptContext
+
+# bcrypt cost factor: every +1 doubles the CPU time of a hash or a login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Processes dedicated to hashing, so login bursts cannot starve request handling
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+# Hashes one client address may have in flight before it gets 429
+LOGIN_CONCURRENCY_PER_IP = int(os.getenv("LOGIN_CONCURRENCY_PER_IP", "2"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), get_password_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), verify_password, plain_password, hashed_password)
+
+
+class ClientLimiter:
+    """In-flight password checks per client address on this worker"""
+
+    def __init__(self, limit: int = LOGIN_CONCURRENCY_PER_IP):
+        self.limit = limit
+        self.rejected = 0
+        self._in_flight: Dict[str, int] = {}
+
+    def acquire(self, client: str) -> bool:
+        count = self._in_flight.get(client, 0)
+        if count >= self.limit:
+            self.rejected += 1
+            return False
+        self._in_flight[client] = count + 1
+        return True
+
+    def release(self, client: str) -> None:
+        count = self._in_flight.get(client, 0) - 1
+        if count > 0:
+            self._in_flight[client] = count
+        else:
+            self._in_flight.pop(client, None)
+
+    def stats(self) -> Dict:
+        return {"in_flight": sum(self._in_flight.values()), "clients": len(self._in_flight), "rejected": self.rejected}
+
+
+login_limiter = ClientLimiter()
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import Ranking, User
+from app.services import events
+from app.services.broadcast import get_broadcast
+from app.services.game_state import PlayerState
+from app.services.scoring import LETTER_VALUES
+
+# Rating points at stake per game, shared across the pairings of a multi-player game
+ELO_K = float(os.getenv("ELO_K", "32"))
+LEADERBOARD_SIZE = 100
+# Safety net for a missed cross-worker invalidation
+LEADERBOARD_TTL = float(os.getenv("LEADERBOARD_TTL", "60"))
+RANKINGS_CHANNEL = "rankings"
+
+
+def apply_rack_penalties(players: Sequence[PlayerState]) -> None:
+    """Deduct each rack's tile values; a player who went out gains everyone else's"""
+    penalties = {player.user_id: sum(LETTER_VALUES.get(tile, 0) for tile in player.rack) for player in players}
+    out = [player for player in players if not player.rack]
+    for player in players:
+        player.score -= penalties[player.user_id]
+    if len(out) == 1:
+        out[0].score += sum(penalties.values())
+
+
+def rating_changes(ratings: Dict[int, int], scores: Dict[int, int], k: float = ELO_K) -> Dict[int, int]:
+    """Multi-player ELO: every pair of players is scored as a game of its own"""
+    if len(ratings) < 2:
+        return {user_id: 0 for user_id in ratings}
+    weight = k / (len(ratings) - 1)
+    changes = {}
+    for user_id, rating in ratings.items():
+        change = 0.0
+        for other_id, other_rating in ratings.items():
+            if other_id == user_id:
+                continue
+            expected = 1 / (1 + 10 ** ((other_rating - rating) / 400))
+            if scores[user_id] > scores[other_id]:
+                actual = 1.0
+            elif scores[user_id] == scores[other_id]:
+                actual = 0.5
+            else:
+                actual = 0.0
+            change += weight * (actual - expected)
+        changes[user_id] = round(change)
+    return changes
+
+
+def record_results(db: Session, players: Sequence[PlayerState]) -> Dict[int, int]:
+    """Update every seat's ranking row in the caller's transaction; returns the rating changes"""
+    user_ids = [player.user_id for player in players]
+    # Row locks keep two games finishing for the same player from losing an update
+    rows = {
+        row.user_id: row
+        for row in db.query(Ranking).filter(Ranking.user_id.in_(user_ids)).order_by(Ranking.user_id).with_for_update()
+    }
+    for user_id in user_ids:
+        if user_id not in rows:
+            # Bots and accounts that predate rankings
+            rows[user_id] = Ranking(user_id=user_id, total_games=0, wins=0, losses=0, total_score=0, highest_score=0, rating=1000)
+            db.add(rows[user_id])
+    db.flush()
+
+    scores = {player.user_id: player.score for player in players}
+    top = max(scores.values())
+    changes = rating_changes({user_id: row.rating for user_id, row in rows.items()}, scores)
+    db.execute(update(Ranking), [
+        {
+            "id": row.id,
+            "total_games": row.total_games + 1,
+            "wins": row.wins + (scores[user_id] == top),
+            "losses": row.losses + (scores[user_id] < top),
+            "total_score": row.total_score + scores[user_id],
+            "highest_score": max(row.highest_score, scores[user_id]),
+            "rating": row.rating + changes[user_id],
+        }
+        for user_id, row in rows.items()
+    ])
+    return changes
+
+
+def build_leaderboard(db: Session, limit: int = LEADERBOARD_SIZE) -> List[Dict]:
+    """Top human players, read in rating order from the rankings index"""
+    rows = db.query(Ranking, User.username).join(User, User.id == Ranking.user_id).filter(
+        User.is_bot.isnot(True)
+    ).order_by(Ranking.rating.desc(), Ranking.id.desc()).limit(limit).all()
+    return [
+        {
+            "id": ranking.id,
+            "username": username,
+            "total_games": ranking.total_games,
+            "wins": ranking.wins,
+            "losses": ranking.losses,
+            "total_score": ranking.total_score,
+            "highest_score": ranking.highest_score,
+            "rating": ranking.rating
+        }
+        for ranking, username in rows
+    ]
+
+
+class Leaderboard:
+    """The leaderboard page, rebuilt only after a game finishes"""
+
+    def __init__(self, ttl: float = LEADERBOARD_TTL):
+        self.ttl = ttl
+        self.generation = 0
+        self._rows: Optional[List[Dict]] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._rows = None
+
+    async def get_or_build(self, build: Callable) -> List[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            if self._rows is not None and self._expires > now:
+                return self._rows
+            generation = self.generation
+
+        rows = await build()
+        with self._lock:
+            if generation == self.generation:
+                self._rows, self._expires = rows, now + self.ttl
+        return rows
+
+
+leaderboard = Leaderboard()
+
+
+async def _announce_finish(game_id: int, event: Dict) -> None:
+    if event.get("type") == "finish":
+        await get_broadcast().publish(RANKINGS_CHANNEL, str(game_id))
+
+
+async def _on_remote_finish(channel: str, message: str) -> None:
+    leaderboard.invalidate()
+
+
+events.subscribe(_announce_finish)
+
+
+async def listen() -> None:
+    """Drop this worker's leaderboard when a game finishes on any worker (called at startup)"""
+    await get_broadcast().subscribe(RANKINGS_CHANNEL, _on_remote_finish)
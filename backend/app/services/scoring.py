@@ -0,0 +1,124 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from app.services.board import Board
+
+# Polish Letter values
+LETTER_VALUES = {
+    'A': 1, 'I': 1, 'E': 1, 'O': 1, 'Z': 1, 'N': 1, 'R': 1, 'W': 1, 'S': 1,
+    'C': 2, 'T': 2, 'Y': 2, 'K': 2, 'D': 2, 'P': 2, 'M': 2, 'U': 3, 'J': 3,
+    'L': 2, 'Ł': 3, 'G': 3, 'B': 3, 'H': 3, 'F': 5, 'Ą': 5, 'Ę': 5, 'Ś': 5,
+    'Ż': 5, 'Ź': 9, 'Ć': 6, 'Ń': 7, 'Ó': 5, '_': 0
+}
+
+# Premium squares on the board
+TRIPLE_WORD = [(0, 0), (0, 7), (0, 14), (7, 0), (7, 14), (14, 0), (14, 7), (14, 14)]
+DOUBLE_WORD = [(1, 1), (2, 2), (3, 3), (4, 4), (1, 13), (2, 12), (3, 11), (4, 10),
+               (13, 1), (12, 2), (11, 3), (10, 4), (13, 13), (12, 12), (11, 11), (10, 10)]
+TRIPLE_LETTER = [(1, 5), (1, 9), (5, 1), (5, 5), (5, 9), (5, 13), (9, 1), (9, 5),
+                 (9, 9), (9, 13), (13, 5), (13, 9)]
+DOUBLE_LETTER = [(0, 3), (0, 11), (2, 6), (2, 8), (3, 0), (3, 7), (3, 14), (6, 2),
+                 (6, 6), (6, 8), (6, 12), (7, 3), (7, 11), (8, 2), (8, 6), (8, 8),
+                 (8, 12), (11, 0), (11, 7), (11, 14), (12, 6), (12, 8), (14, 3), (14, 11)]
+
+BOARD_SIZE = 15
+BINGO_BONUS = 50
+BINGO_TILES = 7
+
+
+def _multiplier_grids():
+    letter = [1] * (BOARD_SIZE * BOARD_SIZE)
+    word = [1] * (BOARD_SIZE * BOARD_SIZE)
+    for squares, grid, factor in ((DOUBLE_LETTER, letter, 2), (TRIPLE_LETTER, letter, 3),
+                                  (DOUBLE_WORD, word, 2), (TRIPLE_WORD, word, 3)):
+        for row, col in squares:
+            grid[row * BOARD_SIZE + col] = factor
+    return tuple(letter), tuple(word)
+
+
+# Flat 15x15 multiplier grids indexed by row * BOARD_SIZE + col
+LETTER_MULTIPLIER, WORD_MULTIPLIER = _multiplier_grids()
+
+
+def tile_value(tile: Dict) -> int:
+    """Face value of a tile; blanks are worth nothing whatever letter they show"""
+    if tile.get('is_blank'):
+        return 0
+    return LETTER_VALUES.get(tile['letter'], 0)
+
+
+def board_values(board: "Board") -> List[Optional[int]]:
+    """Face values of the tiles already on the board, None for empty squares"""
+    values: List[Optional[int]] = [None] * (BOARD_SIZE * BOARD_SIZE)
+    for row, col, letter, is_blank in board.tiles():
+        values[row * BOARD_SIZE + col] = 0 if is_blank else LETTER_VALUES.get(letter, 0)
+    return values
+
+
+def _score_line(values: Sequence[Optional[int]], placed: Dict[int, int], index: int, step: int, line_start: int) -> int:
+    """Score the word running through `index` in one direction; 0 if it is a single tile
+
+    `step` is 1 for across and BOARD_SIZE for down; `line_start` is the index of the
+    first square of the row (across) or column (down) so words never wrap.
+    """
+    line_end = line_start + step * (BOARD_SIZE - 1)
+
+    start = index
+    while start > line_start and (start - step in placed or values[start - step] is not None):
+        start -= step
+    end = index
+    while end < line_end and (end + step in placed or values[end + step] is not None):
+        end += step
+    if start == end:
+        return 0
+
+    score = 0
+    word_multiplier = 1
+    for square in range(start, end + step, step):
+        new_value = placed.get(square)
+        if new_value is None:
+            score += values[square]  # existing tiles count at face value
+        else:
+            score += new_value * LETTER_MULTIPLIER[square]
+            word_multiplier *= WORD_MULTIPLIER[square]
+    return score * word_multiplier
+
+
+def score_tiles(values: Sequence[Optional[int]], tiles: List[Dict]) -> int:
+    """Score a play against precomputed board values: main word, cross-words and bingo"""
+    placed = {tile['row'] * BOARD_SIZE + tile['col']: tile_value(tile) for tile in tiles}
+    if not placed:
+        return 0
+
+    rows = {tile['row'] for tile in tiles}
+    cols = {tile['col'] for tile in tiles}
+    total = 0
+    first = next(iter(placed))
+
+    if len(placed) == 1 or len(rows) == 1:
+        row = first // BOARD_SIZE
+        total += _score_line(values, placed, first, 1, row * BOARD_SIZE)
+        for index in placed:
+            total += _score_line(values, placed, index, BOARD_SIZE, index % BOARD_SIZE)
+    elif len(cols) == 1:
+        col = first % BOARD_SIZE
+        total += _score_line(values, placed, first, BOARD_SIZE, col)
+        for index in placed:
+            total += _score_line(values, placed, index, 1, (index // BOARD_SIZE) * BOARD_SIZE)
+    else:
+        return 0
+
+    if len(placed) == BINGO_TILES:
+        total += BINGO_BONUS
+    return total
+
+
+def score_move(board: "Board", tiles: List[Dict]) -> int:
+    """Score one play; the board may or may not already hold the new tiles"""
+    return score_tiles(board_values(board), tiles)
+
+
+def score_moves(board: "Board", moves: List[List[Dict]]) -> List[int]:
+    """Score many candidate plays on the same board, reading the board only once"""
+    values = board_values(board)
+    return [score_tiles(values, tiles) for tiles in moves]
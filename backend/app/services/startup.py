@@ -0,0 +1,75 @@
+import time
+
+# Taken before the heavier imports; main.py imports this module first so "import" covers the whole app
+IMPORT_STARTED = time.perf_counter()
+
+import logging
+import os
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Game
+from app.services.game_state import game_states
+from app.services.lexicon import get_lexicon
+
+logger = logging.getLogger(__name__)
+
+# Active games loaded into the state cache before the worker reports ready, newest first
+WARMUP_GAMES = int(os.getenv("WARMUP_GAMES", "100"))
+
+
+class StartupTimer:
+    """Cold start of this worker: seconds per phase, from module import until it is ready"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+        self.ready = False
+        self._mark = self.started
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time one step; the time since the previous step is booked as "import" the first time"""
+        begin = time.perf_counter()
+        if not self.phases:
+            self.phases["import"] = begin - self._mark
+        try:
+            yield
+        finally:
+            self._mark = time.perf_counter()
+            self.phases[name] = self._mark - begin
+
+    def mark_ready(self) -> None:
+        if self.ready_after is None:
+            self.ready_after = time.perf_counter() - self.started
+            logger.info(f"Worker ready in {self.ready_after:.2f}s ({self.format_phases()})")
+        self.ready = True
+
+    def mark_stopping(self) -> None:
+        """Fail readiness from here on so load balancers stop routing to a worker that is shutting down"""
+        self.ready = False
+
+    def format_phases(self) -> str:
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())
+
+    def stats(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "seconds": round(self.ready_after, 3) if self.ready_after is not None else None,
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+        }
+
+
+def warm_up(db: Session, games: int = WARMUP_GAMES) -> Dict:
+    """Load the lexicon and the newest active games so the first requests do not pay for it"""
+    lexicon = get_lexicon(db)
+    game_ids = db.query(Game.id).filter(Game.status == "active").order_by(Game.id.desc()).limit(games).all()
+    for (game_id,) in game_ids:
+        game_states.load(db, game_id)
+    return {"words": len(lexicon), "games": len(game_ids)}
+
+
+startup = StartupTimer(IMPORT_STARTED)
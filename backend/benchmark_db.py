@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from database import DATABASE_URL, async_database_url
+from app.models import Game
+
+# Starlette runs sync handlers on a 40-thread AnyIO pool
+THREADPOOL_SIZE = 40
+
+
+def latency_statement(latency: float):
+    """Stand-in for a slow round trip; only Postgres can sleep server-side"""
+    if latency and DATABASE_URL.startswith("postgres"):
+        return text("SELECT pg_sleep(:seconds)").bindparams(seconds=latency)
+    return None
+
+
+def pool_options(concurrency: int) -> dict:
+    # SQLite engines bring their own pools; a server database gets one connection per in-flight request
+    return {} if DATABASE_URL.startswith("sqlite") else {"pool_size": concurrency, "max_overflow": 0}
+
+
+def lobby_query():
+    return select(Game.id, Game.status, Game.current_turn).order_by(Game.created_at.desc()).limit(50)
+
+
+def run_sync(requests: int, concurrency: int, latency: float) -> float:
+    engine = create_engine(DATABASE_URL, **pool_options(concurrency))
+    sleep = latency_statement(latency)
+
+    def handle(_):
+        with Session(engine) as db:
+            if sleep is not None:
+                db.execute(sleep)
+            db.execute(lobby_query()).all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(concurrency, THREADPOOL_SIZE)) as pool:
+        list(pool.map(handle, range(requests)))
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return requests / elapsed
+
+
+async def run_async(requests: int, concurrency: int, latency: float) -> float:
+    engine = create_async_engine(async_database_url(DATABASE_URL), **pool_options(concurrency))
+    sleep = latency_statement(latency)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def handle():
+        async with slots, engine.connect() as conn:
+            if sleep is not None:
+                await conn.execute(sleep)
+            (await conn.execute(lobby_query())).all()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handle() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return requests / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare lobby queries through blocking and asyncio sessions")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latency", type=float, default=0.005, help="Extra server-side wait per request, in seconds (Postgres only)")
+    args = parser.parse_args()
+
+    print(f"{'concurrency':>12} {'sync req/s':>12} {'async req/s':>12}")
+    for concurrency in args.concurrency:
+        sync_rate = run_sync(args.requests, concurrency, args.latency)
+        async_rate = asyncio.run(run_async(args.requests, concurrency, args.latency))
+        print(f"{concurrency:>12} {sync_rate:>12.0f} {async_rate:>12.0f}")
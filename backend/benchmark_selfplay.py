@@ -0,0 +1,393 @@
+import abc
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import DATABASE_URL, DB_CONNECT_TIMEOUT, pool_options, wait_for_database
+from app.models import User
+from app.services.board import Board
+from app.services.bots import choose_move
+from app.services.game_service import SCORELESS_ROUNDS_TO_END, GameService
+from app.services.game_state import game_states
+from app.services.lexicon import Lexicon, get_lexicon
+from app.services.move_generator import MoveGenerator
+
+# Games still running after this many turns are abandoned: the rules do not let them be ended early
+MAX_TURNS = 200
+SIM_PASSWORD = "selfplay-benchmark"
+# Only the simulation level searches until its budget runs out; greedy bots stop at the best move
+THINK_BUDGET = 0.5
+
+
+def deep_size(obj) -> int:
+    """Bytes held by an object graph, each object counted once"""
+    seen = set()
+    pending = [obj]
+    size = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, (type, types.ModuleType, types.FunctionType)):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        pending.extend(gc.get_referents(item))
+    return size
+
+
+class GameStats:
+    """What one simulated game cost; merged across games and processes by summarize()"""
+
+    def __init__(self):
+        self.moves = 0
+        self.latencies: List[float] = []
+        self.think = 0.0
+        self.queries: Optional[int] = 0
+        self.rejected = 0
+        self.finished = False
+        self.state_bytes: Optional[int] = 0
+        self.traced_peak: Optional[int] = None
+        self.worker = os.getpid()
+        self.max_rss = 0
+        # Wall-clock stamps, comparable across the pool's processes
+        self.started = 0.0
+        self.ended = 0.0
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+class Simulator(abc.ABC):
+    """Plays complete bot-vs-bot games; subclasses decide how a move reaches the server"""
+
+    def __init__(self, seats: int, max_turns: int = MAX_TURNS, trace_memory: bool = False):
+        self.seats = seats
+        self.max_turns = max_turns
+        self.trace_memory = trace_memory
+        self.generator: Optional[MoveGenerator] = None
+        if trace_memory:
+            tracemalloc.start()
+
+    def decide(self, board_data: bytes, rack: List[str], bag_size: int, stats: GameStats) -> Dict:
+        started = time.perf_counter()
+        decision = choose_move(board_data, rack, "greedy", [], bag_size, THINK_BUDGET, self.generator)
+        stats.think += time.perf_counter() - started
+        return decision
+
+    def play(self, seed: int) -> Dict:
+        random.seed(seed)
+        stats = GameStats()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        stats.started = time.time()
+        self.play_game(stats)
+        stats.ended = time.time()
+        if self.trace_memory:
+            stats.traced_peak = tracemalloc.get_traced_memory()[1] - baseline
+        stats.max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return stats.to_dict()
+
+    @abc.abstractmethod
+    def play_game(self, stats: GameStats) -> None:
+        """Play one game from creation to its end, recording into stats"""
+
+    def stalled(self, scoreless: int) -> bool:
+        """Nobody has scored for the rounds after which the rules let a player end the game"""
+        return scoreless >= SCORELESS_ROUNDS_TO_END * self.seats
+
+
+class ServiceSimulator(Simulator):
+    """Drives GameService in-process, as the request handlers do, counting the SQL each move issues"""
+
+    def __init__(self, url: str, seats: int, max_turns: int = MAX_TURNS, trace_memory: bool = False,
+                 lexicon: Optional[Lexicon] = None):
+        super().__init__(seats, max_turns, trace_memory)
+        connect_args = {"timeout": 30} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args, **pool_options(url))
+        self.statements = 0
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        with self.Session() as db:
+            self.lexicon = lexicon or get_lexicon(db)
+            self.bot_ids = self._bots(db)
+        self.generator = MoveGenerator(self.lexicon)
+
+    def _count(self, *args) -> None:
+        self.statements += 1
+
+    def _bots(self, db) -> List[int]:
+        """Bot accounts of this process, so parallel workers never wait on each other's ranking rows"""
+        ids = []
+        for seat in range(self.seats):
+            name = f"sim_{os.getpid()}_{seat}"
+            user = db.query(User).filter(User.username == name).first()
+            if user is None:
+                user = User(username=name, email=f"{name}@bots.invalid", hashed_password="!", is_bot=True, bot_level="greedy")
+                db.add(user)
+                db.commit()
+            ids.append(user.id)
+        return ids
+
+    def play_game(self, stats: GameStats) -> None:
+        with self.Session() as db:
+            service = GameService(db, self.lexicon)
+            game_id = service.create_game().id
+            for bot_id in self.bot_ids:
+                service.join_game(game_id, bot_id)
+            service.start_game(game_id)
+
+            scoreless = 0
+            while True:
+                state = game_states.load(db, game_id)
+                stats.state_bytes = max(stats.state_bytes, deep_size(state))
+                if state.status != "active":
+                    stats.finished = True
+                    return
+                player = state.player_to_move()
+                if self.stalled(scoreless):
+                    ended, error = service.end_game(game_id, player.user_id)
+                    if not ended:
+                        raise RuntimeError(f"Game {game_id}: {error}")
+                    return
+                if state.current_turn >= self.max_turns:
+                    return
+
+                decision = self.decide(state.board.to_bytes(), list(player.rack), len(state.bag), stats)
+                statements = self.statements
+                started = time.perf_counter()
+                move, error = self.submit(service, game_id, player.user_id, decision)
+                if error:
+                    stats.rejected += 1
+                    move, error = service.make_move(game_id, player.user_id, [], is_pass=True)
+                    if error:
+                        raise RuntimeError(f"Game {game_id}: {error}")
+                stats.latencies.append(time.perf_counter() - started)
+                stats.queries += self.statements - statements
+                stats.moves += 1
+                scoreless = scoreless + 1 if not move.score else 0
+
+    def submit(self, service: GameService, game_id: int, user_id: int, decision: Dict):
+        if decision['type'] == 'play':
+            return service.make_move(game_id, user_id, decision['tiles'])
+        if decision['type'] == 'exchange':
+            return service.make_move(game_id, user_id, [], is_exchange=True, exchange_tiles=decision['tiles'])
+        return service.make_move(game_id, user_id, [], is_pass=True)
+
+
+class ApiSimulator(Simulator):
+    """Plays through a running server's HTTP API; latencies include the network and the handlers"""
+
+    def __init__(self, url: str, seats: int, max_turns: int = MAX_TURNS, trace_memory: bool = False,
+                 lexicon_path: Optional[str] = None):
+        super().__init__(seats, max_turns, trace_memory)
+        self.client = httpx.Client(base_url=url, timeout=30)
+        self.generator = MoveGenerator(self._lexicon(lexicon_path))
+        self.headers = [self._login(f"sim_{os.getpid()}_{seat}") for seat in range(seats)]
+
+    def _lexicon(self, path: Optional[str]) -> Lexicon:
+        if path:
+            return Lexicon.load(path)
+        engine = create_engine(DATABASE_URL)
+        try:
+            with sessionmaker(bind=engine)() as db:
+                return Lexicon.from_db(db)
+        finally:
+            engine.dispose()
+
+    def _auth(self, path: str, body: Dict) -> httpx.Response:
+        # The server caps password checks in flight per client address; every worker shares ours
+        while True:
+            response = self.client.post(path, json=body)
+            if response.status_code != 429:
+                return response
+            time.sleep(float(response.headers.get("Retry-After", "1")))
+
+    def _login(self, username: str) -> Dict:
+        # Bot accounts cannot log in, so the API plays with ordinary users
+        body = {"username": username, "password": SIM_PASSWORD}
+        self._auth("/api/auth/register", {**body, "email": f"{username}@example.com"})
+        token = self._auth("/api/auth/login", body).raise_for_status().json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def play_game(self, stats: GameStats) -> None:
+        # Both live in the server process
+        stats.queries = None
+        stats.state_bytes = None
+        game_id = self.client.post("/api/games", json={}, headers=self.headers[0]).raise_for_status().json()["id"]
+        for headers in self.headers[1:]:
+            self.client.post(f"/api/games/{game_id}/join", headers=headers).raise_for_status()
+        self.client.post(f"/api/games/{game_id}/start", headers=self.headers[0]).raise_for_status()
+
+        scoreless = 0
+        turn = 0
+        while True:
+            # Seats were taken in order, so player_order is the index into self.headers
+            headers = self.headers[turn % self.seats]
+            game = self.client.get(f"/api/games/{game_id}", headers=headers).raise_for_status().json()
+            if game["status"] != "active":
+                stats.finished = True
+                return
+            if game["current_turn"] != turn:
+                turn = game["current_turn"]
+                continue
+            if self.stalled(scoreless):
+                self.client.post(f"/api/games/{game_id}/end", headers=headers).raise_for_status()
+                return
+            if turn >= self.max_turns:
+                return
+
+            board = Board.from_json(game["board_state"]).to_bytes()
+            decision = self.decide(board, game["rack"], game["remaining_tiles"], stats)
+            started = time.perf_counter()
+            response = self.client.post(f"/api/games/{game_id}/moves", json=self.payload(decision), headers=headers)
+            if response.status_code == 400:
+                stats.rejected += 1
+                response = self.client.post(f"/api/games/{game_id}/moves", json={"tiles": [], "is_pass": True}, headers=headers)
+            stats.latencies.append(time.perf_counter() - started)
+            stats.moves += 1
+            scoreless = scoreless + 1 if not response.raise_for_status().json()["score"] else 0
+            turn += 1
+
+    def payload(self, decision: Dict) -> Dict:
+        if decision['type'] == 'play':
+            return {"tiles": decision['tiles']}
+        if decision['type'] == 'exchange':
+            return {"tiles": [], "is_exchange": True, "exchange_tiles": decision['tiles']}
+        return {"tiles": [], "is_pass": True}
+
+
+def wait_for_server(url: str, timeout: float = DB_CONNECT_TIMEOUT) -> None:
+    """Return once the server reports ready (warmed up, database reachable)"""
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while True:
+        try:
+            if httpx.get(f"{url}/ready", timeout=5).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() + delay > deadline:
+            raise SystemExit(f"{url} did not become ready within {timeout:.0f}s")
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+
+
+_simulator: Optional[Simulator] = None
+
+
+def _init_worker(mode: str, url: str, seats: int, max_turns: int, trace_memory: bool, lexicon_path: Optional[str]) -> None:
+    global _simulator
+    if mode == "api":
+        _simulator = ApiSimulator(url, seats, max_turns, trace_memory, lexicon_path)
+    else:
+        _simulator = ServiceSimulator(url, seats, max_turns, trace_memory,
+                                      Lexicon.load(lexicon_path) if lexicon_path else None)
+
+
+def _play(seed: int) -> Dict:
+    return _simulator.play(seed)
+
+
+def percentile(values: List[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def summarize(results: List[Dict]) -> Dict:
+    # From the first game's start to the last game's end, leaving out pool start-up
+    elapsed = max((result["ended"] for result in results), default=0) - min((result["started"] for result in results), default=0)
+    latencies = [latency for result in results for latency in result["latencies"]]
+    moves = sum(result["moves"] for result in results)
+    counted = [result["queries"] for result in results if result["queries"] is not None]
+    states = [result["state_bytes"] for result in results if result["state_bytes"] is not None]
+    traced = [result["traced_peak"] for result in results if result["traced_peak"] is not None]
+    rss = {}
+    for result in results:
+        rss[result["worker"]] = max(rss.get(result["worker"], 0), result["max_rss"])
+    return {
+        "games": len(results),
+        "finished": sum(result["finished"] for result in results),
+        "moves": moves,
+        "rejected": sum(result["rejected"] for result in results),
+        "seconds": round(elapsed, 2),
+        "moves_per_second": round(moves / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies, default=0) * 1000, 2),
+        },
+        "think_ms_per_move": round(sum(result["think"] for result in results) / moves * 1000, 2) if moves else 0.0,
+        "queries_per_move": round(sum(counted) / moves, 2) if counted and moves else None,
+        "memory": {
+            "state_bytes_per_game": round(statistics.mean(states)) if states else None,
+            "traced_bytes_per_game": round(statistics.mean(traced)) if traced else None,
+            "max_rss_per_worker": max(rss.values(), default=0),
+        },
+    }
+
+
+def report(summary: Dict) -> None:
+    latency, memory = summary["latency_ms"], summary["memory"]
+    print(f"{summary['games']} games ({summary['finished']} played out), {summary['moves']} moves "
+          f"({summary['rejected']} rejected) in {summary['seconds']}s")
+    print(f"{'moves/s':>24} {summary['moves_per_second']:>12}")
+    print(f"{'latency p50/p99/max ms':>24} {latency['p50']:>12} {latency['p99']:>8} {latency['max']:>8}")
+    print(f"{'bot think ms/move':>24} {summary['think_ms_per_move']:>12}")
+    print(f"{'queries/move':>24} {summary['queries_per_move'] if summary['queries_per_move'] is not None else 'n/a':>12}")
+    print(f"{'cached state B/game':>24} {memory['state_bytes_per_game'] if memory['state_bytes_per_game'] is not None else 'n/a':>12}")
+    if memory["traced_bytes_per_game"] is not None:
+        print(f"{'traced peak B/game':>24} {memory['traced_bytes_per_game']:>12}")
+    print(f"{'max RSS/worker MB':>24} {memory['max_rss_per_worker'] / 2 ** 20:>12.1f}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Play complete bot-vs-bot games at volume and report server-side costs")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--seats", type=int, default=2, choices=[2, 3, 4])
+    parser.add_argument("--mode", choices=["service", "api"], default="service",
+                        help="Call GameService directly, or play through a running server")
+    parser.add_argument("--url", help="Database URL (service mode, defaults to $DATABASE_URL) or server URL (api mode)")
+    parser.add_argument("--lexicon", help="Compiled lexicon to play with instead of the dictionary table")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--seed", type=int, default=0, help="Game n shuffles its bag with seed + n")
+    parser.add_argument("--trace-memory", action="store_true", help="Also measure each game's peak allocations (slower)")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON, e.g. to compare runs")
+    args = parser.parse_args(argv)
+
+    url = args.url or (DATABASE_URL if args.mode == "service" else "http://localhost:8000")
+    if args.mode == "service":
+        engine = create_engine(url)
+        wait_for_database(engine)
+        engine.dispose()
+    else:
+        wait_for_server(url)
+
+    initargs = (args.mode, url, args.seats, args.max_turns, args.trace_memory, args.lexicon)
+    with multiprocessing.Pool(args.processes, initializer=_init_worker, initargs=initargs) as pool:
+        results = list(pool.imap_unordered(_play, range(args.seed, args.seed + args.games), chunksize=4))
+    summary = summarize(results)
+
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        report(summary)
+
+
+if __name__ == "__main__":
+    main()
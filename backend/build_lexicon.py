@@ -0,0 +1,40 @@
+import argparse
+import sys
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import DATABASE_URL
+from app.services.lexicon import Lexicon, LEXICON_PATH
+
+
+def build_lexicon(output: str, words_file: str = None) -> Lexicon:
+    """Compile the lexicon into a binary file that workers can mmap"""
+    started = time.perf_counter()
+
+    if words_file:
+        with open(words_file, encoding="utf-8") as f:
+            lexicon = Lexicon.from_words(f)
+    else:
+        engine = create_engine(DATABASE_URL)
+        db = sessionmaker(bind=engine)()
+        try:
+            lexicon = Lexicon.from_db(db)
+        finally:
+            db.close()
+
+    lexicon.save(output)
+    elapsed = time.perf_counter() - started
+    print(f"Compiled {len(lexicon)} words into {output} in {elapsed:.2f}s")
+    return lexicon
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the dictionary into a binary lexicon file")
+    parser.add_argument("--output", default=LEXICON_PATH, help="Output path (defaults to $LEXICON_PATH)")
+    parser.add_argument("--words", help="UTF-8 word list to compile instead of the dictionary table")
+    args = parser.parse_args()
+
+    if not args.output:
+        print("No output path given and LEXICON_PATH is not set")
+        sys.exit(1)
+    build_lexicon(args.output, args.words)
@@ -1,13 +1,54 @@
-from fastapi import FastAPI
+from app.services.startup import startup, warm_up
+
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, get_session_factory
+
+from app.routes import auth, games, profile, chat, metrics
+from app.services import events, lexicon_import, lobby, rankings
+from app.services.chat_ingest import chat_writer, worker_id_lease
+from app.services import passwords
+from app.services.bots import resume_bot_turns, shutdown_executor
+from app.services.broadcast import get_broadcast
+
+# The schema is managed by migrations (`python scrabble.py db upgrade`), applied once per deploy
+# rather than by every worker at import.
 
-from app.routes import auth, games, profile, chat
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup.phase("broadcast"):
+        # Game events published from sync handlers are delivered on this loop
+        events.bind_loop(asyncio.get_running_loop())
+        await get_broadcast().connect()
+        await lobby.listen()
+        await rankings.listen()
+        await lexicon_import.listen()
+    with startup.phase("warm_up"):
+        # Resolved like a dependency so tests (and any override) warm up against their own database
+        session_factory = app.dependency_overrides.get(get_session_factory, get_session_factory)()
+        async with session_factory() as db:
+            await db.run_sync(warm_up)
+            # Bot turns left waiting by a restart, or by a worker that went away
+            await resume_bot_turns(db.bind)
+    with startup.phase("worker_id"):
+        chat_writer.ids.worker_id = await worker_id_lease.claim(session_factory)
+    startup.mark_ready()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+    yield
 
-app = FastAPI(title="Scrabble Game API", version="1.0.0")
+    startup.mark_stopping()
+    shutdown_executor()
+    passwords.shutdown_executor()
+    await chat_writer.stop()
+    await worker_id_lease.release()
+    await get_broadcast().disconnect()
+
+app = FastAPI(title="Scrabble Game API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -16,6 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Include routers
@@ -23,6 +65,7 @@ app.include_router(auth.router)
 app.include_router(games.router)
 app.include_router(profile.router)
 app.include_router(chat.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
@@ -30,4 +73,16 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    """Liveness: the process answers"""
     return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check(db: AsyncSession = Depends(get_async_db)):
+    """Readiness: warm-up has finished and the database answers a query"""
+    if not startup.ready:
+        return JSONResponse(status_code=503, content={"status": "starting", "startup": startup.stats()})
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception:
+        return JSONResponse(status_code=503, content={"status": "database unavailable"})
+    return {"status": "ready", "startup": startup.stats()}
@@ -0,0 +1,54 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from database import Base, DATABASE_URL
+import app.models  # noqa: F401  registers the tables on Base.metadata
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    # scrabble.py and the tests pass their own URL; the alembic CLI uses DATABASE_URL
+    return config.get_main_option("sqlalchemy.url") or DATABASE_URL
+
+
+def configure(**options) -> None:
+    # SQLite cannot alter columns in place; batch operations copy the table instead
+    context.configure(target_metadata=target_metadata, render_as_batch=True, **options)
+
+
+def run_migrations_offline() -> None:
+    """Emit the SQL instead of running it (alembic upgrade --sql)"""
+    configure(url=database_url(), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(database_url())
+    try:
+        with engine.connect() as connection:
+            configure(connection=connection)
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,123 @@
+"""Baseline: the schema as created by Base.metadata.create_all before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'games',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('current_turn', sa.Integer(), nullable=True),
+        sa.Column('board_state', sa.JSON(), nullable=True),
+        sa.Column('bag_tiles', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_games_id', 'games', ['id'])
+
+    op.create_table(
+        'dictionary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('word', sa.String(length=15), nullable=False),
+        sa.Column('language', sa.String(length=10), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_dictionary_id', 'dictionary', ['id'])
+    op.create_index('ix_dictionary_word', 'dictionary', ['word'], unique=True)
+
+    op.create_table(
+        'game_players',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('player_order', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('rack', sa.JSON(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_game_players_id', 'game_players', ['id'])
+
+    op.create_table(
+        'game_moves',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('move_number', sa.Integer(), nullable=False),
+        sa.Column('word', sa.String(length=15), nullable=True),
+        sa.Column('tiles_played', sa.JSON(), nullable=True),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('is_pass', sa.Boolean(), nullable=True),
+        sa.Column('is_exchange', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_game_moves_id', 'game_moves', ['id'])
+
+    op.create_table(
+        'rankings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_games', sa.Integer(), nullable=True),
+        sa.Column('wins', sa.Integer(), nullable=True),
+        sa.Column('losses', sa.Integer(), nullable=True),
+        sa.Column('total_score', sa.Integer(), nullable=True),
+        sa.Column('highest_score', sa.Integer(), nullable=True),
+        sa.Column('rating', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+    )
+    op.create_index('ix_rankings_id', 'rankings', ['id'])
+
+    op.create_table(
+        'chat_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_chat_messages_id', 'chat_messages', ['id'])
+
+
+def downgrade() -> None:
+    for table in ('chat_messages', 'rankings', 'game_moves', 'game_players', 'dictionary', 'games', 'users'):
+        op.drop_table(table)
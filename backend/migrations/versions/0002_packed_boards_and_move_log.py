@@ -0,0 +1,107 @@
+"""Packed boards, move log, snapshots, bots, versioned games and server-assigned chat ids
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.board import Board
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def convert_boards(source_type, target_type, convert) -> None:
+    """Rewrite games.board_state into a new column of another type, one batch of rows at a time"""
+    op.add_column('games', sa.Column('board_state_new', target_type, nullable=True))
+    games = sa.table(
+        'games',
+        sa.column('id', sa.Integer()),
+        sa.column('board_state', source_type),
+        sa.column('board_state_new', target_type),
+    )
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(games.c.id, games.c.board_state).where(games.c.board_state.isnot(None))).all()
+    statement = games.update().where(games.c.id == sa.bindparam('game_id')).values(board_state_new=sa.bindparam('board'))
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(statement, [{'game_id': game_id, 'board': convert(board)} for game_id, board in rows[start:start + BATCH_SIZE]])
+
+    with op.batch_alter_table('games') as batch:
+        batch.drop_column('board_state')
+        batch.alter_column('board_state_new', new_column_name='board_state', existing_type=target_type)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users') as batch:
+        batch.add_column(sa.Column('is_bot', sa.Boolean(), nullable=True, server_default=sa.false()))
+        batch.add_column(sa.Column('bot_level', sa.String(length=20), nullable=True))
+
+    convert_boards(sa.JSON(), sa.LargeBinary(), lambda rows: Board.from_json(rows).to_bytes())
+    with op.batch_alter_table('games') as batch:
+        batch.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('game_moves') as batch:
+        batch.add_column(sa.Column('tiles_drawn', sa.JSON(), nullable=True))
+        batch.add_column(sa.Column('tiles_returned', sa.JSON(), nullable=True))
+
+    # Games already in progress get their first snapshot when they are next loaded
+    op.create_table(
+        'game_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('move_number', sa.Integer(), nullable=False),
+        sa.Column('board_state', sa.LargeBinary(), nullable=False),
+        sa.Column('bag_tiles', sa.JSON(), nullable=False),
+        sa.Column('racks', sa.JSON(), nullable=False),
+        sa.Column('scores', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('game_id', 'move_number'),
+    )
+    op.create_index('ix_game_snapshots_id', 'game_snapshots', ['id'])
+    op.create_index('ix_game_snapshots_game_id', 'game_snapshots', ['game_id'])
+
+    op.create_index('ix_game_players_user_game', 'game_players', ['user_id', 'game_id'])
+    op.create_index('ix_game_players_game_score', 'game_players', ['game_id', 'score'])
+    op.create_index('ix_rankings_rating_id', 'rankings', ['rating', 'id'])
+    op.create_index('ix_chat_messages_game_id_id', 'chat_messages', ['game_id', 'id'])
+
+    if op.get_bind().dialect.name != 'sqlite':
+        # Ids now come from the API workers; existing serial ids stay below every new one
+        op.alter_column('chat_messages', 'id', type_=sa.BigInteger(), existing_type=sa.Integer(),
+                        server_default=None, existing_nullable=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('chat_messages', 'id', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False)
+
+    op.drop_index('ix_chat_messages_game_id_id', table_name='chat_messages')
+    op.drop_index('ix_rankings_rating_id', table_name='rankings')
+    op.drop_index('ix_game_players_game_score', table_name='game_players')
+    op.drop_index('ix_game_players_user_game', table_name='game_players')
+    op.drop_table('game_snapshots')
+
+    with op.batch_alter_table('game_moves') as batch:
+        batch.drop_column('tiles_returned')
+        batch.drop_column('tiles_drawn')
+
+    with op.batch_alter_table('games') as batch:
+        batch.drop_column('version')
+    convert_boards(sa.LargeBinary(), sa.JSON(), lambda data: Board.from_bytes(data).to_json())
+
+    with op.batch_alter_table('users') as batch:
+        batch.drop_column('bot_level')
+        batch.drop_column('is_bot')
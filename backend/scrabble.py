@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
+
+from build_lexicon import build_lexicon
+from database import DATABASE_URL, wait_for_database
+from app.services.lexicon import LEXICON_PATH
+from app.services.lexicon_import import IMPORT_CHUNK_SIZE, announce, import_lexicon
+
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+# Revision matching the tables create_all made before the schema was versioned
+BASELINE_REVISION = "0001"
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """Apply pending migrations; a database created before migrations is adopted at the baseline first"""
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = False
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        tables = inspect(conn).get_table_names()
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
+
+def db_upgrade(args) -> None:
+    started = time.perf_counter()
+    engine = create_engine(DATABASE_URL)
+    try:
+        wait_for_database(engine)
+        upgrade_database(engine, args.revision)
+    finally:
+        engine.dispose()
+    print(f"Database at {args.revision} in {time.perf_counter() - started:.1f}s")
+
+
+def lexicon_import(args) -> None:
+    started = time.perf_counter()
+    engine = create_engine(DATABASE_URL)
+    try:
+        report = import_lexicon(engine, args.words, args.language, args.output, args.chunk_size)
+    finally:
+        engine.dispose()
+    print(f"Imported {report} in {time.perf_counter() - started:.1f}s")
+    if args.output:
+        print(f"Lexicon compiled to {args.output}")
+    if args.announce:
+        if asyncio.run(announce()):
+            print("Workers told to reload the lexicon")
+        else:
+            print("Warning: BROADCAST_URL is memory://, so no worker was told; restart them to load the new lexicon")
+
+
+def lexicon_build(args) -> None:
+    if not args.output:
+        print("No output path given and LEXICON_PATH is not set")
+        sys.exit(1)
+    build_lexicon(args.output, args.words)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="scrabble", description="Scrabble server administration")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    db = commands.add_parser("db", help="Database schema").add_subparsers(dest="action", required=True)
+
+    upgrade = db.add_parser("upgrade", help="Apply schema migrations (run once per deploy, before the API workers start)")
+    upgrade.add_argument("revision", nargs="?", default="head")
+    upgrade.set_defaults(handler=db_upgrade)
+
+    lexicon = commands.add_parser("lexicon", help="Dictionary and lexicon files").add_subparsers(dest="action", required=True)
+
+    importer = lexicon.add_parser("import", help="Replace the dictionary with a UTF-8 word list (one word per line)")
+    importer.add_argument("words", help="Word list, e.g. the OSPS forms")
+    importer.add_argument("--language", default="PL")
+    importer.add_argument("--output", default=LEXICON_PATH, help="Binary lexicon to write in the same pass (defaults to $LEXICON_PATH)")
+    importer.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Words held in memory at once")
+    importer.add_argument("--no-announce", dest="announce", action="store_false", help="Do not tell running workers to reload")
+    importer.set_defaults(handler=lexicon_import)
+
+    builder = lexicon.add_parser("build", help="Compile the binary lexicon from the dictionary table or a word list")
+    builder.add_argument("--output", default=LEXICON_PATH, help="Output path (defaults to $LEXICON_PATH)")
+    builder.add_argument("--words", help="UTF-8 word list to compile instead of the dictionary table")
+    builder.set_defaults(handler=lexicon_build)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
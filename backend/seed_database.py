@@ -1,10 +1,12 @@
+import os
 import sys
-import time
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
-from database import Base, DATABASE_URL
+from database import DATABASE_URL, wait_for_database
 from app.models import User, Dictionary, Ranking
-from app.auth import get_password_hash
+from app.services.passwords import get_executor, get_password_hash, shutdown_executor
+from app.services.lexicon import Lexicon, LEXICON_PATH
 
 # Common English Scrabble words
 # Common Polish Scrabble words (Subset for seeding)
@@ -43,30 +45,16 @@ COMMON_WORDS = [
 ]
 
 def seed_database():
-    """Seed database with initial data"""
-    print("Waiting for database to be ready...")
-    time.sleep(5)
-    
+    """Seed database with initial data (run after `python scrabble.py db upgrade`)"""
     engine = create_engine(DATABASE_URL)
     
-    # Wait for database connection
-    max_retries = 30
-    for i in range(max_retries):
-        try:
-            engine.connect()
-            print("Database connection established")
-            break
-        except Exception as e:
-            if i < max_retries - 1:
-                print(f"Waiting for database... ({i+1}/{max_retries})")
-                time.sleep(2)
-            else:
-                print(f"Could not connect to database: {e}")
-                sys.exit(1)
-    
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created")
+    # Proceeds as soon as the database answers instead of after a fixed delay
+    try:
+        wait_for_database(engine)
+    except OperationalError as e:
+        print(f"Could not connect to database: {e}")
+        sys.exit(1)
+    print("Database connection established")
     
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
@@ -80,13 +68,18 @@ def seed_database():
             # Seed dictionary
             unique_words = sorted(list(set(COMMON_WORDS)))
             print(f"Seeding dictionary with {len(unique_words)} words...")
-            for word in unique_words:
-                dict_entry = Dictionary(word=word.upper(), language="EN")
-                db.add(dict_entry)
-            
+            # One multi-row statement; full word lists go through `scrabble.py lexicon import`
+            db.execute(insert(Dictionary), [{"word": word.upper(), "language": "EN"} for word in unique_words])
             db.commit()
             print("Dictionary seeded successfully")
         
+        # Compile the lexicon file that the API workers map at startup; an existing file is
+        # kept (`scrabble.py lexicon import` rewrites it when the word list changes)
+        if LEXICON_PATH and (existing_words == 0 or not os.path.exists(LEXICON_PATH)):
+            lexicon = Lexicon.from_db(db)
+            lexicon.save(LEXICON_PATH)
+            print(f"Lexicon compiled to {LEXICON_PATH} ({len(lexicon)} words)")
+        
         # Check if test users exist
         test_user = db.query(User).filter(User.username == "player1").first()
         if not test_user:
@@ -100,11 +93,15 @@ def seed_database():
                 {"username": "player4", "email": "player4@example.com", "password": "password123"},
             ]
             
-            for user_data in test_users:
+            # Hash in parallel on the password pool rather than one bcrypt after another
+            hashes = list(get_executor().map(get_password_hash, [user_data["password"] for user_data in test_users]))
+            shutdown_executor()
+            
+            for user_data, hashed_password in zip(test_users, hashes):
                 user = User(
                     username=user_data["username"],
                     email=user_data["email"],
-                    hashed_password=get_password_hash(user_data["password"])
+                    hashed_password=hashed_password
                 )
                 db.add(user)
                 db.commit()
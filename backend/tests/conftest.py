@@ -0,0 +1,68 @@
+import os
+
+# Cheap hashes: the cost factor only matters against offline attacks
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from database import Base
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """Fresh SQLite database shared by every session of one test"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_db_engine(db_engine, tmp_path):
+    """The same database through the async driver used by request handlers and bots"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    yield engine
+
+
+@pytest.fixture
+def db(db_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db_engine, async_db_engine):
+    """API client whose sessions, including the lifespan warm-up, use the test database"""
+    from fastapi.testclient import TestClient
+
+    from app.auth import user_cache
+    from database import get_async_db, get_db, get_session_factory
+    from main import app
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    # Every TestClient request runs on a fresh event loop, so async connections must not be pooled
+    AsyncSessionLocal = async_sessionmaker(async_db_engine, class_=AsyncSession, autoflush=False,
+                                           expire_on_commit=False)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_session_factory] = lambda: AsyncSessionLocal
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    user_cache.clear()
@@ -1,35 +1,29 @@
+import json
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from database import Base, get_db
-from main import app
-
-# Use in-memory SQLite for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+from starlette.websockets import WebSocketDisconnect
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.auth import user_cache
+from app.services.passwords import login_limiter
+from app.routes import chat
 
-app.dependency_overrides[get_db] = override_get_db
-
-@pytest.fixture(scope="function")
-def client():
-    Base.metadata.create_all(bind=engine)
-    yield TestClient(app)
-    Base.metadata.drop_all(bind=engine)
 
 def test_health_check(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
+def test_ready_after_warm_up(client):
+    # Outside `with client:` the lifespan has not run, so the worker is not ready
+    assert client.get("/ready").status_code == 503
+    with client:
+        response = client.get("/ready")
+        assert response.status_code == 200
+        startup = response.json()["startup"]
+        assert startup["ready"] and startup["seconds"] > 0
+        assert {"import", "broadcast", "warm_up"} <= set(startup["phases"])
+    assert client.get("/ready").status_code == 503
+
 def test_register_user(client):
     response = client.post(
         "/api/auth/register",
@@ -71,6 +65,25 @@ def test_login_user(client):
     assert "access_token" in data
     assert data["token_type"] == "bearer"
 
+def test_login_concurrency_is_limited_per_client(client, monkeypatch):
+    client.post(
+        "/api/auth/register",
+        json={"username": "testuser", "email": "test@example.com", "password": "password123"}
+    )
+    
+    # Pretend this address already has a login in flight
+    monkeypatch.setattr(login_limiter, "limit", 1)
+    login_limiter.acquire("testclient")
+    try:
+        response = client.post("/api/auth/login", json={"username": "testuser", "password": "password123"})
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        login_limiter.release("testclient")
+    
+    response = client.post("/api/auth/login", json={"username": "testuser", "password": "password123"})
+    assert response.status_code == 200
+
 def test_login_invalid_credentials(client):
     response = client.post(
         "/api/auth/login",
@@ -105,3 +118,232 @@ def test_create_game(client):
 def test_unauthorized_access(client):
     response = client.get("/api/games")
     assert response.status_code == 401
+
+def register_and_login(client, username):
+    client.post(
+        "/api/auth/register",
+        json={"username": username, "email": f"{username}@example.com", "password": "password123"}
+    )
+    response = client.post(
+        "/api/auth/login",
+        json={"username": username, "password": "password123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_game_events_websocket(client):
+    with client:
+        host = register_and_login(client, "host")
+        guest = register_and_login(client, "guest")
+        game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+        
+        with client.websocket_connect(f"/ws/games/{game_id}") as websocket:
+            client.post(f"/api/games/{game_id}/join", headers=guest)
+            event = websocket.receive_json()
+            assert event["type"] == "join"
+            assert event["player"]["username"] == "guest"
+            assert event["player"]["player_order"] == 1
+            
+            client.post(f"/api/games/{game_id}/start", headers=host)
+            assert websocket.receive_json() == {"type": "start", "status": "active", "current_turn": 0}
+            
+            client.post(f"/api/games/{game_id}/moves", json={"tiles": [], "is_pass": True}, headers=host)
+            event = websocket.receive_json()
+            assert event["type"] == "move"
+            assert event["is_pass"] is True
+            assert event["current_turn"] == 1
+            assert event["remaining_tiles"] == 86
+
+def test_authenticated_requests_skip_user_lookup(client):
+    host = register_and_login(client, "host")
+    profile, queries = count_queries(client, "/api/profile", host)
+    assert profile["username"] == "host"
+    assert queries == 0
+    
+    # Another worker, or an expired entry: one lookup by id, then cached again
+    user_cache.clear()
+    assert count_queries(client, "/api/profile", host)[1] == 1
+    assert count_queries(client, "/api/profile", host)[1] == 0
+
+def test_chat_websocket_stores_each_message(client):
+    with client:
+        host = register_and_login(client, "host")
+        game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+        user_id = client.get("/api/profile", headers=host).json()["id"]
+        
+        token = host["Authorization"].split()[1]
+        with client.websocket_connect(f"/ws/chat/{game_id}?token={token}") as websocket:
+            broadcast = []
+            for text in ("hello", "again"):
+                websocket.send_json({"username": "host", "user_id": user_id, "message": text})
+                broadcast.append(websocket.receive_json())
+            assert [m["message"] for m in broadcast] == ["hello", "again"]
+            
+            # The open socket holds no pooled connection between messages
+            metrics = client.get("/api/metrics").json()
+            assert metrics["database"]["async"].get("checked_out", 0) == 0
+    
+    # Shutdown flushed the writer's buffer; the ids given out at broadcast are the stored ones
+    messages = client.get(f"/api/games/{game_id}/messages").json()
+    assert messages == broadcast
+
+def test_chat_websocket_speaks_only_for_the_token_holder(client):
+    with client:
+        host = register_and_login(client, "host")
+        guest_id = client.get("/api/profile", headers=register_and_login(client, "guest")).json()["id"]
+        game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+        
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(f"/ws/chat/{game_id}?token=forged") as websocket:
+                websocket.receive_json()
+        assert closed.value.code == 1008
+        
+        token = host["Authorization"].split()[1]
+        with client.websocket_connect(f"/ws/chat/{game_id}?token={token}") as websocket:
+            websocket.send_json({"username": "guest", "user_id": guest_id, "message": "spoofed"})
+            websocket.send_json({"username": "host", "message": "x" * 501})
+            websocket.send_json({"username": "guest", "message": "mine"})
+            received = websocket.receive_json()
+    assert received["message"] == "mine" and received["username"] == "host"
+    assert [m["message"] for m in client.get(f"/api/games/{game_id}/messages").json()] == ["mine"]
+
+def count_queries(client, url, headers):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(Engine, "before_cursor_execute", listener)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(Engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    return response.json(), len(statements)
+
+def test_list_games_query_count_is_constant(client):
+    host = register_and_login(client, "host")
+    guest = register_and_login(client, "guest")
+    game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+    client.post(f"/api/games/{game_id}/join", headers=guest)
+    
+    games, baseline = count_queries(client, "/api/games", host)
+    assert len(games) == 1
+    
+    for _ in range(5):
+        game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+        client.post(f"/api/games/{game_id}/join", headers=guest)
+    
+    games, queries = count_queries(client, "/api/games", host)
+    assert len(games) == 6
+    assert queries == baseline
+    assert [p["username"] for p in games[0]["players"]] == ["host", "guest"]
+
+def test_list_games_filters_and_paginates(client):
+    host = register_and_login(client, "host")
+    guest = register_and_login(client, "guest")
+    ids = [client.post("/api/games", json={}, headers=host).json()["id"] for _ in range(3)]
+    client.post(f"/api/games/{ids[0]}/join", headers=guest)
+    client.post(f"/api/games/{ids[0]}/start", headers=host)
+    
+    active = client.get("/api/games?status=active", headers=host).json()
+    assert [g["id"] for g in active] == [ids[0]]
+    
+    page = client.get("/api/games?status=waiting&status=active&limit=2&offset=1", headers=host).json()
+    assert [g["id"] for g in page] == [ids[1], ids[0]]
+    
+    assert client.get("/api/games?status=bogus", headers=host).status_code == 400
+
+def test_lobby_summary_uses_etags(client):
+    host = register_and_login(client, "host")
+    guest = register_and_login(client, "guest")
+    game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+    
+    response = client.get("/api/games/lobby", headers=host)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    lobby = response.json()
+    assert lobby[0]["id"] == game_id
+    assert "board_state" not in lobby[0]
+    assert [p["username"] for p in lobby[0]["players"]] == ["host"]
+    
+    # An unchanged lobby is answered from memory: only the auth lookup reaches the database
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(Engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/games/lobby", headers={**host, "If-None-Match": etag})
+    finally:
+        event.remove(Engine, "before_cursor_execute", listener)
+    assert response.status_code == 304
+    assert not any("games" in statement for statement in statements)
+    
+    client.post(f"/api/games/{game_id}/join", headers=guest)
+    response = client.get("/api/games/lobby", headers={**host, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["version"] > lobby[0]["version"]
+    assert len(response.json()[0]["players"]) == 2
+    
+    # Moves leave the lobby cached; only the TTL refreshes its turns and scores
+    client.post(f"/api/games/{game_id}/start", headers=host)
+    etag = client.get("/api/games/lobby", headers=host).headers["ETag"]
+    assert client.post(f"/api/games/{game_id}/moves", json={"tiles": [], "is_pass": True}, headers=host).status_code == 200
+    assert client.get("/api/games/lobby", headers={**host, "If-None-Match": etag}).status_code == 304
+
+def test_replay_endpoint(client):
+    host = register_and_login(client, "host")
+    guest = register_and_login(client, "guest")
+    game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+    assert client.get(f"/api/games/{game_id}/replay", headers=host).status_code == 400
+    
+    client.post(f"/api/games/{game_id}/join", headers=guest)
+    client.post(f"/api/games/{game_id}/start", headers=host)
+    client.post(f"/api/games/{game_id}/moves", json={"tiles": [], "is_pass": True}, headers=host)
+    
+    replayed = client.get(f"/api/games/{game_id}/replay", headers=host).json()
+    assert replayed["move_number"] == 1
+    assert replayed["remaining_tiles"] == 86
+    assert [p["username"] for p in replayed["players"]] == ["host", "guest"]
+    
+    start = client.get(f"/api/games/{game_id}/replay?move_number=0", headers=host).json()
+    assert start["move_number"] == 0
+    assert all(cell is None for row in start["board_state"] for cell in row)
+
+def test_history_is_one_query_with_keyset_pages(client):
+    host = register_and_login(client, "host")
+    guest = register_and_login(client, "guest")
+    game_ids = [client.post("/api/games", json={}, headers=host).json()["id"] for _ in range(3)]
+    client.post(f"/api/games/{game_ids[1]}/join", headers=guest)
+    
+    history, queries = count_queries(client, "/api/history?limit=2", host)
+    assert queries == 1
+    assert [game["id"] for game in history] == [game_ids[2], game_ids[1]]
+    assert history[1]["total_players"] == 2
+    assert history[1]["player_rank"] == 1
+    
+    history, _ = count_queries(client, f"/api/history?limit=2&before={history[-1]['id']}", host)
+    assert [game["id"] for game in history] == [game_ids[0]]
+    
+    history, _ = count_queries(client, "/api/history", guest)
+    assert [(game["id"], game["total_players"]) for game in history] == [(game_ids[1], 2)]
+
+def test_chat_history_pages_and_streams(client, monkeypatch):
+    with client:
+        host = register_and_login(client, "host")
+        game_id = client.post("/api/games", json={}, headers=host).json()["id"]
+        user_id = client.get("/api/profile", headers=host).json()["id"]
+        token = host["Authorization"].split()[1]
+        with client.websocket_connect(f"/ws/chat/{game_id}?token={token}") as websocket:
+            for i in range(5):
+                websocket.send_json({"username": "host", "user_id": user_id, "message": f"m{i}"})
+                websocket.receive_json()
+    
+    latest = client.get(f"/api/games/{game_id}/messages?limit=2").json()
+    assert [m["message"] for m in latest] == ["m3", "m4"]
+    older = client.get(f"/api/games/{game_id}/messages?limit=2&before={latest[0]['id']}").json()
+    assert [m["message"] for m in older] == ["m1", "m2"]
+    missed = client.get(f"/api/games/{game_id}/messages?since_id={older[0]['id']}").json()
+    assert [m["message"] for m in missed] == ["m2", "m3", "m4"]
+    
+    # Several keyset batches make up one export
+    monkeypatch.setattr(chat, "CHAT_EXPORT_BATCH", 2)
+    response = client.get(f"/api/games/{game_id}/messages?format=ndjson&since_id={older[0]['id']}")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["message"] for line in response.text.splitlines()] == ["m2", "m3", "m4"]
@@ -0,0 +1,50 @@
+import pytest
+
+from app.services.board import Board
+
+
+def test_round_trip_through_bytes_and_json():
+    board = Board()
+    board.place(7, 7, 'Ż')
+    board.place(7, 8, 'A', is_blank=True)
+
+    data = board.to_bytes()
+    assert len(data) == 225
+    restored = Board.from_bytes(data)
+    assert restored.letter(7, 7) == 'Ż'
+    assert restored.is_blank(7, 8)
+    assert not restored.is_blank(7, 7)
+
+    rows = restored.to_json()
+    assert rows[7][7] == {'letter': 'Ż', 'is_blank': False}
+    assert rows[7][8] == {'letter': 'A', 'is_blank': True}
+    assert rows[0][0] is None
+    assert Board.from_json(rows).to_bytes() == data
+
+
+def test_bitboards_track_occupancy():
+    board = Board()
+    assert board.is_empty()
+    for col in (3, 4, 6):
+        board.place(2, col, 'A')
+    assert board.row_filled(2, 3, 4)
+    assert not board.row_filled(2, 3, 6)
+    assert board.col_filled(4, 2, 2)
+
+    board.remove(2, 4)
+    assert not board.occupied(2, 4)
+    assert board.row_bits[2] == (1 << 3) | (1 << 6)
+    assert board.col_bits[4] == 0
+
+
+def test_place_rejects_bad_input():
+    board = Board()
+    board.place(0, 0, 'K')
+    with pytest.raises(ValueError):
+        board.place(0, 0, 'O')
+    with pytest.raises(ValueError):
+        board.place(0, 1, 'Q')
+    with pytest.raises(ValueError):
+        board.place(15, 0, 'O')
+    with pytest.raises(ValueError):
+        Board(b"\x00" * 10)
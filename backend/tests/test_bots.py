@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from app.models import Dictionary, Game, GameMove, User
+from app.services import bots
+from app.services.board import Board
+from app.services.game_service import GameService
+from app.services.lexicon import Lexicon, invalidate_lexicon
+from app.services.move_generator import MoveGenerator
+
+WORDS = ["DOM", "DOMY", "DO", "OD", "MY", "KOT", "KOTY", "TY", "OKO", "TOK", "NOS", "NOSY", "SOK", "ON", "TO"]
+
+
+@pytest.fixture
+def generator():
+    return MoveGenerator(Lexicon.from_words(WORDS))
+
+
+def empty_board():
+    return Board().to_bytes()
+
+
+def test_greedy_bot_plays_best_move(generator):
+    decision = bots.choose_move(empty_board(), list("DOMYKTS"), "greedy", [], 80, 1.0, generator=generator)
+    best = generator.generate(Board(), list("DOMYKTS"), limit=1)[0]
+    assert decision['type'] == 'play'
+    assert decision['tiles'] == best['tiles']
+
+
+def test_simulation_bot_respects_time_budget(generator):
+    unseen = list("AAEEIIOONNSSTTKKDDMMYY")
+    decision = bots.choose_move(empty_board(), list("DOMYKTS"), "simulation", unseen, 80, 0.2, generator=generator)
+    assert decision['type'] == 'play'
+    assert decision['tiles']
+
+
+def test_bot_without_moves_exchanges_or_passes(generator):
+    assert bots.choose_move(empty_board(), list("ŹŹŹ"), "greedy", [], 50, 1.0, generator=generator)['type'] == 'exchange'
+    assert bots.choose_move(empty_board(), list("ŹŹŹ"), "greedy", [], 3, 1.0, generator=generator)['type'] == 'pass'
+
+
+def bot_game(db):
+    """A started game of a human (to move) against a greedy bot holding a playable rack"""
+    db.add_all([Dictionary(word=word) for word in WORDS])
+    human = User(username="human", email="human@example.com", hashed_password="x")
+    db.add(human)
+    db.commit()
+
+    service = GameService(db)
+    game = service.create_game()
+    service.join_game(game.id, human.id)
+    bot_player = service.add_bot(game.id, "greedy")
+    assert bot_player.player_order == 1
+    assert service.start_game(game.id)
+
+    bot_player.rack = list("DOMYKTS")
+    db.commit()
+    return service, game.id, human.id, bot_player.user_id
+
+
+def run_bots(coroutine):
+    invalidate_lexicon()
+    try:
+        return asyncio.run(coroutine)
+    finally:
+        bots.shutdown_executor()
+        invalidate_lexicon()
+
+
+def assert_bot_moved(db, game_id, bot_id):
+    db.expire_all()
+    assert db.query(Game).filter(Game.id == game_id).first().current_turn == 2
+    assert db.query(GameMove).filter(GameMove.user_id == bot_id).one().score > 0
+
+
+def test_bot_takes_its_turn_after_human(db, async_db_engine):
+    service, game_id, human_id, bot_id = bot_game(db)
+    _, error = service.make_move(game_id, human_id, [], is_pass=True)
+    assert error is None
+
+    run_bots(bots.run_bot_turns(game_id, async_db_engine, time_budget=1.0))
+    assert_bot_moved(db, game_id, bot_id)
+
+
+def test_turn_handed_over_while_runner_leaves_is_played(db, async_db_engine, monkeypatch):
+    service, game_id, human_id, bot_id = bot_game(db)
+    load_turn = bots._load_turn
+
+    def human_moves_meanwhile(session, game_id):
+        turn = load_turn(session, game_id)
+        if turn is None and not service.db.query(GameMove).count():
+            # The runner has seen the human to move; the human's move now asks for a runner of its own
+            assert service.make_move(game_id, human_id, [], is_pass=True)[1] is None
+            asyncio.get_running_loop().create_task(bots.run_bot_turns(game_id, async_db_engine, time_budget=1.0))
+        return turn
+
+    monkeypatch.setattr(bots, "_load_turn", human_moves_meanwhile)
+    run_bots(bots.run_bot_turns(game_id, async_db_engine, time_budget=1.0))
+    assert_bot_moved(db, game_id, bot_id)
+
+
+def test_waiting_bot_turns_resume_at_startup(db, async_db_engine):
+    service, game_id, human_id, bot_id = bot_game(db)
+    _, error = service.make_move(game_id, human_id, [], is_pass=True)
+    assert error is None
+
+    async def resume():
+        assert await bots.resume_bot_turns(async_db_engine) == 1
+        await asyncio.gather(*bots._resumed)
+
+    run_bots(resume())
+    assert_bot_moved(db, game_id, bot_id)
+
+
+def test_bots_reuse_accounts_across_games(db):
+    service = GameService(db)
+    first = service.create_game()
+    second = service.create_game()
+    a = service.add_bot(first.id, "greedy")
+    b = service.add_bot(first.id, "greedy")
+    c = service.add_bot(second.id, "greedy")
+    assert a.user_id != b.user_id
+    assert c.user_id == a.user_id
+    assert service.add_bot(first.id, "grandmaster") is None
@@ -0,0 +1,200 @@
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
+
+from app.routes import chat
+from app.services import broadcast
+from app.routes.chat import ConnectionManager
+from app.services.broadcast import (
+    NOTIFY_PAYLOAD_LIMIT, BroadcastBackend, BroadcastBroker, MemoryBroadcast, PostgresBroadcast, UnixSocketBroadcast
+)
+
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        await self.unblocked.wait()
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out waiting for delivery"
+        await asyncio.sleep(0.01)
+
+
+def test_memory_backend_delivers_locally():
+    async def scenario():
+        manager = ConnectionManager("chat", MemoryBroadcast())
+        first, second, other_game = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(first, 1)
+        await manager.connect(second, 1)
+        await manager.connect(other_game, 2)
+
+        await manager.broadcast("hello", 1)
+        await wait_for(lambda: first.sent and second.sent)
+        assert first.sent == ["hello"] and second.sent == ["hello"]
+        assert other_game.sent == []
+
+        await manager.disconnect(first, 1)
+        await manager.disconnect(second, 1)
+        await manager.broadcast("nobody left", 1)
+        await asyncio.sleep(0.05)
+        assert first.sent == ["hello"]
+
+    asyncio.run(scenario())
+
+
+def test_backends_must_implement_pub_sub():
+    with pytest.raises(TypeError):
+        BroadcastBackend()
+
+
+def test_postgres_rejects_payloads_notify_cannot_carry():
+    backend = PostgresBroadcast("postgresql+psycopg2://nobody@nowhere/none")
+    # Refused before any connection is attempted
+    with pytest.raises(ValueError):
+        asyncio.run(backend.publish("chat:1", "ż" * (NOTIFY_PAYLOAD_LIMIT // 2)))
+
+
+class FakeConnection:
+    """psycopg2 connection stand-in whose socket the loop can watch"""
+
+    def __init__(self):
+        self.ours, self.theirs = socket.socketpair()
+        self.executed = []
+        self.notifies = []
+        self.broken = False
+
+    def fileno(self):
+        return self.ours.fileno()
+
+    def poll(self):
+        self.ours.recv(64)
+        if self.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, statement, params=None):
+                connection.executed.append(repr(statement))
+
+        return Cursor()
+
+    def close(self):
+        self.ours.close()
+        self.theirs.close()
+
+
+def test_postgres_listener_reconnects_and_listens_again(monkeypatch):
+    monkeypatch.setattr(broadcast, "RECONNECT_DELAY", 0.01)
+    connections = []
+    backend = PostgresBroadcast("postgresql://nobody@nowhere/none")
+    monkeypatch.setattr(backend, "_connect", lambda: connections.append(FakeConnection()) or connections[-1])
+
+    async def scenario():
+        received = []
+
+        async def handler(channel, message):
+            received.append((channel, message))
+
+        await backend.subscribe("lobby", handler)
+        await backend.subscribe("rankings", handler)
+        notifier, listener = connections
+        assert len(listener.executed) == 2
+
+        listener.broken = True
+        listener.theirs.send(b"x")
+        await wait_for(lambda: len(connections) == 3 and backend._listener is connections[2])
+        reopened = connections[2]
+        assert [statement for statement in reopened.executed if "LISTEN" in statement] == [
+            "Composed([SQL('LISTEN '), Identifier('lobby')])", "Composed([SQL('LISTEN '), Identifier('rankings')])"
+        ]
+
+        reopened.notifies.append(SimpleNamespace(channel="lobby", payload="7"))
+        reopened.theirs.send(b"x")
+        await wait_for(lambda: received)
+        assert received == [("lobby", "7")]
+        await backend.disconnect()
+
+    asyncio.run(scenario())
+
+
+def test_slow_client_is_evicted_without_delaying_others(monkeypatch):
+    monkeypatch.setattr(chat, "SEND_QUEUE_SIZE", 2)
+
+    async def scenario():
+        manager = ConnectionManager("game", MemoryBroadcast())
+        stuck, healthy = FakeWebSocket(blocked=True), FakeWebSocket()
+        await manager.connect(stuck, 3)
+        await manager.connect(healthy, 3)
+
+        # The stuck socket holds one message in flight and two queued, then overflows
+        for i in range(4):
+            await manager.broadcast(str(i), 3)
+            await asyncio.sleep(0.01)
+        await wait_for(lambda: len(healthy.sent) == 4)
+
+        assert healthy.sent == ["0", "1", "2", "3"]
+        assert stuck.closed_with == chat.SLOW_CONSUMER_CLOSE_CODE
+        assert [c.websocket for c in manager.active_connections[3]] == [healthy]
+        stats = manager.stats()
+        assert stats["evictions"] == 1
+        assert stats["connections"] == 1
+        assert stats["fanout_latency"][3]["count"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_unix_broker_fans_out_across_workers(tmp_path):
+    async def scenario():
+        broker = BroadcastBroker(str(tmp_path / "broker.sock"))
+        await broker.start()
+        # Two managers with their own broker connections stand in for two uvicorn workers
+        worker_a = ConnectionManager("game", UnixSocketBroadcast(broker.path))
+        worker_b = ConnectionManager("game", UnixSocketBroadcast(broker.path))
+        try:
+            on_a, on_b, also_on_b = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+            await worker_a.connect(on_a, 7)
+            await worker_b.connect(on_b, 7)
+            await worker_b.connect(also_on_b, 7)
+            await wait_for(lambda: len(broker.subscribers.get("game:7", ())) == 2)
+
+            await worker_a.broadcast('{"type": "move"}', 7)
+            await wait_for(lambda: on_a.sent and on_b.sent and also_on_b.sent)
+            assert on_a.sent == on_b.sent == also_on_b.sent == ['{"type": "move"}']
+
+            # The last local socket leaving drops this worker's subscription
+            await worker_b.disconnect(on_b, 7)
+            await worker_b.disconnect(also_on_b, 7)
+            await wait_for(lambda: len(broker.subscribers.get("game:7", ())) == 1)
+        finally:
+            await worker_a.backend.disconnect()
+            await worker_b.backend.disconnect()
+            await broker.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models import ChatMessage, Game, User
+from app.services.chat_ingest import SEQUENCE_BITS, WORKER_BITS, ChatWriter, MessageIds, WorkerIdLease
+
+
+def test_message_ids_increase_within_a_millisecond():
+    ids = MessageIds(worker_id=5)
+    issued = [ids.next() for _ in range(10000)]
+    assert issued == sorted(set(issued))
+    assert all((i >> SEQUENCE_BITS) & ((1 << WORKER_BITS) - 1) == 5 for i in issued)
+    # Exact as a JavaScript number
+    assert issued[-1] < 2 ** 53
+
+
+def test_worker_id_is_configured_or_claimed(async_db_engine):
+    with pytest.raises(RuntimeError):
+        MessageIds().next()
+    factory = async_sessionmaker(async_db_engine)
+    assert asyncio.run(WorkerIdLease("7").claim(factory)) == 7
+    with pytest.raises(ValueError):
+        asyncio.run(WorkerIdLease("32").claim(factory))
+    # SQLite has no advisory locks: a single worker is assumed
+    assert asyncio.run(WorkerIdLease(None).claim(factory)) == 0
+
+
+def test_writer_flushes_by_size_and_by_time(db, async_db_engine):
+    user = User(username="host", email="host@example.com", hashed_password="x")
+    game = Game()
+    db.add_all([user, game])
+    db.commit()
+    writer = ChatWriter(batch_size=10, interval=0.05, session_factory=async_sessionmaker(async_db_engine), worker_id=1)
+
+    async def scenario():
+        for i in range(25):
+            await writer.submit(game.id, user.id, f"m{i}")
+        # Two full batches go at once, the last five when the interval runs out
+        await asyncio.sleep(0.3)
+        assert writer.stats()["queued"] == 0
+        await writer.submit(game.id, user.id, "last")
+        await writer.stop()
+
+    asyncio.run(scenario())
+    assert writer.batches == 4
+    assert writer.written == 26 and writer.failed == 0
+    stored = [m for m, in db.query(ChatMessage.message).order_by(ChatMessage.id)]
+    assert stored == [f"m{i}" for i in range(25)] + ["last"]
+
+
+def test_writer_keeps_the_good_rows_of_a_failed_batch(db, async_db_engine):
+    user = User(username="host", email="host@example.com", hashed_password="x")
+    game = Game()
+    db.add_all([user, game])
+    db.commit()
+    writer = ChatWriter(session_factory=async_sessionmaker(async_db_engine), worker_id=1)
+    rows = [
+        {"id": i, "game_id": game.id, "user_id": user.id, "message": f"m{i}", "created_at": datetime.utcnow()}
+        for i in (1, 2, 3)
+    ]
+
+    async def scenario():
+        await writer._write([rows[0]])
+        # The id of m1 again, so the multi-row insert fails
+        await writer._write([rows[1], dict(rows[0], message="duplicate"), rows[2]])
+
+    asyncio.run(scenario())
+    assert writer.written == 3 and writer.failed == 1
+    assert [m for m, in db.query(ChatMessage.message).order_by(ChatMessage.id)] == ["m1", "m2", "m3"]
@@ -0,0 +1,107 @@
+import random
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game, GameMove, User
+from app.services import game_service
+from app.services.game_service import GameService
+from app.services.game_state import GameState, game_states, replay
+from app.services.lexicon import Lexicon
+from app.services.move_generator import MoveGenerator
+from database import Base
+
+WORDS = ["AD", "ALE", "DA", "DO", "DOM", "KOT", "MA", "NA", "NIE", "NOS", "OD", "ON", "TO", "ZA", "ZE"]
+THREADS = 12
+ATTEMPTS = 30
+
+
+class NoLocks:
+    """Stand-in for separate worker processes: only the version column serializes moves"""
+
+    def hold(self, game_id):
+        return threading.Lock()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    # A file database so every thread gets its own connection, as workers would
+    engine = create_engine(f"sqlite:///{tmp_path / 'stress.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def tiles_in_game(state):
+    return sum(1 for _ in state.board.tiles()) + sum(len(p.rack) for p in state.players) + len(state.bag)
+
+
+@pytest.mark.parametrize("locking", [True, False])
+def test_concurrent_moves_conserve_tiles(file_engine, monkeypatch, locking):
+    if not locking:
+        monkeypatch.setattr(game_service, "game_locks", NoLocks())
+    game_states.clear()
+    lexicon = Lexicon.from_words(WORDS)
+    Session = sessionmaker(bind=file_engine)
+
+    with Session() as db:
+        users = [User(username=f"player{i}", email=f"p{i}@example.com", hashed_password="x") for i in range(3)]
+        db.add_all(users)
+        db.commit()
+        service = GameService(db, lexicon=lexicon)
+        game_ids = []
+        for _ in range(2):
+            game = service.create_game()
+            for user in users:
+                service.join_game(game.id, user.id)
+            assert service.start_game(game.id)
+            game_ids.append(game.id)
+
+    errors = []
+    generator = MoveGenerator(lexicon)
+
+    def player_thread(seed):
+        rng = random.Random(seed)
+        try:
+            with Session() as db:
+                service = GameService(db, lexicon=lexicon)
+                for _ in range(ATTEMPTS):
+                    game_id = rng.choice(game_ids)
+                    state = GameState.load(db, game_id)
+                    db.rollback()
+                    mover = state.player_to_move()
+                    # Several threads usually submit for the same turn, like a double click
+                    plays = generator.generate(state.board, mover.rack, limit=3)
+                    if plays:
+                        service.make_move(game_id, mover.user_id, rng.choice(plays)['tiles'])
+                    elif len(state.bag) >= 2:
+                        service.make_move(game_id, mover.user_id, [], is_exchange=True, exchange_tiles=mover.rack[:2])
+                    else:
+                        service.make_move(game_id, mover.user_id, [], is_pass=True)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=player_thread, args=(seed,)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with Session() as db:
+        for game_id in game_ids:
+            state = GameState.load(db, game_id)
+            assert tiles_in_game(state) == 100
+            # The move log alone rebuilds the same game
+            replayed = replay(db, game_id, state.current_turn)
+            assert replayed.board.to_bytes() == state.board.to_bytes()
+            assert sorted(replayed.bag) == sorted(state.bag)
+            assert [p.rack for p in replayed.players] == [p.rack for p in state.players]
+            game = db.query(Game).filter(Game.id == game_id).one()
+            numbers = [n for n, in db.query(GameMove.move_number).filter(GameMove.game_id == game_id).order_by(GameMove.move_number)]
+            # Exactly one move was accepted per turn
+            assert numbers == list(range(game.current_turn))
+            assert game.current_turn > 0
+    game_states.clear()
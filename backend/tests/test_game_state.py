@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import event
+
+from app.models import Game, GamePlayer, GameSnapshot, User
+from app.services.game_service import GameService
+from app.services import game_state
+from app.services.game_state import GameState, GameStateCache, game_states, replay
+from app.services.lexicon import Lexicon
+
+
+@pytest.fixture
+def started_game(db):
+    game_states.clear()
+    users = [User(username=f"player{i}", email=f"p{i}@example.com", hashed_password="x") for i in range(2)]
+    db.add_all(users)
+    db.commit()
+    service = GameService(db, lexicon=Lexicon.from_words(["DOM"]))
+    game = service.create_game()
+    for user in users:
+        service.join_game(game.id, user.id)
+    assert service.start_game(game.id)
+    yield service, game.id, [user.id for user in users]
+    game_states.clear()
+
+
+def test_cached_move_only_writes(started_game, db, db_engine):
+    service, game_id, (first, second) = started_game
+    assert service.make_move(game_id, first, [], is_pass=True)[1] is None
+
+    statements = []
+    listener = lambda *args: statements.append(args[2].split()[0])
+    event.listen(db_engine, "before_cursor_execute", listener)
+    try:
+        move, error = service.make_move(game_id, second, [], is_pass=True)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", listener)
+
+    assert error is None
+    assert move.id is not None and move.is_pass
+    assert statements == ["UPDATE", "UPDATE", "INSERT"]
+
+    db.expire_all()
+    game = db.query(Game).filter(Game.id == game_id).one()
+    assert game.current_turn == 2
+    assert game.version == game_states.get(game_id).version
+
+
+def test_stale_cache_loses_to_version_check(started_game, db):
+    service, game_id, (first, second) = started_game
+    stale = GameState.load(db, game_id)
+    assert service.make_move(game_id, first, [], is_pass=True)[1] is None
+
+    # Pretend another worker made that move: this worker still holds the old snapshot
+    game_states.evict(game_id)
+    game_states.put(stale)
+    assert service.make_move(game_id, first, [], is_pass=True) == (None, "Not your turn")
+    assert service.make_move(game_id, second, [], is_pass=True)[1] is None
+    assert game_states.get(game_id).current_turn == 2
+
+
+def test_exchange_keeps_tile_count(started_game, db):
+    service, game_id, (first, _) = started_game
+    rack = list(game_states.load(db, game_id).player(first).rack)
+    assert service.make_move(game_id, first, [], is_exchange=True, exchange_tiles=rack[:3])[1] is None
+
+    db.expire_all()
+    seat = db.query(GamePlayer).filter(GamePlayer.game_id == game_id, GamePlayer.user_id == first).one()
+    assert len(seat.rack) == 7
+    assert len(GameState.load(db, game_id).bag) == 100 - 14
+
+
+def test_replay_rebuilds_every_move_from_snapshots(started_game, db, monkeypatch):
+    monkeypatch.setattr(game_state, "SNAPSHOT_INTERVAL", 3)
+    service, game_id, players = started_game
+    history = [GameState.load(db, game_id)]
+    for turn in range(8):
+        user_id = players[turn % 2]
+        if turn % 3 == 2:
+            assert service.make_move(game_id, user_id, [], is_pass=True)[1] is None
+        else:
+            rack = game_states.load(db, game_id).player(user_id).rack
+            assert service.make_move(game_id, user_id, [], is_exchange=True, exchange_tiles=rack[:turn % 4 + 1])[1] is None
+        history.append(game_states.load(db, game_id))
+
+    assert [n for n, in db.query(GameSnapshot.move_number).filter(GameSnapshot.game_id == game_id).order_by(GameSnapshot.move_number)] == [0, 3, 6]
+    for move_number, expected in enumerate(history):
+        replayed = replay(db, game_id, move_number)
+        assert replayed.current_turn == move_number
+        assert sorted(replayed.bag) == sorted(expected.bag)
+        assert [p.rack for p in replayed.players] == [p.rack for p in expected.players]
+
+
+def test_game_without_snapshot_is_loaded_read_only(started_game, db):
+    service, game_id, (first, second) = started_game
+    # A game started before moves were logged
+    db.query(GameSnapshot).filter(GameSnapshot.game_id == game_id).delete()
+    db.commit()
+
+    state = GameState.load(db, game_id)
+    assert state.snapshot_turn is None and len(state.bag) == 86
+    assert not db.new and not db.dirty
+    assert db.query(GameSnapshot).filter(GameSnapshot.game_id == game_id).count() == 0
+
+    # The first move starts the log with a snapshot of its result
+    assert service.make_move(game_id, first, [], is_pass=True)[1] is None
+    assert [n for n, in db.query(GameSnapshot.move_number).filter(GameSnapshot.game_id == game_id)] == [1]
+    assert game_states.load(db, game_id).snapshot_turn == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = GameStateCache(capacity=2)
+    states = [GameState(i, "active", 0, 0, None, [], []) for i in range(3)]
+    cache.put(states[0])
+    cache.put(states[1])
+    cache.get(0)
+    cache.put(states[2])
+    assert cache.get(1) is None
+    assert cache.get(0) is states[0] and cache.get(2) is states[2]
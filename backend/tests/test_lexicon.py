@@ -0,0 +1,134 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Dictionary
+from app.services import lexicon as lexicon_module
+from app.services.lexicon import DawgBuilder, Lexicon, get_lexicon, get_lexicon_async, invalidate_lexicon
+
+WORDS = ["DOM", "DOMY", "DOMEK", "KOT", "KOTY", "KOTEK", "ŁOŚ", "ŁOSIE", "ŻABA"]
+
+
+@pytest.fixture
+def lexicon():
+    return Lexicon.from_words(WORDS)
+
+
+def test_membership(lexicon):
+    for word in WORDS:
+        assert word in lexicon
+    assert "dom" in lexicon
+    assert "DO" not in lexicon
+    assert "DOMKI" not in lexicon
+    assert "" not in lexicon
+    assert len(lexicon) == len(WORDS)
+
+
+def test_prefix_queries(lexicon):
+    assert lexicon.has_prefix("DOM")
+    assert lexicon.has_prefix("ŁO")
+    assert not lexicon.has_prefix("DX")
+    assert lexicon.words_with_prefix("DOM") == ["DOM", "DOMEK", "DOMY"]
+    assert lexicon.words_with_prefix("KOT", limit=2) == ["KOT", "KOTEK"]
+    assert lexicon.words_with_prefix("X") == []
+
+
+def test_suffix_queries(lexicon):
+    assert lexicon.has_suffix("EK")
+    assert not lexicon.has_suffix("XYZ")
+    assert sorted(lexicon.words_with_suffix("EK")) == ["DOMEK", "KOTEK"]
+    assert sorted(lexicon.words_with_suffix("Y")) == ["DOMY", "KOTY"]
+
+
+def test_shared_suffixes_are_merged():
+    # DOMY and KOTY end in the same final state, so the minimal graph shares it
+    builder = DawgBuilder()
+    for word in ["DOMY", "KOTY"]:
+        builder.add(word)
+    root = builder.finish()
+    dom_tail = root.edges["D"].edges["O"].edges["M"]
+    kot_tail = root.edges["K"].edges["O"].edges["T"]
+    assert dom_tail is kot_tail
+
+
+def test_builder_rejects_unsorted_input():
+    builder = DawgBuilder()
+    builder.add("KOT")
+    with pytest.raises(ValueError):
+        builder.add("DOM")
+
+
+def test_lexicon_is_loaded_from_database_once(db, db_engine):
+    db.add_all([Dictionary(word=word) for word in WORDS])
+    db.commit()
+
+    statements = []
+    event.listen(db_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    invalidate_lexicon()
+    try:
+        lexicon = get_lexicon(db)
+        assert get_lexicon(db) is lexicon
+        assert all(word in lexicon for word in WORDS)
+        assert len(statements) == 1
+    finally:
+        invalidate_lexicon()
+
+
+def test_async_lexicon_is_built_off_the_event_loop(db, async_db_engine, monkeypatch):
+    db.add_all([Dictionary(word=word) for word in WORDS])
+    db.commit()
+    builders = []
+    from_words = Lexicon.from_words.__func__
+    monkeypatch.setattr(Lexicon, "from_words", classmethod(
+        lambda cls, words: builders.append(threading.current_thread()) or from_words(cls, words)
+    ))
+
+    async def load():
+        async with AsyncSession(async_db_engine) as session:
+            return await get_lexicon_async(session), await get_lexicon_async(session)
+
+    invalidate_lexicon()
+    try:
+        first, second = asyncio.run(load())
+        assert first is second is get_lexicon(db)
+        assert all(word in first for word in WORDS)
+        assert builders and threading.main_thread() not in builders
+    finally:
+        invalidate_lexicon()
+
+
+def test_binary_file_round_trip(lexicon, tmp_path):
+    path = str(tmp_path / "lexicon.bin")
+    lexicon.save(path)
+    mapped = Lexicon.load(path)
+
+    assert len(mapped) == len(lexicon)
+    assert all(word in mapped for word in WORDS)
+    assert "DOMKI" not in mapped
+    assert mapped.words_with_prefix("DOM") == lexicon.words_with_prefix("DOM")
+    assert sorted(mapped.words_with_suffix("EK")) == ["DOMEK", "KOTEK"]
+
+
+def test_load_rejects_foreign_files(tmp_path):
+    path = tmp_path / "lexicon.bin"
+    path.write_bytes(b"not a lexicon file at all, just some bytes")
+    with pytest.raises(ValueError):
+        Lexicon.load(str(path))
+
+
+def test_get_lexicon_prefers_compiled_file(lexicon, tmp_path, monkeypatch):
+    path = str(tmp_path / "lexicon.bin")
+    lexicon.save(path)
+    monkeypatch.setattr(lexicon_module, "LEXICON_PATH", path)
+
+    invalidate_lexicon()
+    try:
+        # No database access is needed when the file exists
+        loaded = get_lexicon(db=None)
+        assert "ŻABA" in loaded
+    finally:
+        invalidate_lexicon()
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.models import Dictionary
+from app.services import broadcast
+from app.services.broadcast import BroadcastBroker, MemoryBroadcast, UnixSocketBroadcast
+from app.services.lexicon import Lexicon
+from app.services.lexicon_import import LEXICON_CHANNEL, announce, import_lexicon
+
+
+def write_words(path, words):
+    path.write_text("\n".join(words) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_import_replaces_dictionary_and_compiles_lexicon(db, db_engine, tmp_path):
+    db.add(Dictionary(word="STARE", language="PL"))
+    db.commit()
+    words = write_words(tmp_path / "words.txt", [
+        "  dom", "KOT", "#komentarz", "", "kot", "żaba", "DOMY", "łoś",
+        "x", "ABCDEFGHIJKLMNOP", "Q1", "koty", "DOM", "źle"
+    ])
+    output = str(tmp_path / "lexicon.bin")
+
+    # A tiny chunk size forces several sorted runs through the merge
+    report = import_lexicon(db_engine, words, output=output, chunk_size=2)
+
+    expected = ["DOM", "DOMY", "KOT", "KOTY", "ŁOŚ", "ŹLE", "ŻABA"]
+    assert report.loaded == 7
+    assert report.rejected == 3
+    assert report.runs > 1
+    db.expire_all()
+    assert sorted(w for w, in db.query(Dictionary.word)) == sorted(expected)
+    assert {language for language, in db.query(Dictionary.language)} == {"PL"}
+
+    lexicon = Lexicon.load(output)
+    assert len(lexicon) == 7
+    assert all(word in lexicon for word in expected)
+    assert lexicon.words_with_suffix("LE") == ["ŹLE"]
+
+    # A second import swaps the whole list
+    import_lexicon(db_engine, write_words(tmp_path / "next.txt", ["NOS", "NOSY"]), output=output)
+    assert sorted(w for w, in db.query(Dictionary.word)) == ["NOS", "NOSY"]
+    assert len(Lexicon.load(output)) == 2
+
+
+def test_announce_reports_whether_workers_could_hear_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(broadcast, "_backend", MemoryBroadcast())
+    assert asyncio.run(announce()) is False
+
+    async def announce_through_broker():
+        broker = BroadcastBroker(str(tmp_path / "broker.sock"))
+        await broker.start()
+        worker = UnixSocketBroadcast(broker.path)
+        received = asyncio.Event()
+
+        async def on_reload(channel, message):
+            received.set()
+
+        await worker.subscribe(LEXICON_CHANNEL, on_reload)
+        while LEXICON_CHANNEL not in broker.subscribers:
+            await asyncio.sleep(0.01)
+        monkeypatch.setattr(broadcast, "_backend", UnixSocketBroadcast(broker.path))
+        announced = await announce()
+        await asyncio.wait_for(received.wait(), 2)
+        await worker.disconnect()
+        await broker.stop()
+        return announced
+
+    assert asyncio.run(announce_through_broker()) is True
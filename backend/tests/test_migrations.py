@@ -0,0 +1,55 @@
+import json
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.services.board import Board
+from database import Base
+from scrabble import upgrade_database
+
+
+def make_engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    engine = make_engine(tmp_path)
+    upgrade_database(engine)
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    assert diff == []
+    engine.dispose()
+
+
+def test_upgrade_converts_json_boards(tmp_path):
+    engine = make_engine(tmp_path)
+    upgrade_database(engine, "0001")
+    rows = [[None] * 15 for _ in range(15)]
+    rows[7][7] = {"letter": "A", "is_blank": False}
+    rows[7][8] = {"letter": "Ż", "is_blank": True}
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO games (id, status, current_turn, board_state) VALUES (1, 'active', 0, :board)"),
+                     {"board": json.dumps(rows)})
+
+    upgrade_database(engine)
+    with engine.connect() as conn:
+        board, version = conn.execute(text("SELECT board_state, version FROM games WHERE id = 1")).one()
+    assert Board.from_bytes(board).to_json() == rows
+    assert version == 0
+    engine.dispose()
+
+
+def test_tables_from_create_all_are_adopted(tmp_path):
+    """A database created before migrations existed is stamped at the baseline, then upgraded"""
+    engine = make_engine(tmp_path)
+    upgrade_database(engine, "0001")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+
+    upgrade_database(engine)
+    tables = inspect(engine).get_table_names()
+    assert "game_snapshots" in tables
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0002"
+    engine.dispose()
@@ -0,0 +1,90 @@
+import pytest
+
+from app.models import User
+from app.services.board import Board
+from app.services.game_service import GameService
+from app.services.lexicon import Lexicon
+from app.services.move_generator import MoveGenerator
+
+WORDS = ["DOM", "DOMY", "DO", "OD", "MY", "KOT", "KOTY", "TY", "OKO", "TOK", "NOS", "NOSY", "SOK"]
+
+
+@pytest.fixture
+def lexicon():
+    return Lexicon.from_words(WORDS)
+
+
+def empty_board():
+    return Board()
+
+
+def place(board, word, row, col, across=True):
+    for i, letter in enumerate(word):
+        r, c = (row, col + i) if across else (row + i, col)
+        board.place(r, c, letter)
+
+
+def assert_legal(lexicon, board, move):
+    service = GameService(db=None, lexicon=lexicon)
+    board = board.copy()
+    positions = []
+    for tile in move['tiles']:
+        board.place(tile['row'], tile['col'], tile['letter'], tile['is_blank'])
+        positions.append((tile['row'], tile['col']))
+    words = service._find_words(board, positions)
+    assert words and all(word in lexicon for word in words)
+    assert move['word'] in words
+
+
+def test_first_move_covers_centre(lexicon):
+    moves = MoveGenerator(lexicon).generate(empty_board(), list("DOMYKTS"))
+    assert moves
+    for move in moves:
+        assert any((t['row'], t['col']) == (7, 7) for t in move['tiles'])
+        assert_legal(lexicon, empty_board(), move)
+    assert {"DOMY", "KOTY"} <= {move['word'] for move in moves}
+
+
+def test_moves_use_cross_checks_and_existing_tiles(lexicon):
+    board = empty_board()
+    place(board, "DOM", 7, 6)
+    moves = MoveGenerator(lexicon).generate(board, list("YKTSN"))
+    words = {move['word'] for move in moves}
+    assert "DOMY" in words  # extends the existing word
+    assert "MY" in words  # hooks onto M vertically
+    for move in moves:
+        assert_legal(lexicon, board, move)
+    scores = [move['score'] for move in moves]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_blank_stands_in_for_missing_letter(lexicon):
+    board = empty_board()
+    place(board, "DOM", 7, 6)
+    moves = MoveGenerator(lexicon).generate(board, ["_"])
+    domy = [m for m in moves if m['word'] == "DOMY"]
+    assert domy and domy[0]['tiles'] == [{'letter': 'Y', 'row': 7, 'col': 9, 'is_blank': True}]
+
+
+def test_generated_move_is_accepted_by_make_move(db, lexicon):
+    users = [User(username=f"player{i}", email=f"p{i}@example.com", hashed_password="x") for i in range(2)]
+    db.add_all(users)
+    db.commit()
+
+    service = GameService(db, lexicon=lexicon)
+    game = service.create_game()
+    first = service.join_game(game.id, users[0].id)
+    service.join_game(game.id, users[1].id)
+    assert service.start_game(game.id)
+
+    first.rack = list("DOMYKT_")
+    db.commit()
+    best = MoveGenerator(lexicon).generate(Board.from_bytes(game.board_state), first.rack, limit=1)[0]
+
+    move, error = service.make_move(game.id, users[0].id, best['tiles'])
+    assert error is None
+    assert move.score == best['score']
+    assert move.word == best['word']
+    db.refresh(game)
+    board = Board.from_bytes(game.board_state)
+    assert all(board.letter(t['row'], t['col']) == t['letter'] for t in best['tiles'])
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.models import Game, GamePlayer, GameSnapshot, Ranking, User
+from app.services import events, game_state
+from app.services.game_service import GameService
+from app.services.game_state import PlayerState, game_states, replay
+from app.services.lexicon import Lexicon
+from app.services.rankings import Leaderboard, apply_rack_penalties, rating_changes
+
+
+@pytest.fixture
+def started_game(db):
+    game_states.clear()
+    users = [User(username=f"player{i}", email=f"p{i}@example.com", hashed_password="x") for i in range(3)]
+    db.add_all(users)
+    db.commit()
+    db.add_all([Ranking(user_id=users[0].id, rating=1200), Ranking(user_id=users[1].id)])
+    db.commit()
+    service = GameService(db, lexicon=Lexicon.from_words(["DOM"]))
+    game = service.create_game()
+    for user in users:
+        service.join_game(game.id, user.id)
+    assert service.start_game(game.id)
+    yield service, game.id, [user.id for user in users]
+    game_states.clear()
+
+
+def test_rack_penalties_go_to_the_player_who_went_out():
+    players = [
+        PlayerState(1, 1, 0, 50, [], True),
+        PlayerState(2, 2, 1, 40, ["A", "Ź"], True),
+        PlayerState(3, 3, 2, 30, ["_"], True),
+    ]
+    apply_rack_penalties(players)
+    assert [p.score for p in players] == [60, 30, 30]
+
+
+def test_rating_changes_are_zero_sum_for_equal_ratings():
+    changes = rating_changes({1: 1000, 2: 1000, 3: 1000}, {1: 300, 2: 200, 3: 200}, k=32)
+    assert changes == {1: 16, 2: -8, 3: -8}
+    # The favourite gains little from an expected win
+    assert rating_changes({1: 1400, 2: 1000}, {1: 10, 2: 5}, k=32)[1] == 3
+
+
+def test_end_game_scores_and_ranks_everyone_at_once(started_game, db, monkeypatch):
+    service, game_id, players = started_game
+    # The last pass takes a snapshot, so ending the game has one to replace
+    monkeypatch.setattr(game_state, "SNAPSHOT_INTERVAL", 2 * len(players))
+    assert all(len(p.rack) == 7 for p in game_states.load(db, game_id).players)
+
+    assert service.end_game(game_id, 999) == (False, "Player not in game")
+    # Too early: nobody has passed yet
+    assert not service.end_game(game_id, players[1])[0]
+    for _ in range(2 * len(players)):
+        _, error = service.make_move(game_id, game_states.load(db, game_id).player_to_move().user_id, [], is_pass=True)
+        assert error is None
+    published = []
+    monkeypatch.setattr(events, "publish", lambda game_id, event: published.append(event))
+    assert service.end_game(game_id, players[1]) == (True, None)
+    assert service.end_game(game_id, players[1]) == (False, "Game not active")
+
+    db.expire_all()
+    game = db.query(Game).filter(Game.id == game_id).one()
+    assert game.status == "finished" and game.finished_at is not None
+    seats = db.query(GamePlayer).filter(GamePlayer.game_id == game_id).order_by(GamePlayer.player_order).all()
+    assert all(seat.score < 0 for seat in seats)
+    # Clients learn the penalised scores from the finish event itself
+    assert published == [{"type": "finish", "status": "finished",
+                          "scores": [{"user_id": seat.user_id, "score": seat.score} for seat in seats]}]
+
+    rankings = {r.user_id: r for r in db.query(Ranking).filter(Ranking.user_id.in_(players))}
+    # The third player had no ranking row yet
+    assert set(rankings) == set(players)
+    assert all(r.total_games == 1 for r in rankings.values())
+    assert sum(r.wins for r in rankings.values()) >= 1
+    # Rating is exchanged between players, give or take rounding
+    assert abs(sum(r.rating for r in rankings.values()) - 3200) <= 2
+
+    # The final snapshot replaced the one taken at the last pass
+    assert db.query(GameSnapshot).filter(GameSnapshot.game_id == game_id).count() == 2
+    replayed = replay(db, game_id, 2 * len(players))
+    assert replayed.status == "finished"
+    assert [p.score for p in replayed.players] == [seat.score for seat in seats]
+
+
+def test_leaderboard_is_rebuilt_only_after_invalidation():
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return [{"rating": len(builds)}]
+
+    board = Leaderboard(ttl=60)
+    assert asyncio.run(board.get_or_build(build)) == [{"rating": 1}]
+    assert asyncio.run(board.get_or_build(build)) == [{"rating": 1}]
+    board.invalidate()
+    assert asyncio.run(board.get_or_build(build)) == [{"rating": 2}]
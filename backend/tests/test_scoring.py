@@ -0,0 +1,72 @@
+from app.services.board import Board
+from app.services.scoring import LETTER_MULTIPLIER, WORD_MULTIPLIER, score_move, score_moves
+
+
+def empty_board():
+    return Board()
+
+
+def tile(letter, row, col, is_blank=False):
+    return {'letter': letter, 'row': row, 'col': col, 'is_blank': is_blank}
+
+
+def place(board, tiles):
+    for t in tiles:
+        board.place(t['row'], t['col'], t['letter'], t['is_blank'])
+
+
+def test_multiplier_grid():
+    assert WORD_MULTIPLIER[0] == 3
+    assert WORD_MULTIPLIER[1 * 15 + 1] == 2
+    assert LETTER_MULTIPLIER[1 * 15 + 5] == 3
+    assert LETTER_MULTIPLIER[8 * 15 + 8] == 2
+    assert LETTER_MULTIPLIER[7 * 15 + 7] == 1
+
+
+def test_existing_tiles_count_at_face_value():
+    board = empty_board()
+    place(board, [tile('D', 7, 6), tile('O', 7, 7), tile('M', 7, 8)])
+    # DOMY: D2 O1 M2 already on the board plus Y2
+    assert score_move(board, [tile('Y', 7, 9)]) == 7
+
+
+def test_blank_scores_zero():
+    board = empty_board()
+    place(board, [tile('D', 7, 6), tile('O', 7, 7), tile('M', 7, 8)])
+    assert score_move(board, [tile('Y', 7, 9, is_blank=True)]) == 5
+
+
+def test_premium_only_under_new_tiles():
+    board = empty_board()
+    place(board, [tile('M', 7, 8)])
+    # MY down with Y on a double letter square: 2 + 2*2
+    assert score_move(board, [tile('Y', 8, 8)]) == 6
+
+    place(board, [tile('Y', 8, 8)])
+    # TY across through the existing Y: the double letter under Y no longer applies
+    assert score_move(board, [tile('T', 8, 7)]) == 2 + 2
+
+
+def test_cross_words_are_scored():
+    board = empty_board()
+    place(board, [tile('D', 7, 6), tile('O', 7, 7), tile('M', 7, 8)])
+    # OK placed under O and M forms OK across plus OO and MK down
+    tiles = [tile('O', 8, 7), tile('K', 8, 8)]
+    main = 1 + 2 * 2  # O, K on double letter (8, 8)
+    cross = (1 + 1) + (2 + 2 * 2)  # O over O, M over K
+    assert score_move(board, tiles) == main + cross
+
+
+def test_bingo_and_word_multiplier():
+    board = empty_board()
+    tiles = [tile(letter, 0, col) for col, letter in enumerate("KOTEKOM")]
+    # (0, 0) triple word, (0, 3) double letter
+    face = 2 + 1 + 2 + 1 * 2 + 2 + 1 + 2
+    assert score_move(board, tiles) == face * 3 + 50
+
+
+def test_batch_matches_single_scoring():
+    board = empty_board()
+    place(board, [tile('D', 7, 6), tile('O', 7, 7), tile('M', 7, 8)])
+    moves = [[tile('Y', 7, 9)], [tile('Y', 8, 8)], [tile('O', 8, 7), tile('K', 8, 8)]]
+    assert score_moves(board, moves) == [score_move(board, m) for m in moves]
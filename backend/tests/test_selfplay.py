@@ -0,0 +1,25 @@
+from app.models import Game
+from app.services.lexicon import Lexicon
+from benchmark_selfplay import ServiceSimulator, summarize
+
+WORDS = ["DOM", "DOMY", "DO", "OD", "MY", "KOT", "KOTY", "TY", "OKO", "TOK", "NOS", "NOSY", "SOK", "ON", "TO",
+         "ALE", "LAS", "PAN", "NA", "ZA", "WY", "RAZ", "ZAW", "CZY"]
+
+
+def test_service_simulator_plays_a_game_to_the_end(db_engine, db):
+    simulator = ServiceSimulator(db_engine.url.render_as_string(hide_password=False), seats=2, max_turns=40,
+                                 lexicon=Lexicon.from_words(WORDS))
+    result = simulator.play(seed=1)
+
+    assert result["moves"] > 0
+    assert len(result["latencies"]) == result["moves"]
+    assert result["queries"] >= result["moves"]
+    assert result["state_bytes"] > 0
+    assert db.query(Game.status).scalar() == "finished"
+
+    summary = summarize([result, simulator.play(seed=2)])
+    assert summary["games"] == 2
+    assert summary["moves_per_second"] > 0
+    assert 0 < summary["latency_ms"]["p50"] <= summary["latency_ms"]["p99"]
+    assert summary["queries_per_move"] >= 1
+    simulator.engine.dispose()
@@ -3,11 +3,19 @@ import { gameAPI, profileAPI } from '../services/api';
 import chatService from '../services/chat';
 import '../styles/Chat.css';
 
+// Messages in id order without duplicates, however they arrived
+function mergeMessages(current, incoming) {
+  const byId = new Map(current.map(msg => [msg.id, msg]));
+  incoming.forEach(msg => byId.set(msg.id, msg));
+  return [...byId.values()].sort((a, b) => a.id - b.id);
+}
+
 function Chat({ gameId }) {
   const [messages, setMessages] = useState([]);
   const [newMessage, setNewMessage] = useState('');
   const [profile, setProfile] = useState(null);
   const messagesEndRef = useRef(null);
+  const messagesRef = useRef([]);
 
   useEffect(() => {
     loadProfile();
@@ -18,8 +26,10 @@ function Chat({ gameId }) {
     if (profile) {
       chatService.connect(gameId, profile.username, profile.id);
       chatService.onMessage((message) => {
-        setMessages(prev => [...prev, message]);
+        setMessages(prev => mergeMessages(prev, [message]));
       });
+      // Anything posted between loading the history and the socket opening
+      chatService.onOpen(catchUp);
 
       return () => {
         chatService.disconnect();
@@ -28,6 +38,7 @@ function Chat({ gameId }) {
   }, [profile, gameId]);
 
   useEffect(() => {
+    messagesRef.current = messages;
     scrollToBottom();
   }, [messages]);
 
@@ -43,12 +54,22 @@ function Chat({ gameId }) {
   const loadMessages = async () => {
     try {
       const response = await gameAPI.getMessages(gameId);
-      setMessages(response.data);
+      setMessages(prev => mergeMessages(prev, response.data));
     } catch (err) {
       console.error('Failed to load messages:', err);
     }
   };
 
+  const catchUp = async () => {
+    const lastId = messagesRef.current.length ? messagesRef.current[messagesRef.current.length - 1].id : 0;
+    try {
+      const response = await gameAPI.getMessages(gameId, { since_id: lastId });
+      setMessages(prev => mergeMessages(prev, response.data));
+    } catch (err) {
+      console.error('Failed to catch up on messages:', err);
+    }
+  };
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
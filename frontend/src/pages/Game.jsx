@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { DndContext, useSensor, useSensors, PointerSensor } from '@dnd-kit/core';
 import { gameAPI, profileAPI } from '../services/api';
+import gameEvents from '../services/gameEvents';
 import GameBoard from '../components/GameBoard';
 import PlayerRack from '../components/PlayerRack';
 import Chat from '../components/Chat';
@@ -27,10 +28,62 @@ function Game() {
   useEffect(() => {
     loadGame();
     loadProfile();
-    const interval = setInterval(loadGame, 2000); // Refresh every 2 seconds
-    return () => clearInterval(interval);
   }, [gameId]);
 
+  // Game state changes are pushed by the server instead of polled
+  useEffect(() => {
+    if (!profile) return;
+    gameEvents.connect(gameId);
+    gameEvents.onEvent((event) => handleGameEvent(event, profile));
+    gameEvents.onReconnect(loadGame);
+    return () => gameEvents.disconnect();
+  }, [gameId, profile]);
+
+  const handleGameEvent = (event, me) => {
+    if (event.type === 'move' && event.user_id === me.id) {
+      // Our own rack changed; only the REST endpoint knows its new contents
+      loadGame();
+      return;
+    }
+    setGame(prev => {
+      if (!prev) return prev;
+      switch (event.type) {
+        case 'move': {
+          const board = prev.board_state.map(row => [...row]);
+          event.tiles.forEach(({ letter, row, col, is_blank }) => {
+            board[row][col] = { letter, is_blank };
+          });
+          return {
+            ...prev,
+            board_state: board,
+            current_turn: event.current_turn,
+            remaining_tiles: event.remaining_tiles,
+            status: event.status,
+            players: prev.players.map(p =>
+              p.id === event.user_id ? { ...p, score: event.total_score } : p
+            ),
+          };
+        }
+        case 'join':
+          if (prev.players.some(p => p.id === event.player.id)) return prev;
+          return { ...prev, players: [...prev.players, event.player] };
+        case 'start':
+          return { ...prev, status: event.status, current_turn: event.current_turn };
+        case 'finish': {
+          // Rack penalties change every score, not just the last mover's
+          const scores = Object.fromEntries(event.scores.map(({ user_id, score }) => [user_id, score]));
+          return {
+            ...prev,
+            status: event.status,
+            players: prev.players.map(p => (p.id in scores ? { ...p, score: scores[p.id] } : p)),
+          };
+        }
+        default:
+          return prev;
+      }
+    });
+  };
+
   const loadGame = async () => {
     try {
       const response = await gameAPI.getGame(gameId);
@@ -60,13 +113,22 @@ function Game() {
     }
   };
 
+  const handleAddBot = async (level) => {
+    try {
+      await gameAPI.addBot(gameId, level);
+      loadGame();
+    } catch (err) {
+      setError('Nie udało się dodać bota');
+    }
+  };
+
   const handleEndGame = async () => {
     if (!window.confirm("Czy na pewno chcesz zakończyć grę?")) return;
     try {
       await gameAPI.endGame(gameId);
       loadGame();
     } catch (err) {
-      setError('Nie udało się zakończyć gry');
+      setError(err.response?.data?.detail || 'Nie udało się zakończyć gry');
     }
   };
 
@@ -101,6 +163,16 @@ function Game() {
     }
   };
 
+  const handleHint = async () => {
+    try {
+      const response = await gameAPI.getHint(gameId);
+      const [best] = response.data;
+      setError(best ? `Podpowiedź: ${best.word} (${best.score} pkt)` : 'Brak możliwych ruchów');
+    } catch (err) {
+      setError(err.response?.data?.detail || 'Nie udało się pobrać podpowiedzi');
+    }
+  };
+
   const handleDragEnd = (event) => {
     const { active, over } = event;
 
@@ -249,6 +321,16 @@ function Game() {
             {game.status === 'waiting' && (
               <div className="waiting-section">
                 <p>Oczekiwanie na graczy... ({game.players.length}/4)</p>
+                {game.players.length < 4 && (
+                  <>
+                    <button onClick={() => handleAddBot('greedy')} className="btn-secondary">
+                      Dodaj bota (łatwy)
+                    </button>
+                    <button onClick={() => handleAddBot('simulation')} className="btn-secondary">
+                      Dodaj bota (trudny)
+                    </button>
+                  </>
+                )}
                 {game.players.length >= 2 && (
                   <button onClick={handleStartGame} className="btn-primary">
                     Rozpocznij Grę
@@ -290,6 +372,13 @@ function Game() {
                   >
                     Wyczyść
                   </button>
+                  <button
+                    onClick={handleHint}
+                    disabled={!isMyTurn()}
+                    className="btn-secondary"
+                  >
+                    Podpowiedź
+                  </button>
                   <button
                     onClick={handleEndGame}
                     className="btn-danger"
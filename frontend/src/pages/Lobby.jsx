@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { gameAPI } from '../services/api';
 import '../styles/Lobby.css';
@@ -6,6 +6,7 @@ import '../styles/Lobby.css';
 function Lobby() {
   const [games, setGames] = useState([]);
   const [error, setError] = useState('');
+  const lobbyEtag = useRef(null);
   const navigate = useNavigate();
   const username = localStorage.getItem('username');
 
@@ -21,7 +22,9 @@ function Lobby() {
 
   const loadGames = async () => {
     try {
-      const response = await gameAPI.listGames();
+      const response = await gameAPI.getLobby(lobbyEtag.current);
+      if (response.status === 304) return;
+      lobbyEtag.current = response.headers.etag || null;
       setGames(response.data);
     } catch (err) {
       console.error('Failed to load games:', err);
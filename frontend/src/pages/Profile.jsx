@@ -3,9 +3,13 @@ import { useNavigate } from 'react-router-dom';
 import { profileAPI } from '../services/api';
 import '../styles/Profile.css';
 
+// Matches the server's default page size
+const HISTORY_PAGE_SIZE = 50;
+
 function Profile() {
   const [profile, setProfile] = useState(null);
   const [history, setHistory] = useState([]);
+  const [hasMore, setHasMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const navigate = useNavigate();
 
@@ -25,10 +29,11 @@ function Profile() {
     }
   };
 
-  const loadHistory = async () => {
+  const loadHistory = async (before) => {
     try {
-      const response = await profileAPI.getHistory();
-      setHistory(response.data);
+      const response = await profileAPI.getHistory(before);
+      setHistory((current) => (before ? [...current, ...response.data] : response.data));
+      setHasMore(response.data.length === HISTORY_PAGE_SIZE);
     } catch (err) {
       console.error('Failed to load history:', err);
     }
@@ -85,6 +90,11 @@ function Profile() {
             </tbody>
           </table>
         )}
+        {hasMore && (
+          <button onClick={() => loadHistory(history[history.length - 1].id)} className="btn-secondary">
+            Load more
+          </button>
+        )}
       </div>
     </div>
   );
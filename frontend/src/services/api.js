@@ -31,13 +31,23 @@ export const authAPI = {
 export const gameAPI = {
   createGame: () => api.post('/api/games', {}),
   listGames: () => api.get('/api/games'),
+  // Resolves with status 304 and no data when the lobby has not changed since etag
+  getLobby: (etag) =>
+    api.get('/api/games/lobby', {
+      headers: etag ? { 'If-None-Match': etag } : {},
+      validateStatus: (status) => status === 200 || status === 304,
+    }),
   getGame: (gameId) => api.get(`/api/games/${gameId}`),
   joinGame: (gameId) => api.post(`/api/games/${gameId}/join`),
   startGame: (gameId) => api.post(`/api/games/${gameId}/start`),
+  addBot: (gameId, level = 'greedy') =>
+    api.post(`/api/games/${gameId}/bots`, { level }),
   makeMove: (gameId, moveData) =>
     api.post(`/api/games/${gameId}/moves`, moveData),
   getMoves: (gameId) => api.get(`/api/games/${gameId}/moves`),
-  getMessages: (gameId) => api.get(`/api/games/${gameId}/messages`),
+  getHint: (gameId, limit = 1) =>
+    api.get(`/api/games/${gameId}/hint`, { params: { limit } }),
+  getMessages: (gameId, params = {}) => api.get(`/api/games/${gameId}/messages`, { params }),
   endGame: (gameId) => api.post(`/api/games/${gameId}/end`),
 };
 
@@ -45,7 +55,7 @@ export const gameAPI = {
 export const profileAPI = {
   getProfile: () => api.get('/api/profile'),
   getRankings: () => api.get('/api/rankings'),
-  getHistory: () => api.get('/api/history'),
+  getHistory: (before) => api.get('/api/history', { params: before ? { before } : {} }),
 };
 
 export default api;
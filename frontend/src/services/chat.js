@@ -5,14 +5,18 @@ class ChatService {
     this.ws = null;
     this.gameId = null;
     this.messageCallbacks = [];
+    this.openCallbacks = [];
   }
 
   connect(gameId, username, userId) {
     this.gameId = gameId;
-    this.ws = new WebSocket(`${WS_URL}/ws/chat/${gameId}`);
+    // The server takes the sender from the token, not from the message
+    const token = encodeURIComponent(localStorage.getItem('token') || '');
+    this.ws = new WebSocket(`${WS_URL}/ws/chat/${gameId}?token=${token}`);
 
     this.ws.onopen = () => {
       console.log('WebSocket connected');
+      this.openCallbacks.forEach(callback => callback());
     };
 
     this.ws.onmessage = (event) => {
@@ -46,12 +50,17 @@ class ChatService {
     this.messageCallbacks.push(callback);
   }
 
+  onOpen(callback) {
+    this.openCallbacks.push(callback);
+  }
+
   disconnect() {
     if (this.ws) {
       this.ws.close();
       this.ws = null;
     }
     this.messageCallbacks = [];
+    this.openCallbacks = [];
   }
 }
 
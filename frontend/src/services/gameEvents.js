@@ -0,0 +1,57 @@
+const WS_URL = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
+const RECONNECT_DELAY = 2000;
+
+class GameEventsService {
+  constructor() {
+    this.ws = null;
+    this.gameId = null;
+    this.eventCallbacks = [];
+    this.reconnectCallbacks = [];
+    this.reconnectTimer = null;
+  }
+
+  connect(gameId) {
+    this.gameId = gameId;
+    this.ws = new WebSocket(`${WS_URL}/ws/games/${gameId}`);
+
+    this.ws.onmessage = (event) => {
+      const gameEvent = JSON.parse(event.data);
+      this.eventCallbacks.forEach(callback => callback(gameEvent));
+    };
+
+    this.ws.onerror = (error) => {
+      console.error('Game events WebSocket error:', error);
+    };
+
+    this.ws.onclose = () => {
+      // Reconnect and let the page resynchronise, since events may have been missed
+      if (this.gameId === gameId) {
+        this.reconnectTimer = setTimeout(() => {
+          this.connect(gameId);
+          this.reconnectCallbacks.forEach(callback => callback());
+        }, RECONNECT_DELAY);
+      }
+    };
+  }
+
+  onEvent(callback) {
+    this.eventCallbacks.push(callback);
+  }
+
+  onReconnect(callback) {
+    this.reconnectCallbacks.push(callback);
+  }
+
+  disconnect() {
+    this.gameId = null;
+    clearTimeout(this.reconnectTimer);
+    if (this.ws) {
+      this.ws.close();
+      this.ws = null;
+    }
+    this.eventCallbacks = [];
+    this.reconnectCallbacks = [];
+  }
+}
+
+export default new GameEventsService();
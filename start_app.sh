@@ -24,7 +24,9 @@ echo "kuba" | sudo -S docker run -d \
   postgres:15-alpine
 
 echo "Waiting for DB to be ready..."
-sleep 5
+until echo "kuba" | sudo -S docker exec scrabble_db pg_isready -U scrabble_user -d scrabble >/dev/null 2>&1; do
+  sleep 0.5
+done
 
 # Build and Start Backend
 echo "Building Backend..."
@@ -38,10 +40,11 @@ echo "kuba" | sudo -S docker run -d \
   -e SECRET_KEY=your-secret-key-change-in-production \
   -e ALGORITHM=HS256 \
   -e ACCESS_TOKEN_EXPIRE_MINUTES=30 \
+  -e LEXICON_PATH=/app/lexicon.bin \
   -v $(pwd)/backend:/app \
   -p 8000:8000 \
   scrabble_backend \
-  sh -c "python seed_database.py && uvicorn main:app --host 0.0.0.0 --port 8000 --reload"
+  sh -c "python scrabble.py db upgrade && python seed_database.py && uvicorn main:app --host 0.0.0.0 --port 8000 --reload"
 
 # Build and Start Frontend
 echo "Building Frontend..."